@@ -0,0 +1,284 @@
+#!/usr/bin/env node
+/*
+ * Headless benchmark harness for the generated submission page.
+ *
+ * Loads a generated site in a local headless Chromium (via puppeteer, with all
+ * network requests blocked), replays scripted sessions through real DOM events
+ * and reports latency per operation:
+ *
+ *   load      cold open of the page with empty storage
+ *             (handler = DOMContentLoaded finished, frame = load event finished)
+ *   navigate  opening every credit page from the sidebar
+ *   type      keystrokes into textareas (input event per character)
+ *   gateway   setting every Condition (Y/N) select to Yes, No, Yes
+ *   na        marking every credit N/A and back
+ *   search    typing a query into the sidebar search
+ *   review    toggling review mode
+ *   save      Save button
+ *   restore   restoring the oldest history version
+ *   reload    re-opening the page with every answer stored (timed like load)
+ *   export    JSON export (and Excel when --sheetjs provides the library)
+ *
+ * "handler" is the synchronous cost of dispatching the event; "frame" runs
+ * until the next animation frame has been produced, so work a handler defers
+ * to requestAnimationFrame is still counted.
+ *
+ * Usage:
+ *   node bench_client.js [--page index.html] [--scale 10 --axis questions]
+ *                        [--textareas 300] [--keys 20] [--json out.json]
+ *                        [--executable /path/to/chromium] [--sheetjs xlsx.full.min.js]
+ *
+ * --scale/--axis build (once) a synthetic bank with bench_generator.py into
+ * bench_sites/ and benchmark that page instead. Requires puppeteer
+ * (npm i -g puppeteer, then run with NODE_PATH="$(npm root -g)").
+ */
+'use strict';
+
+const fs = require('fs');
+const path = require('path');
+const { execFileSync } = require('child_process');
+const puppeteer = require('puppeteer');
+
+const SHEETJS_URL = 'https://cdn.sheetjs.com/';
+
+function parseArgs(argv) {
+  const args = {
+    page: 'index.html', scale: null, axis: 'questions', textareas: 300, keys: 20,
+    json: null, executable: null, sheetjs: null, sites: 'bench_sites',
+  };
+  for (let i = 0; i < argv.length; i++) {
+    const key = argv[i].replace(/^--/, '');
+    if (!(key in args)) throw new Error(`Unknown option ${argv[i]}`);
+    const val = argv[++i];
+    args[key] = ['scale', 'textareas', 'keys'].includes(key) ? Number(val) : val;
+  }
+  return args;
+}
+
+function resolvePage(args) {
+  if (!args.scale) return path.resolve(args.page);
+  const name = args.scale === 1 ? 'baseline' : `${args.axis}-x${args.scale}`;
+  const page = path.resolve(args.sites, `${name}.html`);
+  if (!fs.existsSync(page)) {
+    console.log(`Generating synthetic bank ${name} with bench_generator.py...`);
+    execFileSync('python3', [
+      path.join(__dirname, 'bench_generator.py'),
+      '--scales', String(args.scale), '--axes', args.axis,
+      '--keep', args.sites, '--results', path.join(args.sites, 'results.jsonl'),
+    ], { stdio: 'inherit' });
+  }
+  return page;
+}
+
+function summarise(samples) {
+  const xs = samples.slice().sort((a, b) => a - b);
+  const q = p => xs[Math.min(xs.length - 1, Math.floor(p * xs.length))];
+  const r = v => Math.round(v * 100) / 100;
+  return {
+    n: xs.length,
+    mean: r(xs.reduce((a, b) => a + b, 0) / xs.length),
+    p50: r(q(0.5)), p95: r(q(0.95)), max: r(xs[xs.length - 1]),
+  };
+}
+
+// Injected into the page: time a DOM action to the end of its handler and to
+// the next produced frame.
+function pageHelpers() {
+  window.__bench = {
+    nextFrame() {
+      return new Promise(r => requestAnimationFrame(() => setTimeout(r, 0)));
+    },
+    async time(action) {
+      const t0 = performance.now();
+      action();
+      const handler = performance.now() - t0;
+      await window.__bench.nextFrame();
+      return [handler, performance.now() - t0];
+    },
+    creditIds() {
+      return Array.from(document.querySelectorAll('.credit-page')).map(p => p.id);
+    },
+    // Cards with a Yes/No select or with a textarea, windowed or not
+    cards(id, select) {
+      return document.querySelectorAll(select ? `#${id} .q-condition` : `#${id} .q-data, #${id} .q-descriptive`);
+    },
+    field(id, select, i) {
+      const card = window.__bench.cards(id, select)[i];
+      card.scrollIntoView({ block: 'center' });
+      if (typeof attachCard === 'function') attachCard(card);
+      return card.querySelector(select ? 'select' : 'textarea');
+    },
+    button(label) {
+      return Array.from(document.querySelectorAll('.header-btn'))
+        .find(b => b.textContent.trim() === label);
+    },
+    input(el, value, type) {
+      el.value = value;
+      el.dispatchEvent(new Event(type, { bubbles: true }));
+    },
+  };
+  window.confirm = () => true;
+  window.alert = () => {};
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const pageFile = resolvePage(args);
+  const sheetjs = args.sheetjs ? fs.readFileSync(args.sheetjs) : null;
+
+  const browser = await puppeteer.launch({
+    headless: 'shell',
+    executablePath: args.executable || undefined,
+    args: ['--no-sandbox', '--allow-file-access-from-files'],
+  });
+  const page = await browser.newPage();
+  await page.setViewport({ width: 1366, height: 900 });
+  const errors = [];
+  page.on('pageerror', e => errors.push(String(e)));
+  await page.setRequestInterception(true);
+  page.on('request', req => {
+    const url = req.url();
+    if (/^(file|data|blob):/.test(url)) return req.continue();
+    if (sheetjs && url.startsWith(SHEETJS_URL)) {
+      return req.respond({ status: 200, contentType: 'application/javascript', body: sheetjs });
+    }
+    return req.abort();
+  });
+  const cdp = await page.target().createCDPSession();
+  await cdp.send('Browser.setDownloadBehavior', { behavior: 'deny' });
+  await page.evaluateOnNewDocument(pageHelpers);
+
+  const samples = {};  // op -> { handler: [], frame: [] }
+  const add = (op, [handler, frame]) => {
+    samples[op] = samples[op] || { handler: [], frame: [] };
+    samples[op].handler.push(handler);
+    samples[op].frame.push(frame);
+  };
+  const loadTime = async () => page.evaluate(() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    return [nav.domContentLoadedEventEnd, nav.loadEventEnd];
+  });
+
+  // load (fresh storage)
+  await page.goto('file://' + pageFile, { waitUntil: 'load' });
+  await page.evaluate(() => localStorage.clear());
+  await page.reload({ waitUntil: 'load' });
+  add('load', await loadTime());
+  const creditIds = await page.evaluate(() => window.__bench.creditIds());
+  console.log(`${path.basename(pageFile)}: ${creditIds.length} credits`);
+
+  // navigate
+  for (const id of creditIds) {
+    add('navigate', await page.evaluate(id => window.__bench.time(
+      () => document.querySelector(`#sidebar-${id} .sidebar-item-name`).click()), id));
+  }
+
+  // type
+  let typed = 0;
+  for (const id of creditIds) {
+    if (typed >= args.textareas) break;
+    await page.evaluate(id => document.querySelector(`#sidebar-${id} .sidebar-item-name`).click(), id);
+    const count = await page.evaluate(id => window.__bench.cards(id, false).length, id);
+    for (let i = 0; i < count && typed < args.textareas; i++, typed++) {
+      for (let k = 1; k <= args.keys; k++) {
+        add('type', await page.evaluate((id, i, k) => {
+          const el = window.__bench.field(id, false, i);
+          const text = `Benchmark answer ${i} `.padEnd(k, 'x').slice(0, k);
+          return window.__bench.time(() => window.__bench.input(el, text, 'input'));
+        }, id, i, k));
+      }
+    }
+  }
+
+  // save (creates the first history version)
+  add('save', await page.evaluate(() => window.__bench.time(
+    () => window.__bench.button('Save').click())));
+
+  // gateway
+  for (const id of creditIds) {
+    await page.evaluate(id => document.querySelector(`#sidebar-${id} .sidebar-item-name`).click(), id);
+    const count = await page.evaluate(id => window.__bench.cards(id, true).length, id);
+    for (let i = 0; i < count; i++) {
+      for (const val of ['Yes', 'No', 'Yes']) {
+        add('gateway', await page.evaluate((id, i, val) => {
+          const el = window.__bench.field(id, true, i);
+          return window.__bench.time(() => window.__bench.input(el, val, 'change'));
+        }, id, i, val));
+      }
+    }
+  }
+
+  // na
+  for (const id of creditIds) {
+    for (let rep = 0; rep < 2; rep++) {
+      add('na', await page.evaluate(id => window.__bench.time(
+        () => document.querySelector(`#sidebar-${id} .na-toggle`).click()), id));
+    }
+  }
+
+  // search
+  const query = 'energy performance';
+  for (let k = 1; k <= query.length; k++) {
+    add('search', await page.evaluate(q => window.__bench.time(
+      () => window.__bench.input(document.getElementById('search-input'), q, 'input')), query.slice(0, k)));
+  }
+  await page.evaluate(() => new Promise(r => setTimeout(r, 300)));
+  await page.evaluate(() => window.__bench.input(document.getElementById('search-input'), '', 'input'));
+
+  // review
+  for (let rep = 0; rep < 10; rep++) {
+    add('review', await page.evaluate(() => window.__bench.time(
+      () => document.getElementById('review-btn').click())));
+  }
+
+  // save again, then restore the oldest version
+  add('save', await page.evaluate(() => window.__bench.time(
+    () => window.__bench.button('Save').click())));
+  add('restore', await page.evaluate(() => window.__bench.time(() => {
+    window.__bench.button('History').click();
+    const buttons = document.querySelectorAll('#history-body .history-restore');
+    if (buttons.length) buttons[buttons.length - 1].click();
+  })));
+  await page.evaluate(() => window.__bench.button('Save').click());
+
+  // export
+  const exportOption = label => `Array.from(document.querySelectorAll('.export-option'))
+    .find(o => o.textContent.includes('${label}')).click()`;
+  add('export_json', await page.evaluate(`window.__bench.time(() => { ${exportOption('JSON')}; })`));
+  if (sheetjs) add('export_xlsx', await page.evaluate(`window.__bench.time(() => { ${exportOption('Excel')}; })`));
+
+  const inPage = await page.evaluate(() => (typeof perfDump === 'function' ? perfDump() : null));
+
+  // reload with stored answers
+  for (let rep = 0; rep < 3; rep++) {
+    await page.reload({ waitUntil: 'load' });
+    add('reload', await loadTime());
+  }
+
+  await browser.close();
+
+  const report = {
+    page: pageFile,
+    time: new Date().toISOString(),
+    textareas: typed,
+    keysPerTextarea: args.keys,
+    operations: {},
+    inPage: inPage,
+    errors: errors,
+  };
+  console.log(`${'operation'.padEnd(14)}${'n'.padStart(7)}  handler mean/p50/p95/max (ms)      frame mean/p50/p95/max (ms)`);
+  for (const [op, s] of Object.entries(samples)) {
+    const h = summarise(s.handler), f = summarise(s.frame);
+    report.operations[op] = { handler: h, frame: f };
+    const fmt = x => `${x.mean}/${x.p50}/${x.p95}/${x.max}`.padEnd(34);
+    console.log(`${op.padEnd(14)}${String(h.n).padStart(7)}  ${fmt(h)}${fmt(f)}`);
+  }
+  if (errors.length) console.log(`Page errors:\n  ${errors.join('\n  ')}`);
+  if (args.json) {
+    fs.writeFileSync(args.json, JSON.stringify(report, null, 2));
+    console.log(`Report written to ${args.json}`);
+  }
+  if (errors.length) process.exitCode = 1;
+}
+
+main().catch(e => { console.error(e); process.exit(1); });
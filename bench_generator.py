@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Scale benchmarks for generate_website.py on synthetic question banks.
+
+The real workbook and guidelines are used as templates: every synthetic case
+clones their credits, questions and guidance paragraphs by a scale factor along
+one axis, runs the full build through ``generate_website.build_site`` and
+appends per-stage timings and output size to a JSON-lines results file.
+
+    python bench_generator.py                      # 1x, 10x, 100x on every axis
+    python bench_generator.py --scales 1 10 --axes questions
+    python bench_generator.py --compare HEAD~1 HEAD
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import warnings
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from docx import Document
+
+import generate_website as gw
+
+RESULTS_PATH = "bench_results.jsonl"
+AXES = ("credits", "questions", "guidance")
+
+HEADERS = [
+    "Ref", "Credit", "Performance Level", "Criteria",
+    "Question Type", "Question", "Response",
+    "Data Collection / Research Notes",
+]
+# Fonts parse_workbook uses to tell credit / level / criteria header rows apart
+header_font = Font(name="Calibri", bold=True, size=14, color="FFFFFF")
+credit_font = Font(name="Calibri", bold=True, size=12, color="FFFFFF")
+level_font = Font(name="Calibri", bold=True, size=11, color="FFFFFF")
+criteria_font = Font(name="Calibri", bold=True, size=11, color="1F4E28")
+
+
+def _copy_name(name, k):
+    """Name of the k-th clone of a credit; the first clone keeps the real name."""
+    return name if k == 1 else f"{name} {k}"
+
+
+def _font_cell(ws, value, font):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = font
+    return cell
+
+
+# ── Synthesis ────────────────────────────────────────────────────────────────
+def synthesize_workbook(all_credits, path, credit_factor=1, question_factor=1):
+    """Write a questions workbook with every credit cloned ``credit_factor`` times
+    and every criteria's questions repeated ``question_factor`` times."""
+    wb = Workbook(write_only=True)
+    with warnings.catch_warnings():
+        # Clone suffixes push a few sheet titles past Excel's 31 characters
+        warnings.simplefilter("ignore", UserWarning)
+        for k in range(1, credit_factor + 1):
+            for credit in all_credits:
+                ws = wb.create_sheet(_copy_name(credit["sheet_name"], k))
+                ws.append([_font_cell(ws, h, header_font) for h in HEADERS])
+                ws.append([_font_cell(ws, credit.get("title", credit["sheet_name"]), credit_font)])
+                for section in credit["sections"]:
+                    ws.append([_font_cell(ws, section["title"], level_font)])
+                    for crit in section["criteria"]:
+                        ws.append([_font_cell(ws, crit["name"], criteria_font)])
+                        for rep in range(1, question_factor + 1):
+                            for q in crit["questions"]:
+                                ref = q["ref"] if rep == 1 else f"{q['ref']}.{rep}"
+                                ws.append([ref, q["credit"], q["level"], q["criteria"],
+                                           q["type"], q["question"], "", q["data_note"]])
+        wb.save(path)
+
+
+def synthesize_guidelines(docx_guidance, path, credit_factor=1, paragraph_factor=1):
+    """Write a guidelines document with every credit cloned ``credit_factor`` times
+    and every body paragraph repeated ``paragraph_factor`` times."""
+    doc = Document()
+
+    def paragraphs(text):
+        text = text.strip()
+        if text:
+            for _ in range(paragraph_factor):
+                doc.add_paragraph(text)
+
+    for k in range(1, credit_factor + 1):
+        for name, g in docx_guidance.items():
+            doc.add_heading(_copy_name(name, k), level=1)
+            doc.add_heading("Outcome", level=2)
+            paragraphs(g["outcome"])
+            doc.add_heading("Requirements", level=2)
+            for level, crits in g["requirements"].items():
+                doc.add_heading(level, level=3)
+                for cname, text in crits.items():
+                    doc.add_heading(cname, level=4)
+                    paragraphs(text)
+            doc.add_heading("Guidance", level=2)
+            paragraphs(g["guidance"].get("_general", ""))
+            for topic, text in g["guidance"].items():
+                if topic != "_general":
+                    doc.add_heading(topic, level=5)
+                    paragraphs(text)
+            doc.add_heading("Submission content", level=2)
+            for topic, items in g["evidence"].items():
+                doc.add_heading(topic, level=5)
+                for item in items:
+                    paragraphs(item)
+            doc.add_heading("Definitions", level=2)
+            for d in g["definitions"]:
+                paragraphs(d)
+    doc.save(path)
+
+
+def case_factors(axis, scale):
+    """(credit_factor, question_factor, paragraph_factor) for one benchmark case."""
+    return (
+        scale if axis == "credits" else 1,
+        scale if axis == "questions" else 1,
+        scale if axis == "guidance" else 1,
+    )
+
+
+# ── Running ──────────────────────────────────────────────────────────────────
+def git_revision():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_case(axis, scale, template, work_dir, memory=False):
+    """Synthesise one case, build it and return its result record."""
+    all_credits, docx_guidance = template
+    cf, qf, pf = case_factors(axis, scale)
+    name = f"{axis}-x{scale}" if scale != 1 else "baseline"
+    xlsx_path = os.path.join(work_dir, f"{name}.xlsx")
+    docx_path = os.path.join(work_dir, f"{name}.docx")
+    html_path = os.path.join(work_dir, f"{name}.html")
+
+    t0 = time.perf_counter()
+    synthesize_workbook(all_credits, xlsx_path, cf, qf)
+    synthesize_guidelines(docx_guidance, docx_path, cf, pf)
+    synth_s = time.perf_counter() - t0
+
+    profiler = gw.BuildProfiler(enabled=True, trace_memory=memory)
+    profiler.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            summary = gw.build_site(xlsx_path, docx_path, html_path, profiler)
+    finally:
+        profiler.stop()
+
+    report = profiler.report(**summary)
+    return {
+        "case": name,
+        "axis": axis,
+        "scale": scale,
+        "factors": {"credits": cf, "questions_per_criteria": qf, "guidance_paragraphs": pf},
+        "synthesis_s": round(synth_s, 3),
+        "input_bytes": {"xlsx": os.path.getsize(xlsx_path), "docx": os.path.getsize(docx_path)},
+        **report,
+    }
+
+
+def print_result(r):
+    stages = "  ".join(f"{s['stage']}={s['wall_s']:.2f}s" for s in r["stages"])
+    print(f"{r['case']:<16} {r['questions']:>8,} q {r['bytes'] / 1e6:>9.1f} MB "
+          f"{r['total']['wall_s']:>8.2f}s  {stages}")
+
+
+def compare(results_path, rev_a, rev_b):
+    """Print total and per-stage wall-time ratios between two recorded revisions."""
+    def resolve(rev):
+        try:
+            return subprocess.run(["git", "rev-parse", "--short", rev],
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return rev
+
+    latest = {}
+    with open(results_path) as f:
+        for line in f:
+            r = json.loads(line)
+            latest[(r["revision"].removesuffix("-dirty"), r["case"])] = r
+    a, b = resolve(rev_a), resolve(rev_b)
+    cases = sorted({c for rev, c in latest if rev in (a, b)})
+    print(f"{'case':<16}{'stage':<20}{a:>12}{b:>12}{'ratio':>8}")
+    for case in cases:
+        ra, rb = latest.get((a, case)), latest.get((b, case))
+        if not ra or not rb:
+            print(f"{case:<16}{'(missing on one side)':<20}")
+            continue
+        ta = {s["stage"]: s["wall_s"] for s in ra["stages"]}
+        tb = {s["stage"]: s["wall_s"] for s in rb["stages"]}
+        ta["total"], tb["total"] = ra["total"]["wall_s"], rb["total"]["wall_s"]
+        for stage in ta:
+            ratio = tb.get(stage, 0) / ta[stage] if ta[stage] else float("nan")
+            print(f"{case:<16}{stage:<20}{ta[stage]:>11.3f}s{tb.get(stage, 0):>11.3f}s{ratio:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--axes", nargs="+", choices=AXES, default=list(AXES),
+                        help="dimension to scale per case (default: all three, one at a time)")
+    parser.add_argument("--memory", action="store_true",
+                        help="also record peak tracemalloc memory (slows every stage down)")
+    parser.add_argument("--results", default=RESULTS_PATH, help=f"JSON-lines results file (default: {RESULTS_PATH})")
+    parser.add_argument("--keep", metavar="DIR",
+                        help="keep synthetic workbooks, guidelines and generated sites in DIR")
+    parser.add_argument("--compare", nargs=2, metavar=("REV_A", "REV_B"),
+                        help="compare two recorded revisions instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(args.results, *args.compare)
+        return
+
+    cases = []
+    for scale in sorted(set(args.scales)):
+        for axis in args.axes:
+            # 1x is the same bank on every axis; run it once
+            if scale == 1 and cases and cases[0][1] == 1:
+                continue
+            cases.append((axis, scale))
+
+    print("Loading templates from the real workbook and guidelines...")
+    with contextlib.redirect_stdout(io.StringIO()):
+        template = (gw.parse_workbook(gw.XLSX_PATH), gw.parse_guidelines(gw.DOCX_PATH))
+
+    revision = git_revision()
+    env = {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system()}
+    with contextlib.ExitStack() as stack:
+        if args.keep:
+            os.makedirs(args.keep, exist_ok=True)
+            work_dir = args.keep
+        else:
+            work_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix="gs-bench-"))
+        for axis, scale in cases:
+            result = run_case(axis, scale, template, work_dir, memory=args.memory)
+            result.update(revision=revision, timestamp=time.strftime("%Y-%m-%dT%H:%M:%S"), env=env)
+            print_result(result)
+            with open(args.results, "a") as f:
+                f.write(json.dumps(result) + "\n")
+    print(f"Results appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
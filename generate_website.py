@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 """Parse the Green Star Buildings Excel and generate a complete submission website."""
 
+import argparse
+import cProfile
 import json
 import html as html_mod
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter
 from docx import Document as DocxDocument
 
-# ── Parse Excel ──────────────────────────────────────────────────────────────
-wb = load_workbook("Green_Star_Buildings_v1.1_Submission_Questions.xlsx")
+import units
+
+XLSX_PATH = "Green_Star_Buildings_v1.1_Submission_Questions.xlsx"
+DOCX_PATH = "Green Star Buildings v1.1_Submission Guidelines_RevA.docx"
+
+# Credit pages with at least this many questions render their cards windowed:
+# only cards near the viewport keep their content in the DOM.
+WINDOW_MIN_QUESTIONS = 16
 
 # Category mapping for each sheet
 CATEGORIES = {
@@ -49,81 +61,95 @@ CATEGORIES = {
     ],
 }
 
-# Parse all sheets
-all_credits = []
-for sheet_name in wb.sheetnames:
-    ws = wb[sheet_name]
-    credit_data = {
-        "sheet_name": sheet_name,
-        "sections": [],   # list of {type, title, questions}
-        "questions": [],
-    }
 
-    current_section = None
-    for row_idx in range(2, ws.max_row + 1):
-        a = ws.cell(row=row_idx, column=1).value
-        b = ws.cell(row=row_idx, column=2).value
-        c = ws.cell(row=row_idx, column=3).value
-        d = ws.cell(row=row_idx, column=4).value
-        e = ws.cell(row=row_idx, column=5).value
-        f = ws.cell(row=row_idx, column=6).value
-        h = ws.cell(row=row_idx, column=8).value
-
-        # Check if it's a merged header row
-        fill_color = ws.cell(row=row_idx, column=1).fill.start_color
-        font = ws.cell(row=row_idx, column=1).font
-
-        if a and not b and not e:
-            # This is a header row (credit header, level header, or criteria header)
-            text = str(a)
-            if font.color and hasattr(font.color, 'rgb') and font.color.rgb:
-                rgb = str(font.color.rgb)
-                if rgb == "00FFFFFF" and font.size == 12:
-                    # Credit header (green bg, white text, size 12)
+# ── Parse Excel ──────────────────────────────────────────────────────────────
+def parse_workbook(path=XLSX_PATH):
+    """Read every credit sheet into a list of {sheet_name, title, sections, questions} dicts."""
+    wb = load_workbook(path)
+
+    # Parse all sheets
+    all_credits = []
+    for sheet_name in wb.sheetnames:
+        ws = wb[sheet_name]
+        credit_data = {
+            "sheet_name": sheet_name,
+            "sections": [],   # list of {type, title, questions}
+            "questions": [],
+        }
+
+        current_section = None
+        for row_idx in range(2, ws.max_row + 1):
+            a = ws.cell(row=row_idx, column=1).value
+            b = ws.cell(row=row_idx, column=2).value
+            c = ws.cell(row=row_idx, column=3).value
+            d = ws.cell(row=row_idx, column=4).value
+            e = ws.cell(row=row_idx, column=5).value
+            f = ws.cell(row=row_idx, column=6).value
+            h = ws.cell(row=row_idx, column=8).value
+
+            # Check if it's a merged header row
+            fill_color = ws.cell(row=row_idx, column=1).fill.start_color
+            font = ws.cell(row=row_idx, column=1).font
+
+            if a and not b and not e:
+                # This is a header row (credit header, level header, or criteria header)
+                text = str(a)
+                if font.color and hasattr(font.color, 'rgb') and font.color.rgb:
+                    rgb = str(font.color.rgb)
+                    if rgb == "00FFFFFF" and font.size == 12:
+                        # Credit header (green bg, white text, size 12)
+                        credit_data["title"] = text
+                        continue
+                    elif rgb == "00FFFFFF" and font.size == 11:
+                        # Level header
+                        current_section = {"type": "level", "title": text, "criteria": []}
+                        credit_data["sections"].append(current_section)
+                        continue
+                    elif "1F4E28" in rgb:
+                        # Criteria header (light green bg, dark text)
+                        if current_section is not None:
+                            current_section["criteria"].append({"name": text, "questions": []})
+                        continue
+                # Fallback detection by font size/bold
+                if font.bold and font.size and font.size >= 12:
                     credit_data["title"] = text
                     continue
-                elif rgb == "00FFFFFF" and font.size == 11:
-                    # Level header
+                elif font.bold and font.size and font.size >= 11:
+                    if font.color and hasattr(font.color, 'rgb') and "1F4E28" in str(font.color.rgb):
+                        if current_section is not None:
+                            current_section["criteria"].append({"name": text, "questions": []})
+                        continue
                     current_section = {"type": "level", "title": text, "criteria": []}
                     credit_data["sections"].append(current_section)
                     continue
-                elif "1F4E28" in rgb:
-                    # Criteria header (light green bg, dark text)
-                    if current_section is not None:
-                        current_section["criteria"].append({"name": text, "questions": []})
-                    continue
-            # Fallback detection by font size/bold
-            if font.bold and font.size and font.size >= 12:
-                credit_data["title"] = text
-                continue
-            elif font.bold and font.size and font.size >= 11:
-                if font.color and hasattr(font.color, 'rgb') and "1F4E28" in str(font.color.rgb):
-                    if current_section is not None:
-                        current_section["criteria"].append({"name": text, "questions": []})
-                    continue
-                current_section = {"type": "level", "title": text, "criteria": []}
-                credit_data["sections"].append(current_section)
-                continue
 
-        # It's a question row if columns E and F have content
-        if e and f:
-            q = {
-                "ref": str(a) if a else "",
-                "credit": str(b) if b else "",
-                "level": str(c) if c else "",
-                "criteria": str(d) if d else "",
-                "type": str(e) if e else "",
-                "question": str(f) if f else "",
-                "data_note": str(h) if h else "",
-            }
-            credit_data["questions"].append(q)
-            # Add to current criteria; create a "General" one if none exists yet
-            if current_section:
-                if not current_section["criteria"]:
-                    current_section["criteria"].append({"name": "General", "questions": []})
-                current_section["criteria"][-1]["questions"].append(q)
+            # It's a question row if columns E and F have content
+            if e and f:
+                q = {
+                    "ref": str(a) if a else "",
+                    "credit": str(b) if b else "",
+                    "level": str(c) if c else "",
+                    "criteria": str(d) if d else "",
+                    "type": str(e) if e else "",
+                    "question": str(f) if f else "",
+                    "data_note": str(h) if h else "",
+                }
+                credit_data["questions"].append(q)
+                # Add to current criteria; create a "General" one if none exists yet
+                if current_section:
+                    if not current_section["criteria"]:
+                        current_section["criteria"].append({"name": "General", "questions": []})
+                    current_section["criteria"][-1]["questions"].append(q)
+
+        all_credits.append(credit_data)
+
+    for c in all_credits:
+        c["category"] = find_category(c["sheet_name"])
+    # Credit ids (credit-N) follow page order, which is category order
+    order = list(CATEGORIES)
+    all_credits.sort(key=lambda c: order.index(c["category"]) if c["category"] in order else len(order))
+    return all_credits
 
-    all_credits.append(credit_data)
 
 # Map credits to categories
 def find_category(sheet_name):
@@ -133,44 +159,44 @@ def find_category(sheet_name):
                 return cat
     return "Other"
 
-for c in all_credits:
-    c["category"] = find_category(c["sheet_name"])
 
 # Build JSON-serializable credit structure for the Excel exporter
-credits_json_data = []
-for i, c in enumerate(all_credits):
-    credits_json_data.append({
-        "id": f"credit-{i}",
-        "sheet_name": c["sheet_name"],
-        "title": c.get("title", c["sheet_name"]),
-        "category": c["category"],
-        "sections": [
-            {
-                "title": sec["title"],
-                "criteria": [
-                    {
-                        "name": cr["name"],
-                        "questions": [
-                            {
-                                "ref": q["ref"],
-                                "credit": q["credit"],
-                                "level": q["level"],
-                                "criteria": q["criteria"],
-                                "type": q["type"],
-                                "question": q["question"],
-                                "data_note": q["data_note"],
-                                "input_id": f"credit-{i}-{q['ref'].replace('.', '-')}",
-                            }
-                            for q in cr["questions"]
-                        ],
-                    }
-                    for cr in sec["criteria"]
-                ],
-            }
-            for sec in c["sections"]
-        ],
-    })
-credits_json_str = json.dumps(credits_json_data)
+def build_credits_json(all_credits):
+    credits_json_data = []
+    for i, c in enumerate(all_credits):
+        credits_json_data.append({
+            "id": f"credit-{i}",
+            "sheet_name": c["sheet_name"],
+            "title": c.get("title", c["sheet_name"]),
+            "category": c["category"],
+            "sections": [
+                {
+                    "title": sec["title"],
+                    "criteria": [
+                        {
+                            "name": cr["name"],
+                            "questions": [
+                                {
+                                    "ref": q["ref"],
+                                    "credit": q["credit"],
+                                    "level": q["level"],
+                                    "criteria": q["criteria"],
+                                    "type": q["type"],
+                                    "question": q["question"],
+                                    "data_note": q["data_note"],
+                                    "input_id": f"credit-{i}-{q['ref'].replace('.', '-')}",
+                                }
+                                for q in cr["questions"]
+                            ],
+                        }
+                        for cr in sec["criteria"]
+                    ],
+                }
+                for sec in c["sections"]
+            ],
+        })
+    return credits_json_data
+
 
 # ── Conditional visibility rules ─────────────────────────────────────────────
 # Maps: question_input_id -> { "depends_on": gateway_input_id, "show_when": "Yes"|"No" }
@@ -181,193 +207,200 @@ credits_json_str = json.dumps(credits_json_data)
 def make_id(credit_idx, ref):
     return f"credit-{credit_idx}-{ref.replace('.', '-')}"
 
-conditional_rules = {}
-for ci, c in enumerate(all_credits):
-    sheet = c["sheet_name"]
-    qs = c["questions"]
-    refs = {q["ref"]: q for q in qs}
-    ref_list = [q["ref"] for q in qs]
-
-    # Build ref -> index for this credit
-    ref_idx = {r: i for i, r in enumerate(ref_list)}
-
-    # Define rules per credit based on analysis
-    # Explicit "If yes/no" follow-ups
-    rules_for_credit = []
-
-    # Helper: add rule(s) for gateway_ref -> [follow_ref1, ...] shown when answer is val
-    def add_rules(gateway, followers, val="Yes"):
-        for f in followers:
-            if gateway in ref_idx and f in ref_idx:
-                rules_for_credit.append((f, gateway, val))
-
-    sn = sheet.lower().replace(" ", "")
-
-    if "industrydevelopment" in sn:
-        add_rules("ID.5", ["ID.6"], "Yes")
-    elif "responsibleconstruction" in sn:
-        add_rules("RC.1", ["RC.3"], "Yes")
-        add_rules("RC.1", ["RC.2"], "No")
-        add_rules("RC.4", ["RC.5"], "Yes")
-    elif "verificationandhandover" in sn:
-        add_rules("VH.5", ["VH.6"], "Yes")
-        add_rules("VH.7", ["VH.8"], "Yes")
-        add_rules("VH.26", ["VH.27"], "Yes")
-    elif "responsibleresource" in sn:
-        add_rules("RRM.2", ["RRM.3"], "Yes")
-        add_rules("RRM.5", ["RRM.6"], "Yes")
-        add_rules("RRM.7", ["RRM.8"], "Yes")
-        add_rules("RRM.12", ["RRM.13"], "Yes")
-    elif "responsibleprocurement" in sn:
-        add_rules("RP.12", ["RP.13"], "Yes")
-    elif "cleanair" in sn:
-        add_rules("CA.9", ["CA.10"], "Yes")
-    elif "lightquality" in sn:
-        add_rules("LQ.7", ["LQ.8"], "Yes")
-        add_rules("LQ.7", ["LQ.9", "LQ.10", "LQ.11"], "No")
-    elif "exposuretotoxins" in sn:
-        add_rules("ET.1", ["ET.2", "ET.3"], "Yes")
-    elif "amenityandcomfort" in sn or "amenity" in sn:
-        add_rules("AmC.3", ["AmC.4"], "Yes")
-    elif "connectiontonature" in sn:
-        add_rules("CN.4", ["CN.5", "CN.6"], "Yes")
-    elif "climateresilience" in sn:
-        add_rules("CR.1", ["CR.2", "CR.3", "CR.4"], "Yes")
-    elif "operationsresilience" in sn:
-        add_rules("OR.4", ["OR.5"], "Yes")
-        add_rules("OR.6", ["OR.7"], "Yes")
-    elif "communityresilience" in sn:
-        add_rules("CoR.1", ["CoR.2", "CoR.3", "CoR.4"], "Yes")
-    elif "gridresilience" in sn:
-        add_rules("GR.1", ["GR.2", "GR.3"], "Yes")
-        add_rules("GR.4", ["GR.5", "GR.6"], "Yes")
-        add_rules("GR.7", ["GR.8"], "Yes")
-    elif "energysource" in sn:
-        add_rules("ES.5", ["ES.6"], "Yes")
-    elif "upfrontcarbonreduction" in sn:
-        add_rules("UCR.2", ["UCR.3", "UCR.4", "UCR.5"], "Yes")
-    elif "wateruse" in sn:
-        add_rules("WU.3", ["WU.4"], "Yes")
-        add_rules("WU.5", ["WU.6"], "Yes")
-    elif "contributiontoplace" in sn:
-        add_rules("CP.1", ["CP.2"], "Yes")
-    elif "cultureheritage" in sn:
-        add_rules("CHI.1", ["CHI.2"], "Yes")
-    elif "firstnations" in sn:
-        add_rules("FNI.1", ["FNI.2", "FNI.3"], "Yes")
-    elif "designforequity" in sn:
-        add_rules("DE.4", ["DE.5"], "Yes")
-    elif "impactstonature" in sn:
-        add_rules("IN.1", ["IN.2", "IN.3"], "Yes")
-        add_rules("IN.7", ["IN.8"], "Yes")
-    elif "natureconnectivity" in sn:
-        add_rules("NC.1", ["NC.2"], "Yes")
-        add_rules("NC.5", ["NC.6"], "Yes")
-    elif "naturestewardship" in sn:
-        add_rules("NS.1", ["NS.2", "NS.3"], "Yes")
-    elif "markettransformation" in sn:
-        add_rules("MT.4", ["MT.5"], "Yes")
-    elif "waterwayprotection" in sn:
-        add_rules("WP.5", ["WP.6"], "Yes")
-    elif "impactsdisclosure" in sn:
-        add_rules("ID2.5", ["ID2.6"], "Yes")
-
-    for follower_ref, gateway_ref, show_val in rules_for_credit:
-        fid = make_id(ci, follower_ref)
-        gid = make_id(ci, gateway_ref)
-        conditional_rules[fid] = {"depends_on": gid, "show_when": show_val}
-
-conditional_rules_json = json.dumps(conditional_rules)
+
+def build_conditional_rules(all_credits):
+    conditional_rules = {}
+    for ci, c in enumerate(all_credits):
+        sheet = c["sheet_name"]
+        qs = c["questions"]
+        refs = {q["ref"]: q for q in qs}
+        ref_list = [q["ref"] for q in qs]
+
+        # Build ref -> index for this credit
+        ref_idx = {r: i for i, r in enumerate(ref_list)}
+
+        # Define rules per credit based on analysis
+        # Explicit "If yes/no" follow-ups
+        rules_for_credit = []
+
+        # Helper: add rule(s) for gateway_ref -> [follow_ref1, ...] shown when answer is val
+        def add_rules(gateway, followers, val="Yes"):
+            for f in followers:
+                if gateway in ref_idx and f in ref_idx:
+                    rules_for_credit.append((f, gateway, val))
+
+        sn = sheet.lower().replace(" ", "")
+
+        if "industrydevelopment" in sn:
+            add_rules("ID.5", ["ID.6"], "Yes")
+        elif "responsibleconstruction" in sn:
+            add_rules("RC.1", ["RC.3"], "Yes")
+            add_rules("RC.1", ["RC.2"], "No")
+            add_rules("RC.4", ["RC.5"], "Yes")
+        elif "verificationandhandover" in sn:
+            add_rules("VH.5", ["VH.6"], "Yes")
+            add_rules("VH.7", ["VH.8"], "Yes")
+            add_rules("VH.26", ["VH.27"], "Yes")
+        elif "responsibleresource" in sn:
+            add_rules("RRM.2", ["RRM.3"], "Yes")
+            add_rules("RRM.5", ["RRM.6"], "Yes")
+            add_rules("RRM.7", ["RRM.8"], "Yes")
+            add_rules("RRM.12", ["RRM.13"], "Yes")
+        elif "responsibleprocurement" in sn:
+            add_rules("RP.12", ["RP.13"], "Yes")
+        elif "cleanair" in sn:
+            add_rules("CA.9", ["CA.10"], "Yes")
+        elif "lightquality" in sn:
+            add_rules("LQ.7", ["LQ.8"], "Yes")
+            add_rules("LQ.7", ["LQ.9", "LQ.10", "LQ.11"], "No")
+        elif "exposuretotoxins" in sn:
+            add_rules("ET.1", ["ET.2", "ET.3"], "Yes")
+        elif "amenityandcomfort" in sn or "amenity" in sn:
+            add_rules("AmC.3", ["AmC.4"], "Yes")
+        elif "connectiontonature" in sn:
+            add_rules("CN.4", ["CN.5", "CN.6"], "Yes")
+        elif "climateresilience" in sn:
+            add_rules("CR.1", ["CR.2", "CR.3", "CR.4"], "Yes")
+        elif "operationsresilience" in sn:
+            add_rules("OR.4", ["OR.5"], "Yes")
+            add_rules("OR.6", ["OR.7"], "Yes")
+        elif "communityresilience" in sn:
+            add_rules("CoR.1", ["CoR.2", "CoR.3", "CoR.4"], "Yes")
+        elif "gridresilience" in sn:
+            add_rules("GR.1", ["GR.2", "GR.3"], "Yes")
+            add_rules("GR.4", ["GR.5", "GR.6"], "Yes")
+            add_rules("GR.7", ["GR.8"], "Yes")
+        elif "energysource" in sn:
+            add_rules("ES.5", ["ES.6"], "Yes")
+        elif "upfrontcarbonreduction" in sn:
+            add_rules("UCR.2", ["UCR.3", "UCR.4", "UCR.5"], "Yes")
+        elif "wateruse" in sn:
+            add_rules("WU.3", ["WU.4"], "Yes")
+            add_rules("WU.5", ["WU.6"], "Yes")
+        elif "contributiontoplace" in sn:
+            add_rules("CP.1", ["CP.2"], "Yes")
+        elif "cultureheritage" in sn:
+            add_rules("CHI.1", ["CHI.2"], "Yes")
+        elif "firstnations" in sn:
+            add_rules("FNI.1", ["FNI.2", "FNI.3"], "Yes")
+        elif "designforequity" in sn:
+            add_rules("DE.4", ["DE.5"], "Yes")
+        elif "impactstonature" in sn:
+            add_rules("IN.1", ["IN.2", "IN.3"], "Yes")
+            add_rules("IN.7", ["IN.8"], "Yes")
+        elif "natureconnectivity" in sn:
+            add_rules("NC.1", ["NC.2"], "Yes")
+            add_rules("NC.5", ["NC.6"], "Yes")
+        elif "naturestewardship" in sn:
+            add_rules("NS.1", ["NS.2", "NS.3"], "Yes")
+        elif "markettransformation" in sn:
+            add_rules("MT.4", ["MT.5"], "Yes")
+        elif "waterwayprotection" in sn:
+            add_rules("WP.5", ["WP.6"], "Yes")
+        elif "impactsdisclosure" in sn:
+            add_rules("ID2.5", ["ID2.6"], "Yes")
+
+        for follower_ref, gateway_ref, show_val in rules_for_credit:
+            fid = make_id(ci, follower_ref)
+            gid = make_id(ci, gateway_ref)
+            conditional_rules[fid] = {"depends_on": gid, "show_when": show_val}
+    return conditional_rules
+
 
 # Build search index for client-side search
-search_index = []
-for ci, c in enumerate(all_credits):
-    credit_id = f"credit-{ci}"
-    for q in c["questions"]:
-        q_id = f"{credit_id}-{q['ref'].replace('.', '-')}"
-        search_index.append({
-            "ref": q["ref"],
-            "credit": c["sheet_name"],
-            "creditId": credit_id,
-            "cardId": f"card-{q_id}",
-            "type": q["type"],
-            "question": q["question"],
-            "note": q["data_note"],
-        })
-search_index_json = json.dumps(search_index)
+def build_search_index(all_credits):
+    search_index = []
+    for ci, c in enumerate(all_credits):
+        credit_id = f"credit-{ci}"
+        for q in c["questions"]:
+            q_id = f"{credit_id}-{q['ref'].replace('.', '-')}"
+            search_index.append({
+                "ref": q["ref"],
+                "credit": c["sheet_name"],
+                "creditId": credit_id,
+                "cardId": f"card-{q_id}",
+                "type": q["type"],
+                "question": q["question"],
+                "note": q["data_note"],
+            })
+    return search_index
 
-# ── Parse Submission Guidelines DOCX ─────────────────────────────────────────
-docx_doc = DocxDocument("Green Star Buildings v1.1_Submission Guidelines_RevA.docx")
 
+# ── Parse Submission Guidelines DOCX ─────────────────────────────────────────
 # Front-matter and category-only H1 headings to skip
 _skip_h1 = {"Version control", "Table of contents", "Introduction",
             "Responsible", "Healthy", "Resilient", "Positive",
             "Places", "People", "Nature", "Leadership"}
 
-docx_guidance = {}
-_cur_credit = _cur_h2 = _cur_h3 = _cur_h4 = _cur_h6 = None
 
-for para in docx_doc.paragraphs:
-    sname = para.style.name if para.style else ""
-    txt = para.text.strip()
-    if not txt:
-        continue
+def parse_guidelines(path=DOCX_PATH):
+    """Collect outcome, requirements, guidance, evidence and definitions per DOCX credit."""
+    docx_doc = DocxDocument(path)
 
-    if "Heading 1" in sname:
-        if txt in _skip_h1 or txt.startswith("Appendix"):
-            _cur_credit = None
+    docx_guidance = {}
+    _cur_credit = _cur_h2 = _cur_h3 = _cur_h4 = _cur_h6 = None
+
+    for para in docx_doc.paragraphs:
+        sname = para.style.name if para.style else ""
+        txt = para.text.strip()
+        if not txt:
             continue
-        _cur_credit = txt
-        _cur_h2 = _cur_h3 = _cur_h4 = _cur_h6 = None
-        docx_guidance[_cur_credit] = {
-            "outcome": "",
-            "requirements": {},   # level_name -> {criteria_name: text}
-            "guidance": {},       # topic -> text
-            "evidence": {},       # topic -> [items]
-            "definitions": [],    # [text, ...]
-        }
-    elif _cur_credit and _cur_credit in docx_guidance:
-        g = docx_guidance[_cur_credit]
-        if "Heading 2" in sname:
-            _cur_h2 = txt
-            _cur_h3 = _cur_h4 = _cur_h6 = None
-        elif "Heading 3" in sname:
-            _cur_h3 = txt
-            _cur_h4 = _cur_h6 = None
-            if _cur_h2 == "Requirements" and _cur_h3 not in g["requirements"]:
-                g["requirements"][_cur_h3] = {}
-        elif "Heading 4" in sname:
-            _cur_h4 = txt
-            _cur_h6 = None
-            if _cur_h2 == "Requirements" and _cur_h3 and _cur_h3 in g["requirements"]:
-                g["requirements"][_cur_h3][_cur_h4] = ""
-        elif "Heading 5" in sname or "Heading 6" in sname or "Heading 7" in sname:
-            _cur_h6 = txt
-            if _cur_h2 == "Guidance":
-                g["guidance"][_cur_h6] = ""
-            elif _cur_h2 == "Submission content":
-                g["evidence"][_cur_h6] = []
-        else:
-            # Body paragraph
-            if _cur_h2 == "Outcome":
-                g["outcome"] += txt + " "
-            elif _cur_h2 == "Requirements" and _cur_h3 and _cur_h4:
-                if _cur_h3 in g["requirements"] and _cur_h4 in g["requirements"][_cur_h3]:
-                    g["requirements"][_cur_h3][_cur_h4] += txt + " "
-            elif _cur_h2 == "Guidance":
-                if _cur_h6 and _cur_h6 in g["guidance"]:
-                    g["guidance"][_cur_h6] += txt + " "
-                else:
-                    g["guidance"]["_general"] = g["guidance"].get("_general", "") + txt + " "
-            elif _cur_h2 == "Submission content":
-                if _cur_h6 and _cur_h6 in g["evidence"]:
-                    g["evidence"][_cur_h6].append(txt)
-            elif _cur_h2 == "Definitions":
-                g["definitions"].append(txt)
-
-print(f"  DOCX credits parsed: {len(docx_guidance)}")
-
-def _find_docx(sheet_name):
+
+        if "Heading 1" in sname:
+            if txt in _skip_h1 or txt.startswith("Appendix"):
+                _cur_credit = None
+                continue
+            _cur_credit = txt
+            _cur_h2 = _cur_h3 = _cur_h4 = _cur_h6 = None
+            docx_guidance[_cur_credit] = {
+                "outcome": "",
+                "requirements": {},   # level_name -> {criteria_name: text}
+                "guidance": {},       # topic -> text
+                "evidence": {},       # topic -> [items]
+                "definitions": [],    # [text, ...]
+            }
+        elif _cur_credit and _cur_credit in docx_guidance:
+            g = docx_guidance[_cur_credit]
+            if "Heading 2" in sname:
+                _cur_h2 = txt
+                _cur_h3 = _cur_h4 = _cur_h6 = None
+            elif "Heading 3" in sname:
+                _cur_h3 = txt
+                _cur_h4 = _cur_h6 = None
+                if _cur_h2 == "Requirements" and _cur_h3 not in g["requirements"]:
+                    g["requirements"][_cur_h3] = {}
+            elif "Heading 4" in sname:
+                _cur_h4 = txt
+                _cur_h6 = None
+                if _cur_h2 == "Requirements" and _cur_h3 and _cur_h3 in g["requirements"]:
+                    g["requirements"][_cur_h3][_cur_h4] = ""
+            elif "Heading 5" in sname or "Heading 6" in sname or "Heading 7" in sname:
+                _cur_h6 = txt
+                if _cur_h2 == "Guidance":
+                    g["guidance"][_cur_h6] = ""
+                elif _cur_h2 == "Submission content":
+                    g["evidence"][_cur_h6] = []
+            else:
+                # Body paragraph
+                if _cur_h2 == "Outcome":
+                    g["outcome"] += txt + " "
+                elif _cur_h2 == "Requirements" and _cur_h3 and _cur_h4:
+                    if _cur_h3 in g["requirements"] and _cur_h4 in g["requirements"][_cur_h3]:
+                        g["requirements"][_cur_h3][_cur_h4] += txt + " "
+                elif _cur_h2 == "Guidance":
+                    if _cur_h6 and _cur_h6 in g["guidance"]:
+                        g["guidance"][_cur_h6] += txt + " "
+                    else:
+                        g["guidance"]["_general"] = g["guidance"].get("_general", "") + txt + " "
+                elif _cur_h2 == "Submission content":
+                    if _cur_h6 and _cur_h6 in g["evidence"]:
+                        g["evidence"][_cur_h6].append(txt)
+                elif _cur_h2 == "Definitions":
+                    g["definitions"].append(txt)
+    return docx_guidance
+
+
+def _find_docx(docx_guidance, sheet_name):
     """Find DOCX guidance data for an Excel credit sheet name."""
     sn = sheet_name.lower().replace(" ", "")
     for dname, data in docx_guidance.items():
@@ -414,6 +447,22 @@ def esc(s):
     return html_mod.escape(str(s)) if s else ""
 
 
+# Example answer per units.data_kind of a Data question
+DATA_EXAMPLES = {
+    "percentage": '<p class="g-example">85%</p>',
+    "area": '<p class="g-example">2,500 m²</p>',
+    "mass": '<p class="g-example">450 tonnes</p>',
+    "date": '<p class="g-example">15 March 2025</p>',
+    "cost": '<p class="g-example">$125,000 AUD</p>',
+    "count": '<p class="g-example">12</p>',
+    "volume": '<p class="g-example">1,200 kL/year</p>',
+    "energy": '<p class="g-example">850 MJ/m²/year</p>',
+    "emissions": '<p class="g-example">125 tCO&#8322;-e</p>',
+    "rating": '<p class="g-example">7.5</p>',
+    "name": '<p class="g-example">Jane Smith, ABC Consulting, #12345</p>',
+}
+
+
 def _build_example(q_type, q_text, req_text):
     """Generate a short, concrete example answer based on question type and content."""
     qt = q_text.lower()
@@ -422,29 +471,7 @@ def _build_example(q_type, q_text, req_text):
         return '<p class="g-example">Yes</p>'
 
     if q_type == "Data":
-        if any(w in qt for w in ["percentage", "percent", "%", "proportion"]):
-            return '<p class="g-example">85%</p>'
-        if any(w in qt for w in ["area", "m²", "sqm", "square met", "floor area", "gfa", "nla"]):
-            return '<p class="g-example">2,500 m²</p>'
-        if any(w in qt for w in ["weight", "tonne", "kg", "mass"]):
-            return '<p class="g-example">450 tonnes</p>'
-        if any(w in qt for w in ["date", "when was", "when did"]):
-            return '<p class="g-example">15 March 2025</p>'
-        if any(w in qt for w in ["cost", "$", "value", "budget", "spend"]):
-            return '<p class="g-example">$125,000 AUD</p>'
-        if any(w in qt for w in ["number", "how many", "count", "quantity"]):
-            return '<p class="g-example">12</p>'
-        if any(w in qt for w in ["volume", "litre", "l/", "kl", "water"]):
-            return '<p class="g-example">1,200 kL/year</p>'
-        if any(w in qt for w in ["energy", "kwh", "mj", "gj"]):
-            return '<p class="g-example">850 MJ/m²/year</p>'
-        if any(w in qt for w in ["emission", "co2", "carbon", "tco2"]):
-            return '<p class="g-example">125 tCO&#8322;-e</p>'
-        if any(w in qt for w in ["rating", "score", "star", "level"]):
-            return '<p class="g-example">7.5</p>'
-        if any(w in qt for w in ["name", "who", "accreditation"]):
-            return '<p class="g-example">Jane Smith, ABC Consulting, #12345</p>'
-        return '<p class="g-example"><em>[Value with units]</em></p>'
+        return DATA_EXAMPLES.get(units.data_kind(q_text), '<p class="g-example"><em>[Value with units]</em></p>')
 
     # Descriptive — build a short example from the requirement context
     if req_text:
@@ -459,22 +486,20 @@ def _build_example(q_type, q_text, req_text):
     return '<p class="g-example"><em>[1-2 sentences describing how the requirement was met, referencing evidence]</em></p>'
 
 
-def build_guidance_html(sheet_name, crit_name, q_type, q_text, data_note):
-    """Build enhanced guidance HTML with tabs: Guidelines, Example, Tips."""
-    g = _find_docx(sheet_name)
+GUIDANCE_TOGGLE = (
+    '<button class="guidance-toggle" data-action="toggle-guidance">'
+    '<span class="guidance-icon">?</span> Guidance '
+    '<span class="guidance-arrow">&#9662;</span></button>'
+)
+
 
-    # If no DOCX data, fall back to simple data_note
-    if not g:
-        if data_note:
-            return (
-                '<div class="guidance-wrapper">'
-                '<button class="guidance-toggle" onclick="this.parentElement.classList.toggle(\'open\')">'
-                '<span class="guidance-icon">?</span> Guidance '
-                '<span class="guidance-arrow">&#9662;</span></button>'
-                f'<div class="guidance-content"><div class="guidance-tab-pane active">{esc(data_note)}</div></div></div>'
-            )
-        return ""
+def build_guidance_body(g, crit_name):
+    """Build the Guidelines tab and the shared part of the Tips tab for one criteria.
 
+    ``g`` is the credit's DOCX guidance (from ``_find_docx``). Returns
+    ``(guidelines_html, tips_html, req_text)``: the question's own data note is
+    appended to the tips on the client, and ``req_text`` seeds the Example tab.
+    """
     # ── Guidelines tab ──
     gparts = []
     if g["outcome"]:
@@ -501,10 +526,6 @@ def build_guidance_html(sheet_name, crit_name, q_type, q_text, data_note):
 
     guidelines_html = "".join(gparts) if gparts else "<p>No specific guidelines found for this question.</p>"
 
-    # ── Example tab (short concrete sample answer) ──
-    req_text = req_match[2] if req_match else ""
-    example_html = _build_example(q_type, q_text, req_text)
-
     # ── Tips tab (watch-outs and pitfalls) ──
     tparts = []
     if guide_match:
@@ -520,28 +541,8 @@ def build_guidance_html(sheet_name, crit_name, q_type, q_text, data_note):
         for d in g["definitions"][:2]:
             tparts.append(f'<p class="g-def-tip"><strong>&#128204; Definition:</strong> {esc(d[:150])}</p>')
 
-    if data_note:
-        tparts.append(f'<p class="g-note">{esc(data_note)}</p>')
-
-    tips_html = "".join(tparts) if tparts else "<p>No specific watch-outs for this question.</p>"
-
-    # ── Assemble tabbed panel ──
-    return (
-        '<div class="guidance-wrapper">'
-        '<button class="guidance-toggle" onclick="this.parentElement.classList.toggle(\'open\')">'
-        '<span class="guidance-icon">?</span> Guidance '
-        '<span class="guidance-arrow">&#9662;</span></button>'
-        '<div class="guidance-content">'
-        '<div class="guidance-tabs">'
-        '<button class="g-tab active" onclick="switchTab(this,0)">Guidelines</button>'
-        '<button class="g-tab" onclick="switchTab(this,1)">Example</button>'
-        '<button class="g-tab" onclick="switchTab(this,2)">Tips</button>'
-        '</div>'
-        f'<div class="guidance-tab-pane active">{guidelines_html}</div>'
-        f'<div class="guidance-tab-pane">{example_html}</div>'
-        f'<div class="guidance-tab-pane">{tips_html}</div>'
-        '</div></div>'
-    )
+    req_text = req_match[2] if req_match else ""
+    return guidelines_html, "".join(tparts), req_text
 
 category_colors = {
     "Responsible": {"bg": "#1F4E28", "light": "#E8F5E9", "mid": "#A5D6A7"},
@@ -565,44 +566,108 @@ category_icons = {
     "Leadership": "&#9733;",   # star
 }
 
-# Build sidebar and pages
-sidebar_html = ""
-pages_html = ""
-credit_index = 0
 
-for cat_name, cat_sheets in CATEGORIES.items():
-    colors = category_colors[cat_name]
-    icon = category_icons[cat_name]
-    cat_credits = [c for c in all_credits if c["category"] == cat_name]
+def build_guidance(all_credits, docx_guidance):
+    """Match DOCX guidance to every question, emitting each distinct panel body once.
+
+    Returns ``(placeholders, guidance_data)``. ``placeholders`` maps
+    (sheet_name, ref) to the collapsed wrapper rendered into the question card;
+    ``guidance_data`` holds the deduplicated ``bodies`` ([guidelines, tips]) and
+    ``examples`` the client materialises when a panel is first opened.
+    """
+    bodies, body_index = [], {}
+    examples, example_index = [], {}
+
+    def intern(items, index, value):
+        if value not in index:
+            index[value] = len(items)
+            items.append(value)
+        return index[value]
 
-    sidebar_html += f'''
+    placeholders = {}
+    for credit in all_credits:
+        g = _find_docx(docx_guidance, credit["sheet_name"])
+        crit_bodies = {}  # criteria name -> (body index, requirement text)
+        for section in credit["sections"]:
+            for crit in section["criteria"]:
+                for q in crit["questions"]:
+                    key = (credit["sheet_name"], q["ref"])
+                    if not g:
+                        # If no DOCX data, fall back to the question's data note alone
+                        placeholders[key] = (
+                            f'<div class="guidance-wrapper" data-guidance="-">{GUIDANCE_TOGGLE}</div>'
+                            if q["data_note"] else ""
+                        )
+                        continue
+                    if crit["name"] not in crit_bodies:
+                        guidelines_html, tips_html, req_text = build_guidance_body(g, crit["name"])
+                        b = intern(bodies, body_index, (guidelines_html, tips_html))
+                        crit_bodies[crit["name"]] = (b, req_text)
+                    b, req_text = crit_bodies[crit["name"]]
+                    e = intern(examples, example_index, _build_example(q["type"], q["question"], req_text))
+                    placeholders[key] = (
+                        f'<div class="guidance-wrapper" data-guidance="{b}:{e}">{GUIDANCE_TOGGLE}</div>'
+                    )
+    return placeholders, {"bodies": [list(b) for b in bodies], "examples": examples}
+
+
+def render_html(all_credits, credits_json_data, conditional_rules, search_index, guidance, guidance_data,
+                window_threshold=WINDOW_MIN_QUESTIONS, benchmarks=None, seed_json="{}"):
+    """Assemble the complete single-file site from the parsed model.
+
+    Credits with at least ``window_threshold`` questions (0 disables) emit their
+    cards as empty shells with the content in a <template>, for the client's
+    windowed rendering. ``benchmarks`` (portfolio_store.py benchmarks) are
+    embedded for the measured Data questions the page has. ``seed_json`` is
+    the page's SEED (see project_seed); bulk builds pass SEED_SLOT and fill it
+    in per project.
+    """
+    credits_json_str = json.dumps(credits_json_data)
+    guidance_json = json.dumps(guidance_data)
+    conditional_rules_json = json.dumps(conditional_rules)
+    search_index_json = json.dumps(search_index)
+    units_json = json.dumps(units.client_units())
+    unit_expect = {}  # Data question input id -> expected dimensions, filled below
+
+    # Build sidebar and pages
+    sidebar_html = ""
+    pages_html = ""
+    credit_index = 0
+
+    for cat_name, cat_sheets in CATEGORIES.items():
+        colors = category_colors[cat_name]
+        icon = category_icons[cat_name]
+        cat_credits = [c for c in all_credits if c["category"] == cat_name]
+
+        sidebar_html += f'''
     <div class="sidebar-category">
-      <div class="sidebar-category-header" style="background:{colors['bg']}" onclick="toggleCategory(this)">
+      <div class="sidebar-category-header" style="background:{colors['bg']}" data-action="toggle-category">
         <span>{icon} {esc(cat_name)}</span>
         <span class="arrow">&#9662;</span>
       </div>
       <div class="sidebar-category-items">'''
 
-    for credit in cat_credits:
-        credit_id = f"credit-{credit_index}"
-        q_count = len(credit["questions"])
-        sidebar_html += f'''
+        for credit in cat_credits:
+            credit_id = f"credit-{credit_index}"
+            q_count = len(credit["questions"])
+            sidebar_html += f'''
         <div class="sidebar-item" data-credit="{credit_id}" id="sidebar-{credit_id}">
-          <span class="sidebar-item-name" onclick="showCredit('{credit_id}')">{esc(credit["sheet_name"])}</span>
+          <span class="sidebar-item-name" data-action="show-credit">{esc(credit["sheet_name"])}</span>
           <span class="sidebar-progress-ring" id="ring-{credit_id}"><svg width="18" height="18" viewBox="0 0 18 18"><circle cx="9" cy="9" r="7" fill="none" stroke="#e0e0e0" stroke-width="2"/><circle cx="9" cy="9" r="7" fill="none" stroke="{colors['bg']}" stroke-width="2" stroke-dasharray="44" stroke-dashoffset="44" stroke-linecap="round" transform="rotate(-90 9 9)" class="ring-fill"/></svg></span>
-          <button class="na-toggle" onclick="toggleNA('{credit_id}', event)" title="Mark as Not Applicable">N/A</button>
+          <button class="na-toggle" data-action="toggle-na" title="Mark as Not Applicable">N/A</button>
         </div>'''
 
-        # Build credit page
-        title = credit.get("title", credit["sheet_name"])
-        pages_html += f'''
+            # Build credit page
+            title = credit.get("title", credit["sheet_name"])
+            windowed = bool(window_threshold) and q_count >= window_threshold
+            pages_html += f'''
     <div class="credit-page" id="{credit_id}" style="display:none">
       <div class="credit-header" style="background:{colors['bg']}">
         <div class="credit-header-top">
           <span class="credit-category-tag" style="background:{colors['mid']};color:{colors['bg']}">{esc(cat_name)}</span>
           <div class="credit-header-right">
-            <button class="wizard-toggle" onclick="toggleWizard('{credit_id}')" title="Step-by-step mode">Step-by-step</button>
-            <button class="na-btn-header" onclick="toggleNA('{credit_id}', event)">Mark N/A</button>
+            <button class="wizard-toggle" data-action="toggle-wizard" title="Step-by-step mode">Step-by-step</button>
+            <button class="na-btn-header" data-action="toggle-na">Mark N/A</button>
           </div>
         </div>
         <h2>{esc(title)}</h2>
@@ -614,9 +679,9 @@ for cat_name, cat_sheets in CATEGORIES.items():
         <span id="{credit_id}-progress-text">0 of {q_count} answered</span>
       </div>
       <div class="wizard-nav" id="{credit_id}-wizard-nav" style="display:none">
-        <button class="wizard-btn" onclick="wizardPrev('{credit_id}')">&#8592; Back</button>
+        <button class="wizard-btn" data-action="wizard-prev">&#8592; Back</button>
         <span class="wizard-step-text" id="{credit_id}-wizard-step">1 / {q_count}</span>
-        <button class="wizard-btn wizard-btn-next" onclick="wizardNext('{credit_id}')">Next &#8594;</button>
+        <button class="wizard-btn wizard-btn-next" data-action="wizard-next">Next &#8594;</button>
       </div>
       <div class="credit-body">
         <div class="gaps-panel" id="{credit_id}-gaps">
@@ -625,91 +690,100 @@ for cat_name, cat_sheets in CATEGORIES.items():
           <ul class="gaps-list" id="{credit_id}-gaps-list"></ul>
         </div>'''
 
-        for section in credit["sections"]:
-            pages_html += f'''
-        <div class="level-header" style="background:{colors['bg']}">{esc(section["title"])}</div>'''
-
-            for crit in section["criteria"]:
+            for si, section in enumerate(credit["sections"]):
                 pages_html += f'''
-        <div class="criteria-header" style="border-left-color:{colors['bg']};background:{colors['light']}">{esc(crit["name"])}</div>'''
+        <div class="level-header" style="background:{colors['bg']}">{esc(section["title"])}<span class="rollup" id="{credit_id}-l{si}-rollup"></span></div>'''
 
-                for q in crit["questions"]:
-                    q_id = f"{credit_id}-{q['ref'].replace('.', '-')}"
-                    type_class = ""
-                    input_html = ""
+                for ci, crit in enumerate(section["criteria"]):
+                    pages_html += f'''
+        <div class="criteria-header" style="border-left-color:{colors['bg']};background:{colors['light']}">{esc(crit["name"])}<span class="rollup" id="{credit_id}-l{si}-c{ci}-rollup"></span></div>'''
 
-                    if q["type"] == "Condition (Y/N)":
-                        type_class = "q-condition"
-                        input_html = f'''
+                    for q in crit["questions"]:
+                        q_id = f"{credit_id}-{q['ref'].replace('.', '-')}"
+                        type_class = ""
+                        input_html = ""
+
+                        if q["type"] == "Condition (Y/N)":
+                            type_class = "q-condition"
+                            input_html = f'''
               <div class="response-field">
-                <select id="{q_id}" class="yn-select" onchange="onAnswer('{credit_id}')" data-credit="{credit_id}">
+                <select id="{q_id}" class="yn-select" data-credit="{credit_id}">
                   <option value="">-- Select --</option>
                   <option value="Yes">Yes</option>
                   <option value="No">No</option>
                 </select>
               </div>'''
-                    elif q["type"] == "Data":
-                        type_class = "q-data"
-                        input_html = f'''
+                        elif q["type"] == "Data":
+                            type_class = "q-data"
+                            expected = units.expected_dimensions(q["question"])
+                            unit_hint = ""
+                            if expected:
+                                unit_expect[q_id] = expected
+                                unit_hint = f'''
+                <div class="unit-hint" id="{q_id}-units"></div>'''
+                            input_html = f'''
               <div class="response-field">
-                <textarea id="{q_id}" class="data-input" rows="3" placeholder="Enter data..." oninput="onAnswer('{credit_id}')" data-credit="{credit_id}"></textarea>
+                <textarea id="{q_id}" class="data-input" rows="3" placeholder="Enter data..." data-credit="{credit_id}"></textarea>{unit_hint}
               </div>'''
-                    else:
-                        type_class = "q-descriptive"
-                        input_html = f'''
+                        else:
+                            type_class = "q-descriptive"
+                            input_html = f'''
               <div class="response-field">
-                <textarea id="{q_id}" class="desc-input" rows="4" placeholder="Describe..." oninput="onAnswer('{credit_id}')" data-credit="{credit_id}"></textarea>
+                <textarea id="{q_id}" class="desc-input" rows="4" placeholder="Describe..." data-credit="{credit_id}"></textarea>
               </div>'''
 
-                    data_note_html = build_guidance_html(
-                        credit["sheet_name"],
-                        crit["name"],
-                        q["type"],
-                        q["question"],
-                        q["data_note"],
-                    )
+                        data_note_html = guidance[(credit["sheet_name"], q["ref"])]
 
-                    type_badge = q["type"]
-                    # Check if this question has a conditional dependency
-                    dep_attrs = ""
-                    is_conditional = q_id in conditional_rules
-                    if is_conditional:
-                        rule = conditional_rules[q_id]
-                        dep_attrs = f' data-depends-on="{rule["depends_on"]}" data-show-when="{rule["show_when"]}"'
+                        type_badge = q["type"]
+                        # Check if this question has a conditional dependency
+                        dep_attrs = ""
+                        is_conditional = q_id in conditional_rules
+                        if is_conditional:
+                            rule = conditional_rules[q_id]
+                            dep_attrs = f' data-depends-on="{rule["depends_on"]}" data-show-when="{rule["show_when"]}"'
 
-                    hidden_class = " q-hidden" if is_conditional else ""
-                    pages_html += f'''
-        <div class="question-card {type_class}{hidden_class}" id="card-{q_id}"{dep_attrs}>
+                        hidden_class = " q-hidden" if is_conditional else ""
+                        card_body = f'''
           <div class="question-header">
             <span class="question-ref">{esc(q["ref"])}</span>
-            <span class="question-type-badge {type_class}-badge">{esc(type_badge)}</span>
+            <span class="question-header-actions">
+              <span class="question-type-badge {type_class}-badge">{esc(type_badge)}</span>
+              <button class="q-history-btn" data-action="question-history" title="Show this answer's revisions">History</button>
+            </span>
           </div>
           <div class="question-text">{esc(q["question"])}</div>
           {input_html}
-          {data_note_html}
+          {data_note_html}'''
+                        if windowed:
+                            pages_html += f'''
+        <div class="question-card {type_class}{hidden_class} q-shell" id="card-{q_id}"{dep_attrs}><template>{card_body}
+        </template></div>'''
+                        else:
+                            pages_html += f'''
+        <div class="question-card {type_class}{hidden_class}" id="card-{q_id}"{dep_attrs}>{card_body}
         </div>'''
 
-        pages_html += '''
+            pages_html += '''
       </div>
     </div>'''
-        credit_index += 1
+            credit_index += 1
 
-    sidebar_html += '''
+        sidebar_html += '''
       </div>
     </div>'''
 
-# Build dashboard summary
-total_questions = sum(len(c["questions"]) for c in all_credits)
-total_credits = len(all_credits)
+    # Build dashboard summary
+    total_questions = sum(len(c["questions"]) for c in all_credits)
+    total_credits = len(all_credits)
 
-dashboard_cards = ""
-for cat_name, cat_sheets in CATEGORIES.items():
-    colors = category_colors[cat_name]
-    icon = category_icons[cat_name]
-    cat_credits = [c for c in all_credits if c["category"] == cat_name]
-    cat_q_count = sum(len(c["questions"]) for c in cat_credits)
+    dashboard_cards = ""
+    for cat_name, cat_sheets in CATEGORIES.items():
+        colors = category_colors[cat_name]
+        icon = category_icons[cat_name]
+        cat_credits = [c for c in all_credits if c["category"] == cat_name]
+        cat_q_count = sum(len(c["questions"]) for c in cat_credits)
 
-    dashboard_cards += f'''
+        dashboard_cards += f'''
       <div class="dash-card" style="border-top:4px solid {colors['bg']}">
         <div class="dash-card-icon" style="color:{colors['bg']}">{icon}</div>
         <div class="dash-card-title">{esc(cat_name)}</div>
@@ -723,8 +797,12 @@ for cat_name, cat_sheets in CATEGORIES.items():
         <div class="dash-card-pct" id="dash-{cat_name.lower()}-pct">0% complete</div>
       </div>'''
 
-# ── Full HTML ────────────────────────────────────────────────────────────────
-html = f'''<!DOCTYPE html>
+    unit_expect_json = json.dumps(unit_expect)
+    benchmarks_json = json.dumps({input_id: columns for input_id, columns in (benchmarks or {}).items()
+                                  if input_id in unit_expect}, separators=(",", ":"))
+
+    # ── Full HTML ────────────────────────────────────────────────────────────────
+    html = f'''<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8">
@@ -1105,6 +1183,10 @@ body {{
   color: var(--text);
 }}
 
+/* Answered / visible counts in level and criteria headers */
+.rollup {{ float: right; font-size: 12px; font-weight: 500; opacity: 0.8; }}
+.rollup.complete {{ opacity: 1; font-weight: 700; }}
+
 /* ── Question Cards ── */
 .question-card {{
   background: var(--white);
@@ -1115,6 +1197,8 @@ body {{
   transition: box-shadow 0.2s;
 }}
 .question-card:hover {{ box-shadow: 0 2px 8px rgba(0,0,0,0.08); }}
+/* Windowed card whose content is not in the DOM; height is an estimate until measured */
+.question-card.q-shell {{ height: 160px; }}
 
 .question-header {{
   display: flex;
@@ -1136,6 +1220,17 @@ body {{
   text-transform: uppercase;
   letter-spacing: 0.3px;
 }}
+.question-header-actions {{ display: flex; align-items: center; gap: 6px; }}
+.q-history-btn {{
+  font-size: 10px;
+  padding: 2px 6px;
+  border: 1px solid var(--border);
+  border-radius: 4px;
+  background: none;
+  color: var(--text-light);
+  cursor: pointer;
+}}
+.q-history-btn:hover {{ color: var(--green-primary); border-color: var(--green-primary); }}
 .q-descriptive-badge {{ background: #F1F8E9; color: #33691E; }}
 .q-data-badge {{ background: #E3F2FD; color: #1565C0; }}
 .q-condition-badge {{ background: #EDE7F6; color: #4A148C; }}
@@ -1182,6 +1277,9 @@ body {{
   box-shadow: 0 0 0 2px rgba(31,78,40,0.15);
 }}
 .data-input {{ background: #FAFBFF; }}
+.unit-hint {{ font-size: 11px; color: var(--text-light); margin-top: 4px; }}
+.unit-hint:empty {{ display: none; }}
+.unit-hint.unit-warn {{ color: #E65100; }}
 
 .data-note {{
   font-size: 12px;
@@ -1514,6 +1612,7 @@ body.review-mode .gaps-panel {{ display: block; }}
 }}
 .gaps-list li:hover {{ color: var(--green-primary); }}
 .gaps-list li:last-child {{ border-bottom: none; }}
+.gaps-list li.gaps-list-group {{ font-weight: 600; color: var(--text-light); cursor: default; padding-top: 12px; }}
 .gaps-list-ref {{
   font-family: monospace;
   font-weight: 600;
@@ -1553,6 +1652,9 @@ body.review-mode .gaps-panel {{ display: block; }}
 .history-header h3 {{ font-size: 16px; }}
 .history-close {{ background: none; border: none; font-size: 20px; cursor: pointer; color: var(--text-light); }}
 .history-body {{ flex: 1; overflow-y: auto; padding: 16px 24px; }}
+.history-usage {{ padding: 8px 24px; font-size: 12px; color: var(--text-light); border-bottom: 1px solid var(--border); }}
+.history-usage:empty {{ display: none; }}
+.history-notice {{ color: #E65100; }}
 .history-entry {{ padding: 12px 0; border-bottom: 1px solid var(--border); }}
 .history-entry:last-child {{ border-bottom: none; }}
 .history-time {{ font-size: 11px; color: var(--text-light); margin-bottom: 4px; }}
@@ -1570,9 +1672,22 @@ body.review-mode .gaps-panel {{ display: block; }}
   margin-top: 6px;
 }}
 .history-restore:hover {{ background: var(--green-mid); }}
+.history-all {{ background: none; border: none; color: var(--green-primary); font-size: 12px; cursor: pointer; text-decoration: underline; }}
+.history-more {{ height: 1px; }}
 .history-empty {{ text-align: center; padding: 40px; color: var(--text-light); font-size: 14px; }}
 .autosave-indicator {{ font-size: 11px; opacity: 0.6; transition: opacity 0.3s; }}
 .autosave-indicator.saving {{ opacity: 1; }}
+.autosave-indicator.error {{ opacity: 1; font-weight: 600; }}
+
+/* ── Diagnostics panel (Ctrl/Cmd+Shift+D or #diagnostics) ── */
+.diag-panel {{ width: 760px; }}
+.diag-table {{ width: 100%; border-collapse: collapse; font-size: 12px; margin-bottom: 16px; }}
+.diag-table th, .diag-table td {{ padding: 4px 6px; border-bottom: 1px solid var(--border); text-align: right; }}
+.diag-table th:first-child, .diag-table td:first-child {{ text-align: left; font-family: monospace; }}
+.diag-table th {{ color: var(--text-light); font-weight: 600; }}
+.diag-section {{ font-size: 13px; font-weight: 700; margin: 4px 0 8px; }}
+.diag-meta {{ font-size: 11px; color: var(--text-light); margin-bottom: 12px; }}
+.diag-actions {{ display: flex; gap: 8px; }}
 
 /* ── Dark mode toggle ── */
 .dark-toggle {{
@@ -1741,6 +1856,7 @@ html.dark .search-result-text mark {{
   <span class="subtitle">Submission Forms</span>
   <div class="header-actions">
     <span class="autosave-indicator" id="autosave-indicator">Saved</span>
+    <span class="autosave-indicator sync-indicator" id="sync-indicator" hidden></span>
     <button class="header-btn" onclick="showDashboard()">Dashboard</button>
     <button class="header-btn" id="review-btn" onclick="toggleReview()">Review</button>
     <button class="header-btn" onclick="showHistory()">History</button>
@@ -1793,6 +1909,12 @@ html.dark .search-result-text mark {{
       </div>
     </div>
 
+    <div class="gaps-panel" id="all-gaps">
+      <h3>Unanswered Questions — All Credits</h3>
+      <div class="gaps-count" id="all-gaps-count"></div>
+      <ul class="gaps-list" id="all-gaps-list"></ul>
+    </div>
+
     <div class="dash-grid">
       {dashboard_cards}
     </div>
@@ -1820,8 +1942,8 @@ html.dark .search-result-text mark {{
       </div>
       <div class="export-option" onclick="importResponses()">
         <div class="export-option-icon" style="color:#1565C0">&#128229;</div>
-        <div class="export-option-label">Import JSON</div>
-        <div class="export-option-desc">Restore a previous session from exported JSON</div>
+        <div class="export-option-label">Import</div>
+        <div class="export-option-desc">Restore responses from an exported JSON (.json, .json.gz) or Excel file</div>
       </div>
     </div>
     <div class="modal-actions">
@@ -1834,37 +1956,235 @@ html.dark .search-result-text mark {{
 <div class="save-toast" id="save-toast">Responses saved to browser storage.</div>
 
 <!-- Hidden file input for import -->
-<input type="file" id="import-file" accept=".json" style="display:none" onchange="handleImport(event)">
+<input type="file" id="import-file" accept=".json,.gz,.xlsx,application/json,application/gzip" style="display:none" onchange="handleImport(event)">
 
 <!-- Version history modal -->
 <div class="history-overlay" id="history-overlay" onclick="if(event.target===this)closeHistory()">
   <div class="history-panel">
     <div class="history-header">
-      <h3>Version History</h3>
+      <h3 id="history-title">Version History</h3>
       <button class="history-close" onclick="closeHistory()">&times;</button>
     </div>
+    <div class="history-usage" id="history-usage"></div>
     <div class="history-body" id="history-body">
       <div class="history-empty">No history yet. Changes are tracked as you work.</div>
     </div>
   </div>
 </div>
 
+<!-- Diagnostics panel (hidden; Ctrl/Cmd+Shift+D) -->
+<div class="history-overlay" id="diag-overlay" onclick="if(event.target===this)closeDiagnostics()">
+  <div class="history-panel diag-panel">
+    <div class="history-header">
+      <h3>Performance Diagnostics</h3>
+      <button class="history-close" onclick="closeDiagnostics()">&times;</button>
+    </div>
+    <div class="history-body" id="diag-body"></div>
+    <div class="history-header diag-actions">
+      <button class="modal-btn" onclick="renderDiagnostics()">Refresh</button>
+      <button class="modal-btn" onclick="perfReset();renderDiagnostics()">Reset timings</button>
+      <button class="modal-btn primary" onclick="downloadDiagnostics()">Download JSON</button>
+    </div>
+  </div>
+</div>
+
 <script>
 // ── Conditional rules ──
 const CONDITIONAL_RULES = {conditional_rules_json};
 
+// ── Project seed ──
+// Sites generated with --seeds carry their project's known answers, filled
+// into empty fields on first open. They keep their answers under storage keys
+// of their own, so project sites opened from one origin never share answers.
+const SEED = {seed_json};
+const STORE_PREFIX = SEED.project ? `greenstar_${{SEED.project}}_` : 'greenstar_';
+
 // ── State ──
+let currentCredit = null;
 let wizardCredits = {{}};  // creditId -> {{ active: bool, step: int }}
 let naCredits = new Set();
 let versionHistory = [];
 let lastSnapshot = {{}};
 
+// ── Answer model ──
+// `answers` is the source of truth for responses; the inputs mirror it. Cards
+// of windowed credits only have their inputs in the DOM while near the
+// viewport, so progress, review, save and export read the model instead.
+let answers = {{}};
+const inputEls = {{}};
+let questionIndex = null;
+
+function questionMap() {{
+  if (!questionIndex) {{
+    questionIndex = {{}};
+    CREDITS_DATA.forEach(c => c.sections.forEach(s => s.criteria.forEach(cr => cr.questions.forEach(q => {{
+      questionIndex[q.input_id] = q;
+    }}))));
+  }}
+  return questionIndex;
+}}
+
+function inputEl(id) {{
+  return inputEls[id] || (inputEls[id] = document.getElementById(id));
+}}
+
+function isAnswered(id) {{
+  const val = answers[id];
+  return !!(val && val.trim());
+}}
+
+function setAnswer(id, val) {{
+  answers[id] = val;
+  const el = inputEl(id);
+  if (el) el.value = val;
+  rollupQuestion(id);
+  if (UNIT_EXPECT[id]) checkUnits(id);
+}}
+
+function collectResponses() {{
+  const data = {{}};
+  for (const id in questionMap()) data[id] = answers[id] || '';
+  return data;
+}}
+
+// ── Unit checks ──
+// Data answers are read with the unit table of units.py. Questions whose text
+// asks for a measurable value (UNIT_EXPECT: input id -> dimensions) show what
+// was recognised under the input, or which unit was expected.
+const UNITS = {units_json};
+const UNIT_EXPECT = {unit_expect_json};
+const QUANTITY_RE = /(?<cur>\\$|a\\$)?\\s*(?<num>[-+]?(?:\\d{{1,3}}(?:,\\d{{3}})+|\\d+)(?:\\.\\d+)?|[-+]?\\.\\d+)(?![\\d,]*\\d)(?:\\s*(?<mult>thousand|million|billion|mil\\b|[kmb]\\b))?(?:\\s*(?<unit>%|[a-z$][a-z0-9$]*(?:-e)?(?:\\([a-z]\\))?(?:\\s*(?:\\/|\\bper\\b)\\s*[a-z][a-z0-9]*|\\s+pa\\b)*))?/gi;
+
+function foldUnits(text) {{
+  return text.replace(/²/g, '2').replace(/³/g, '3').replace(/₂/g, '2').replace(/ /g, ' ')
+    .replace(/[–—‑]/g, '-').replace(/\\bper\\s*cent\\b/gi, '%');
+}}
+
+function unitKey(unit) {{
+  unit = unit.trim();
+  if (UNITS.cased[unit]) return unit;
+  const key = unit.toLowerCase().replace(/[ ()]/g, '');
+  return key.endsWith('-e') ? key.slice(0, -2) + 'e' : key;
+}}
+
+function parseUnit(unit) {{
+  const parts = unit.split(/\\s*(?:\\/|\\bper\\b)\\s*|\\s+(?=pa\\b)/i);
+  const head = UNITS.units[unitKey(parts[0])] || UNITS.cased[parts[0].trim()];
+  if (!head) return null;
+  let [dim, factor] = head;
+  const per = [];
+  for (const part of parts.slice(1)) {{
+    const den = UNITS.per[unitKey(part)];
+    if (!den) return null;
+    per.push(den[0]);
+    factor *= den[1];
+  }}
+  return [dim, factor, per];
+}}
+
+// [value in the canonical unit, dimension, unit, matched text] per quantity
+function quantities(text) {{
+  const out = [];
+  for (const m of foldUnits(text || '').matchAll(QUANTITY_RE)) {{
+    const g = m.groups;
+    let value = parseFloat(g.num.replace(/,/g, ''));
+    let mult = g.mult, unit = (g.unit || '').trim();
+    if (mult && mult.toLowerCase() === 'm' && !unit && !g.cur) {{
+      unit = 'm';
+      mult = null;
+    }}
+    if (mult) value *= UNITS.multipliers[mult.toLowerCase()];
+    let parsed = unit ? parseUnit(unit) : null;
+    if (!parsed && g.cur) parsed = ['currency', 1, []];
+    if (!parsed) {{
+      out.push([value, 'count', unit && !/^\\d/.test(unit) ? unit : '', m[0].trim()]);
+      continue;
+    }}
+    out.push([value * parsed[1], [parsed[0], ...parsed[2]].join('/'), unit || '$', m[0].trim()]);
+  }}
+  return out;
+}}
+
+// [quantity or null, status] as units.normalize
+function normalizeAnswer(text, expected) {{
+  if (!(text || '').trim()) return [null, 'empty'];
+  const found = quantities(text);
+  if (!found.length) return [null, 'no-number'];
+  const bare = found.find(q => q[1] === 'count' && !q[2]);
+  const match = found.find(q => expected.includes(q[1].split('/')[0]));
+  if (match) return [match, 'ok'];
+  const dim = bare && expected.find(d => d in UNITS.bare);
+  if (dim) return [[dim === 'ratio' ? bare[0] * 0.01 : bare[0], dim, UNITS.bare[dim], bare[3]], 'ok'];
+  return [null, bare && found.every(q => q[1] === 'count') ? 'no-unit' : 'mismatch'];
+}}
+
+// Portfolio quantiles of measured answers (portfolio_store.py benchmarks):
+// input id -> {{dimension: [projects, sorted values or evenly spaced quantiles]}}
+const BENCHMARKS = {benchmarks_json};
+
+function lowerBound(xs, v) {{
+  let lo = 0, hi = xs.length;
+  while (lo < hi) {{
+    const mid = (lo + hi) >> 1;
+    if (xs[mid] < v) lo = mid + 1; else hi = mid;
+  }}
+  return lo;
+}}
+
+// Percentile (0-100) of value v within one benchmark column
+function benchmarkPercentile(v, [count, xs]) {{
+  const lo = lowerBound(xs, v);
+  let hi = lo;
+  while (hi < xs.length && xs[hi] === v) hi++;
+  // Every value kept: mid-rank of v among them
+  if (xs.length === count) return 100 * (lo + hi) / 2 / count;
+  // Quantile sketch: xs[i] is the i/(m-1) quantile, interpolate between them
+  const last = xs.length - 1;
+  if (hi === 0) return 0;
+  if (lo > last) return 100;
+  if (lo < hi) return 100 * (lo + hi - 1) / 2 / last;
+  return 100 * (lo - 1 + (v - xs[lo - 1]) / (xs[lo] - xs[lo - 1])) / last;
+}}
+
+function ordinal(n) {{
+  const tens = n % 100;
+  if (tens >= 11 && tens <= 13) return n + 'th';
+  return n + (['th', 'st', 'nd', 'rd'][n % 10] || 'th');
+}}
+
+function checkUnits(id) {{
+  const hint = document.getElementById(id + '-units');
+  if (!hint) return;
+  const expected = UNIT_EXPECT[id];
+  const [q, status] = normalizeAnswer(answers[id], expected);
+  const want = UNITS.dimensions[expected[0]];
+  let text = '';
+  if (status === 'ok') {{
+    const base = q[1].split('/')[0];
+    text = `✓ ${{q[3]}}${{q[2] && !q[3].includes(q[2]) ? ' ' + q[2] : ''}} read as ${{UNITS.dimensions[base][1]}}${{q[1].includes('/') ? ' rate' : ''}}`;
+    const column = BENCHMARKS[id] && BENCHMARKS[id][q[1]];
+    if (column) {{
+      const pct = Math.min(99, Math.max(1, Math.round(benchmarkPercentile(q[0], column))));
+      text += ` · ${{ordinal(pct)}} percentile of ${{column[0].toLocaleString()}} projects`;
+    }}
+  }} else if (status === 'no-unit') {{
+    text = `Add a unit: expected ${{want[1]}} (e.g. ${{want[2]}})`;
+  }} else if (status !== 'empty') {{
+    text = `Expected ${{want[1]}} (e.g. ${{want[2]}})`;
+  }}
+  hint.textContent = text;
+  hint.classList.toggle('unit-warn', status !== 'ok' && status !== 'empty');
+}}
+
 // ── Navigation ──
 function showCredit(id) {{
   document.querySelectorAll('.credit-page').forEach(p => p.style.display = 'none');
   document.getElementById('dashboard').style.display = 'none';
   const page = document.getElementById(id);
+  currentCredit = page ? id : null;
   if (page) {{
+    // Progress still waiting for idle time is brought up to date first
+    if (idleCredits.delete(id)) updateProgress(id);
     page.style.display = 'block';
     document.getElementById('main-content').scrollTop = 0;
   }}
@@ -1873,6 +2193,7 @@ function showCredit(id) {{
   if (item) item.classList.add('active');
   document.getElementById('sidebar').classList.remove('open');
   if (wizardCredits[id] && wizardCredits[id].active) renderWizard(id);
+  if (reviewMode) renderReview();
 }}
 
 function showDashboard() {{
@@ -1881,7 +2202,9 @@ function showDashboard() {{
   document.getElementById('main-content').scrollTop = 0;
   document.querySelectorAll('.sidebar-item').forEach(i => i.classList.remove('active'));
   document.querySelector('.sidebar-item[data-credit="dashboard"]').classList.add('active');
+  currentCredit = null;
   updateDashboard();
+  if (reviewMode) renderReview();
   document.getElementById('sidebar').classList.remove('open');
 }}
 
@@ -1897,18 +2220,18 @@ function toggleNA(creditId, event) {{
   const isNA = page.classList.toggle('credit-na');
   if (sidebar) sidebar.classList.toggle('credit-na', isNA);
   if (isNA) {{ naCredits.add(creditId); }} else {{ naCredits.delete(creditId); }}
+  rollupSetNA(creditId, isNA);
   saveNAState();
-  updateDashboard();
-  updateAllProgress();
+  scheduleUpdate(creditId);
 }}
 
 function saveNAState() {{
-  localStorage.setItem('greenstar_na_credits', JSON.stringify([...naCredits]));
+  localStorage.setItem(STORE_PREFIX + 'na_credits', JSON.stringify([...naCredits]));
 }}
 
 function loadNAState() {{
   try {{
-    const raw = localStorage.getItem('greenstar_na_credits');
+    const raw = localStorage.getItem(STORE_PREFIX + 'na_credits');
     if (!raw) return;
     const arr = JSON.parse(raw);
     arr.forEach(id => {{
@@ -1926,10 +2249,8 @@ function applyConditionalRules() {{
   for (const [inputId, rule] of Object.entries(CONDITIONAL_RULES)) {{
     const card = document.getElementById('card-' + inputId);
     if (!card) continue;
-    const gateway = document.getElementById(rule.depends_on);
-    if (!gateway) continue;
-    const gatewayVal = gateway.value;
-    const shouldShow = gatewayVal === rule.show_when;
+    rollupQuestion(inputId);
+    const shouldShow = questionVisible(inputId);
     if (shouldShow) {{
       if (card.classList.contains('q-hidden')) {{
         card.classList.remove('q-hidden');
@@ -1942,45 +2263,183 @@ function applyConditionalRules() {{
   }}
 }}
 
+// ── UI update scheduler ──
+// Answer events only record which credits changed. The next animation frame
+// recomputes everything once: conditional visibility first (a gateway answer
+// must show or hide its follow-ups in the same frame), then the sidebar rings,
+// the progress of the page on screen and any active wizard. Progress bars of
+// pages that are not displayed wait for an idle callback.
+const GATEWAY_IDS = new Set(Object.values(CONDITIONAL_RULES).map(r => r.depends_on));
+const dirtyCredits = new Set();
+const idleCredits = new Set();
+let rulesDirty = false;
+let frameQueued = false;
+let idleQueued = false;
+
+function scheduleUpdate(creditId, visibility) {{
+  if (creditId) dirtyCredits.add(creditId);
+  else document.querySelectorAll('.credit-page').forEach(p => dirtyCredits.add(p.id));
+  if (visibility) rulesDirty = true;
+  if (!frameQueued) {{
+    frameQueued = true;
+    requestAnimationFrame(() => flushUpdates());
+  }}
+}}
+
+function flushUpdates() {{
+  frameQueued = false;
+  if (rulesDirty) {{
+    rulesDirty = false;
+    applyConditionalRules();
+  }}
+  dirtyCredits.forEach(id => {{
+    updateSidebarRing(id);
+    const page = document.getElementById(id);
+    if (page && page.style.display === 'block') {{
+      updateProgress(id);
+      if (wizardCredits[id] && wizardCredits[id].active) renderWizard(id);
+    }} else {{
+      idleCredits.add(id);
+    }}
+  }});
+  dirtyCredits.clear();
+  if (document.getElementById('dashboard').style.display !== 'none') updateDashboard();
+  if (reviewMode && reviewDirty) renderReview();
+  queueIdleUpdates();
+}}
+
+function queueIdleUpdates() {{
+  if (!idleCredits.size || idleQueued) return;
+  idleQueued = true;
+  const idle = window.requestIdleCallback || (fn => setTimeout(fn, 50));
+  idle(flushIdleUpdates, {{ timeout: 1000 }});
+}}
+
+function flushIdleUpdates(deadline) {{
+  idleQueued = false;
+  for (const id of idleCredits) {{
+    // Yield back to the browser when the idle period runs out
+    if (deadline && !deadline.didTimeout && deadline.timeRemaining() < 2) break;
+    idleCredits.delete(id);
+    updateProgress(id);
+  }}
+  queueIdleUpdates();
+}}
+
+// ── Progress rollups ──
+// question -> criteria -> level -> credit -> category -> total. Each node keeps
+// visible/answered counts and a question change moves its ancestors by the
+// delta, so no progress display ever rescans cards. N/A credits keep their own
+// counts but are cut off from their category and the total. The same pass keeps
+// gapIndex, the visible unanswered questions of each credit, for review mode.
+const rollupTotal = {{ visible: 0, answered: 0, parent: null }};
+const rollupCats = {{}};
+const rollupCredits = {{}};
+const rollupLeaves = {{}};  // inputId -> {{ node, credit, order, visible, answered }}
+const gapIndex = {{}};  // creditId -> Set of inputIds
+
+function rollupNode(parent, el) {{
+  return {{ visible: 0, answered: 0, parent: parent, el: el }};
+}}
+
+function buildRollups() {{
+  let order = 0;
+  CREDITS_DATA.forEach(credit => {{
+    const cat = rollupCats[credit.category] || (rollupCats[credit.category] = rollupNode(rollupTotal));
+    const cn = rollupCredits[credit.id] = rollupNode(cat);
+    cn.credit = credit.id;
+    cn.headers = [];
+    credit.sections.forEach((s, si) => {{
+      const level = rollupNode(cn, `${{credit.id}}-l${{si}}-rollup`);
+      cn.headers.push(level);
+      s.criteria.forEach((cr, ci) => {{
+        const crit = rollupNode(level, `${{credit.id}}-l${{si}}-c${{ci}}-rollup`);
+        cn.headers.push(crit);
+        cr.questions.forEach(q => {{
+          rollupLeaves[q.input_id] = {{ node: crit, credit: credit.id, order: order++, visible: false, answered: false }};
+          rollupQuestion(q.input_id);
+        }});
+      }});
+    }});
+  }});
+}}
+
+function rollupAdd(node, dv, da) {{
+  for (; node; node = node.parent) {{
+    node.visible += dv;
+    node.answered += da;
+    if (node.credit && naCredits.has(node.credit)) break;
+  }}
+}}
+
+function questionVisible(id) {{
+  const rule = CONDITIONAL_RULES[id];
+  return !rule || (answers[rule.depends_on] || '') === rule.show_when;
+}}
+
+function rollupQuestion(id) {{
+  const leaf = rollupLeaves[id];
+  if (!leaf) return;
+  const visible = questionVisible(id);
+  const done = isAnswered(id);
+  const answered = visible && done;
+  if (visible === leaf.visible && answered === leaf.answered) return;
+  rollupAdd(leaf.node, visible - leaf.visible, answered - leaf.answered);
+  leaf.visible = visible;
+  leaf.answered = answered;
+  const gaps = gapIndex[leaf.credit] || (gapIndex[leaf.credit] = new Set());
+  if (visible && !answered) gaps.add(id);
+  else gaps.delete(id);
+  reviewDirty = true;
+  const card = document.getElementById('card-' + id);
+  if (card) {{
+    card.classList.toggle('q-answered', answered);
+    if (done) card.classList.remove('q-unanswered-warn');
+  }}
+}}
+
+function rollupSetNA(creditId, isNA) {{
+  const cn = rollupCredits[creditId];
+  if (!cn) return;
+  const sign = isNA ? -1 : 1;
+  rollupAdd(cn.parent, sign * cn.visible, sign * cn.answered);
+  reviewDirty = true;
+}}
+
+function renderRollup(node) {{
+  const el = document.getElementById(node.el);
+  if (!el) return;
+  el.textContent = node.visible ? `${{node.answered}} / ${{node.visible}}` : '';
+  el.classList.toggle('complete', node.visible > 0 && node.answered === node.visible);
+  // Review mode shows only the headers above answered questions
+  el.parentElement.classList.toggle('has-answers', node.answered > 0);
+}}
+
 // ── Unified answer handler ──
-function onAnswer(creditId) {{
-  applyConditionalRules();
-  updateProgress(creditId);
-  updateSidebarRing(creditId);
+function onAnswer(creditId, inputId) {{
+  journalEdit(inputId);
+  syncEdit(inputId);
+  rollupQuestion(inputId);
+  if (UNIT_EXPECT[inputId]) checkUnits(inputId);
+  scheduleUpdate(creditId, GATEWAY_IDS.has(inputId));
   // Update autosave indicator
   const indicator = document.getElementById('autosave-indicator');
   indicator.textContent = 'Unsaved';
   indicator.classList.add('saving');
   clearTimeout(window._saveTimer);
   window._saveTimer = setTimeout(() => {{
+    window._saveTimer = null;
     saveAllResponses();
-    indicator.textContent = 'Saved';
-    indicator.classList.remove('saving');
   }}, 2000);
-  // Update wizard if active
-  if (wizardCredits[creditId] && wizardCredits[creditId].active) renderWizard(creditId);
 }}
 
 // ── Progress tracking (only counts visible, non-N/A questions) ──
 function updateProgress(creditId) {{
   const page = document.getElementById(creditId);
-  if (!page || page.classList.contains('credit-na')) return;
-  const cards = page.querySelectorAll('.question-card');
-  let visible = 0, answered = 0;
-  cards.forEach(card => {{
-    if (card.classList.contains('q-hidden')) return;
-    visible++;
-    const input = card.querySelector('select, textarea');
-    if (!input) return;
-    const val = input.tagName === 'SELECT' ? input.value : input.value.trim();
-    if (val) {{
-      answered++;
-      card.classList.add('q-answered');
-      card.classList.remove('q-unanswered-warn');
-    }} else {{
-      card.classList.remove('q-answered');
-    }}
-  }});
+  const node = rollupCredits[creditId];
+  if (!page || !node || page.classList.contains('credit-na')) return;
+  const {{ visible, answered }} = node;
+  node.headers.forEach(renderRollup);
   const pct = visible > 0 ? (answered / visible) * 100 : 0;
   const bar = document.getElementById(`${{creditId}}-progress`);
   const text = document.getElementById(`${{creditId}}-progress-text`);
@@ -1989,18 +2448,9 @@ function updateProgress(creditId) {{
 }}
 
 function updateSidebarRing(creditId) {{
-  const page = document.getElementById(creditId);
-  if (!page) return;
-  const cards = page.querySelectorAll('.question-card');
-  let visible = 0, answered = 0;
-  cards.forEach(card => {{
-    if (card.classList.contains('q-hidden')) return;
-    visible++;
-    const input = card.querySelector('select, textarea');
-    if (!input) return;
-    const val = input.tagName === 'SELECT' ? input.value : input.value.trim();
-    if (val) answered++;
-  }});
+  const node = rollupCredits[creditId];
+  if (!node) return;
+  const {{ visible, answered }} = node;
   const pct = visible > 0 ? answered / visible : 0;
   const ring = document.querySelector(`#ring-${{creditId}} .ring-fill`);
   if (ring) {{
@@ -2009,49 +2459,14 @@ function updateSidebarRing(creditId) {{
   }}
 }}
 
-function updateAllProgress() {{
-  document.querySelectorAll('.credit-page').forEach(page => {{
-    updateProgress(page.id);
-    updateSidebarRing(page.id);
-  }});
-}}
-
 function updateDashboard() {{
-  let totalVisible = 0, totalAnswered = 0;
-  document.querySelectorAll('.credit-page').forEach(page => {{
-    if (page.classList.contains('credit-na')) return;
-    page.querySelectorAll('.question-card').forEach(card => {{
-      if (card.classList.contains('q-hidden')) return;
-      totalVisible++;
-      const input = card.querySelector('select, textarea');
-      if (!input) return;
-      const val = input.tagName === 'SELECT' ? input.value : input.value.trim();
-      if (val) totalAnswered++;
-    }});
-  }});
-
+  const {{ visible: totalVisible, answered: totalAnswered }} = rollupTotal;
+  const cats = rollupCats;
   document.getElementById('dash-answered').textContent = totalAnswered;
   document.getElementById('dash-pct').textContent = (totalVisible > 0 ? Math.round((totalAnswered / totalVisible) * 100) : 0) + '%';
 
-  const catMap = {json.dumps({cat: [c["sheet_name"] for c in all_credits if c["category"] == cat] for cat in CATEGORIES})};
-  const creditMap = {json.dumps({c["sheet_name"]: {"id": f"credit-{i}", "count": len(c["questions"])} for i, c in enumerate(all_credits)})};
-
-  for (const [cat, sheets] of Object.entries(catMap)) {{
-    let catVisible = 0, catAnswered = 0;
-    sheets.forEach(s => {{
-      const info = creditMap[s];
-      if (!info) return;
-      const page = document.getElementById(info.id);
-      if (!page || page.classList.contains('credit-na')) return;
-      page.querySelectorAll('.question-card').forEach(card => {{
-        if (card.classList.contains('q-hidden')) return;
-        catVisible++;
-        const input = card.querySelector('select, textarea');
-        if (!input) return;
-        const val = input.tagName === 'SELECT' ? input.value : input.value.trim();
-        if (val) catAnswered++;
-      }});
-    }});
+  for (const cat of {json.dumps(list(CATEGORIES))}) {{
+    const {{ visible: catVisible, answered: catAnswered }} = cats[cat] || {{ visible: 0, answered: 0 }};
     const pct = catVisible > 0 ? Math.round((catAnswered / catVisible) * 100) : 0;
     const bar = document.getElementById(`dash-${{cat.toLowerCase()}}-bar`);
     const pctEl = document.getElementById(`dash-${{cat.toLowerCase()}}-pct`);
@@ -2100,7 +2515,7 @@ function renderWizard(creditId) {{
   if (wiz.step < 0) wiz.step = 0;
   const page = document.getElementById(creditId);
   page.querySelectorAll('.question-card').forEach(c => c.classList.remove('wizard-current'));
-  cards[wiz.step].classList.add('wizard-current');
+  attachCard(cards[wiz.step]).classList.add('wizard-current');
   const stepText = document.getElementById(creditId + '-wizard-step');
   if (stepText) stepText.textContent = `${{wiz.step + 1}} / ${{cards.length}}`;
   // Scroll card into view
@@ -2121,142 +2536,662 @@ function wizardPrev(creditId) {{
 }}
 
 // ── Review mode with validation ──
+// Gap lists are rendered from gapIndex: only the list on screen (the current
+// credit's, or the all-credits list on the dashboard) is built, and only again
+// once an answer, visibility or N/A change has touched the index.
 let reviewMode = false;
+let reviewDirty = true;
+const reviewRendered = new Set();
+
 function toggleReview() {{
   reviewMode = !reviewMode;
   document.body.classList.toggle('review-mode', reviewMode);
   document.getElementById('review-btn').classList.toggle('review-active', reviewMode);
-
   if (reviewMode) {{
-    document.querySelectorAll('.credit-page').forEach(page => {{
-      if (page.classList.contains('credit-na')) return;
-      const body = page.querySelector('.credit-body');
-      if (!body) return;
-
-      // Build gaps list
-      const gapsList = document.getElementById(page.id + '-gaps-list');
-      const gapsCount = document.getElementById(page.id + '-gaps-count');
-      if (!gapsList) return;
-      gapsList.innerHTML = '';
-      let gaps = 0;
-
-      // Mark unanswered visible questions
-      page.querySelectorAll('.question-card').forEach(card => {{
-        if (card.classList.contains('q-hidden')) return;
-        const input = card.querySelector('select, textarea');
-        if (!input) return;
-        const val = input.tagName === 'SELECT' ? input.value : input.value.trim();
-        if (!val) {{
-          card.classList.add('q-unanswered-warn');
-          gaps++;
-          const ref = card.querySelector('.question-ref');
-          const qtext = card.querySelector('.question-text');
-          const li = document.createElement('li');
-          li.innerHTML = `<span class="gaps-list-ref">${{ref ? ref.textContent : ''}}</span>${{qtext ? qtext.textContent.substring(0, 80) + '...' : ''}}`;
-          li.onclick = function() {{
-            toggleReview();
-            card.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
-          }};
-          gapsList.appendChild(li);
-        }}
-      }});
-
-      if (gapsCount) gapsCount.textContent = gaps > 0 ? `${{gaps}} question${{gaps > 1 ? 's' : ''}} still need${{gaps > 1 ? '' : 's'}} a response` : 'All questions answered!';
-
-      // Mark headers with answers
-      let currentHeaders = [];
-      Array.from(body.children).forEach(el => {{
-        if (el.classList.contains('level-header') || el.classList.contains('criteria-header')) {{
-          el.classList.remove('has-answers');
-          currentHeaders.push(el);
-        }} else if (el.classList.contains('question-card') && (el.classList.contains('q-answered') || el.classList.contains('q-unanswered-warn'))) {{
-          currentHeaders.forEach(h => h.classList.add('has-answers'));
-        }}
-      }});
-    }});
+    renderReview();
   }} else {{
     // Clear warning highlights
     document.querySelectorAll('.q-unanswered-warn').forEach(c => c.classList.remove('q-unanswered-warn'));
   }}
 }}
 
-// ── Save / Load ──
-function saveAllResponses() {{
-  const data = {{}};
-  document.querySelectorAll('[data-credit]').forEach(el => {{
-    if (el.id) data[el.id] = el.tagName === 'SELECT' ? el.value : el.value;
+function creditGaps(creditId) {{
+  const gaps = gapIndex[creditId];
+  return gaps ? [...gaps].sort((a, b) => rollupLeaves[a].order - rollupLeaves[b].order) : [];
+}}
+
+function gapItem(id, creditId) {{
+  const q = questionById(id);
+  return `<li data-action="review-gap" data-credit-id="${{creditId}}" data-card-id="card-${{id}}">` +
+    `<span class="gaps-list-ref">${{escapeHtml(q.ref)}}</span>${{escapeHtml(q.question.substring(0, 80))}}...</li>`;
+}}
+
+function gapsCountText(gaps) {{
+  return gaps > 0 ? `${{gaps}} question${{gaps > 1 ? 's' : ''}} still need${{gaps > 1 ? '' : 's'}} a response` : 'All questions answered!';
+}}
+
+function renderCreditGaps(creditId) {{
+  const list = document.getElementById(creditId + '-gaps-list');
+  const count = document.getElementById(creditId + '-gaps-count');
+  if (!list) return;
+  const gaps = creditGaps(creditId);
+  list.innerHTML = gaps.map(id => gapItem(id, creditId)).join('');
+  if (count) count.textContent = gapsCountText(gaps.length);
+}}
+
+function renderAllGaps() {{
+  let html = '', total = 0, lastCategory = null;
+  CREDITS_DATA.forEach(c => {{
+    if (naCredits.has(c.id)) return;
+    const gaps = creditGaps(c.id);
+    if (!gaps.length) return;
+    if (c.category !== lastCategory) {{
+      html += `<li class="gaps-list-group">${{escapeHtml(c.category)}}</li>`;
+      lastCategory = c.category;
+    }}
+    total += gaps.length;
+    html += gaps.map(id => gapItem(id, c.id)).join('');
   }});
+  document.getElementById('all-gaps-list').innerHTML = html;
+  document.getElementById('all-gaps-count').textContent = gapsCountText(total);
+}}
+
+function renderReview() {{
+  if (reviewDirty) {{
+    reviewRendered.clear();
+    reviewDirty = false;
+  }}
+  const key = currentCredit || 'all';
+  if (reviewRendered.has(key)) return;
+  reviewRendered.add(key);
+  if (currentCredit) renderCreditGaps(currentCredit);
+  else renderAllGaps();
+}}
+
+function goToGap(creditId, cardId) {{
+  if (reviewMode) toggleReview();
+  goToQuestion(creditId, cardId);
+  const card = document.getElementById(cardId);
+  if (card) card.classList.add('q-unanswered-warn');
+}}
+
+// ── Storage encoding ──
+// Responses and history are stored as version 2 payloads: answers keyed by
+// their question's position in the generated model instead of the full input
+// id, empty answers left out, and history snapshots stored only where they
+// cannot be rebuilt from the previous snapshot plus the entry's changes.
+// Payloads carry a hash of the model's id list; the id tables of models
+// still referenced from storage are kept under greenstar_model, so data
+// written by an older build of the page still decodes (front-coded: each id
+// as the length it shares with the previous id, ":", and the rest). Large
+// payloads are
+// gzip-compressed with CompressionStream where available and packed 15 bits
+// per UTF-16 code unit ("Z<bytes>:<packed>"); anything else is plain JSON.
+const STORE_KEYS = ['responses', 'history', 'journal'].map(k => STORE_PREFIX + k);
+const MODEL_KEY = STORE_PREFIX + 'model';
+const COMPRESS_MIN = 4096;  // characters of JSON
+const payloadHashes = {{}};  // storage key -> model hash of the stored payload
+const writeSeq = {{}};
+const storeWrites = {{}};  // storage key -> Promise of its latest write
+let modelInfo = null;
+
+function model() {{
+  if (!modelInfo) {{
+    const ids = Object.keys(questionMap());
+    const index = {{}};
+    ids.forEach((id, i) => {{ index[id] = i; }});
+    // FNV-1a over the id list
+    let h = 0x811c9dc5;
+    const text = ids.join('|');
+    for (let i = 0; i < text.length; i++) {{
+      h ^= text.charCodeAt(i);
+      h = Math.imul(h, 0x01000193);
+    }}
+    modelInfo = {{ ids: ids, index: index, hash: (h >>> 0).toString(36) }};
+  }}
+  return modelInfo;
+}}
+
+function modelTables() {{
   try {{
-    // Track version history (diff against last snapshot)
-    recordHistory(data);
-    localStorage.setItem('greenstar_responses', JSON.stringify(data));
-    const indicator = document.getElementById('autosave-indicator');
+    return JSON.parse(localStorage.getItem(MODEL_KEY)) || {{}};
+  }} catch(e) {{
+    return {{}};
+  }}
+}}
+
+function frontCode(ids) {{
+  let prev = '';
+  return ids.map(id => {{
+    let n = 0;
+    while (n < prev.length && prev[n] === id[n]) n++;
+    prev = id;
+    return n.toString(36) + ':' + id.slice(n);
+  }}).join('|');
+}}
+
+function frontDecode(text) {{
+  let prev = '';
+  return text.split('|').map(part => {{
+    const colon = part.indexOf(':');
+    prev = prev.slice(0, parseInt(part.slice(0, colon), 36)) + part.slice(colon + 1);
+    return prev;
+  }});
+}}
+
+function idsForHash(hash) {{
+  if (hash === model().hash) return model().ids;
+  const table = modelTables()[hash];
+  return table ? frontDecode(table) : null;
+}}
+
+function saveModelTable() {{
+  const tables = modelTables();
+  const keep = {{ [model().hash]: frontCode(model().ids) }};
+  // Prune old tables only once every stored payload's model is known
+  const known = STORE_KEYS.every(k => payloadHashes[k] || localStorage.getItem(k) === null);
+  for (const [hash, ids] of Object.entries(tables)) {{
+    if (!known || Object.values(payloadHashes).includes(hash)) keep[hash] = ids;
+  }}
+  if (Object.keys(keep).sort().join() !== Object.keys(tables).sort().join()) {{
+    localStorage.setItem(MODEL_KEY, JSON.stringify(keep));
+  }}
+}}
+
+function encodeAnswers(data) {{
+  const index = model().index;
+  const out = {{}};
+  for (const id in data) {{
+    if (data[id] && id in index) out[index[id]] = data[id];
+  }}
+  return out;
+}}
+
+function decodeAnswers(enc, ids) {{
+  const out = {{}};
+  for (const i in enc) {{
+    if (ids[i]) out[ids[i]] = enc[i];
+  }}
+  return out;
+}}
+
+function encodeResponses(data) {{
+  return {{ v: 2, m: model().hash, a: encodeAnswers(data) }};
+}}
+
+function decodeResponses(payload) {{
+  if (payload.v !== 2) return payload;  // plain {{ inputId: value }} from older pages
+  const ids = idsForHash(payload.m);
+  if (!ids) throw new Error('Unknown question model ' + payload.m);
+  return decodeAnswers(payload.a, ids);
+}}
+
+function applyChanges(snapshot, changes) {{
+  const out = {{ ...snapshot }};
+  changes.forEach(ch => {{
+    if (ch.to) out[ch.id] = ch.to;
+    else delete out[ch.id];
+  }});
+  return out;
+}}
+
+function sameAnswers(a, b) {{
+  let n = 0;
+  for (const id in a) {{
+    if (!a[id]) continue;
+    if (a[id] !== b[id]) return false;
+    n++;
+  }}
+  for (const id in b) if (b[id]) n--;
+  return n === 0;
+}}
+
+function changeRef(id) {{
+  // Ref from an id like "credit-0-ID-1"
+  const parts = id.split('-');
+  return parts.length >= 3 ? parts.slice(2).join('.') : id;
+}}
+
+function encodeHistory(entries) {{
+  const index = model().index;
+  let prev = null;
+  const out = entries.map(entry => {{
+    const e = {{
+      t: entry.time,
+      c: entry.changes.filter(ch => ch.id in index).map(ch => [index[ch.id], ch.from, ch.to]),
+    }};
+    if (!prev || !sameAnswers(applyChanges(prev, entry.changes), entry.snapshot)) e.s = encodeAnswers(entry.snapshot);
+    prev = entry.snapshot;
+    return e;
+  }});
+  return {{ v: 2, m: model().hash, e: out }};
+}}
+
+function decodeHistory(payload) {{
+  if (payload.v !== 2) return payload;  // plain entry array from older pages
+  const ids = idsForHash(payload.m);
+  if (!ids) throw new Error('Unknown question model ' + payload.m);
+  let prev = {{}};
+  return payload.e.map(e => {{
+    const changes = e.c.filter(c => ids[c[0]]).map(c => ({{ id: ids[c[0]], ref: changeRef(ids[c[0]]), from: c[1], to: c[2] }}));
+    const snapshot = e.s ? decodeAnswers(e.s, ids) : applyChanges(prev, changes);
+    prev = snapshot;
+    return {{ time: e.t, changes: changes, snapshot: snapshot }};
+  }});
+}}
+
+function packBytes(bytes) {{
+  const out = [];
+  let acc = 0, bits = 0;
+  for (let i = 0; i < bytes.length; i++) {{
+    acc = (acc << 8) | bytes[i];
+    bits += 8;
+    if (bits >= 15) {{
+      bits -= 15;
+      out.push(0x20 + ((acc >>> bits) & 0x7FFF));
+      acc &= (1 << bits) - 1;
+    }}
+  }}
+  if (bits) out.push(0x20 + ((acc << (15 - bits)) & 0x7FFF));
+  let str = '';
+  for (let i = 0; i < out.length; i += 8192) str += String.fromCharCode.apply(null, out.slice(i, i + 8192));
+  return str;
+}}
+
+function unpackBytes(str, length) {{
+  const bytes = new Uint8Array(length);
+  let acc = 0, bits = 0, j = 0;
+  for (let i = 0; i < str.length && j < length; i++) {{
+    acc = (acc << 15) | (str.charCodeAt(i) - 0x20);
+    bits += 15;
+    while (bits >= 8 && j < length) {{
+      bits -= 8;
+      bytes[j++] = (acc >>> bits) & 0xFF;
+    }}
+    acc &= (1 << bits) - 1;
+  }}
+  return bytes;
+}}
+
+async function gzip(text) {{
+  const stream = new Blob([text]).stream().pipeThrough(new CompressionStream('gzip'));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}}
+
+async function gunzip(bytes) {{
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return new Response(stream).text();
+}}
+
+// Writes `payload` under `key`; the returned Promise settles once it (or a
+// newer write of the same key) is in storage.
+function writeStored(key, payload, compress = true) {{
+  if (payload.m && payloadHashes[key] !== payload.m) {{
+    payloadHashes[key] = payload.m;
+    saveModelTable();
+  }}
+  const json = JSON.stringify(payload);
+  const seq = writeSeq[key] = (writeSeq[key] || 0) + 1;
+  if (!compress || json.length < COMPRESS_MIN || typeof CompressionStream === 'undefined') {{
+    localStorage.setItem(key, json);
+    return storeWrites[key] = Promise.resolve();
+  }}
+  return storeWrites[key] = gzip(json).then(bytes => {{
+    // A newer write of the same key wins
+    if (writeSeq[key] !== seq) return storeWrites[key];
+    localStorage.setItem(key, `Z${{bytes.length}}:` + packBytes(bytes));
+  }}, e => {{
+    if (writeSeq[key] !== seq) return storeWrites[key];
+    localStorage.setItem(key, json);
+  }});
+}}
+
+// The stored value of `key`, null if absent, or a Promise of it when the
+// value is compressed.
+function readStored(key) {{
+  const raw = localStorage.getItem(key);
+  if (!raw) return null;
+  const note = payload => {{
+    if (payload && payload.m) payloadHashes[key] = payload.m;
+    return payload;
+  }};
+  if (raw[0] !== 'Z') return note(JSON.parse(raw));
+  const colon = raw.indexOf(':');
+  const bytes = unpackBytes(raw.slice(colon + 1), +raw.slice(1, colon));
+  return gunzip(bytes).then(text => note(JSON.parse(text)));
+}}
+
+function writeResponses(data) {{
+  return writeStored(STORE_PREFIX + 'responses', encodeResponses(data));
+}}
+
+// ── Edit journal ──
+// Each answer edit is written straight away to greenstar_journal: the last
+// value of every field changed since the main store was last written, so a
+// closed tab or crash inside the autosave debounce loses nothing, at the cost
+// of serializing only the fields being edited. Startup replays it over the
+// main store; a full write drops the entries it covered once it has landed.
+const JOURNAL_KEY = STORE_PREFIX + 'journal';
+const journal = {{}};  // inputId -> value
+const journalSeq = {{}};  // inputId -> sequence number of its latest edit
+let editSeq = 0;
+
+function journalEdit(id) {{
+  journal[id] = answers[id] || '';
+  journalSeq[id] = ++editSeq;
+  writeJournal();
+}}
+
+function writeJournal() {{
+  const index = model().index;
+  const enc = {{}};
+  for (const id in journal) {{
+    if (id in index) enc[index[id]] = journal[id];
+  }}
+  try {{
+    writeStored(JOURNAL_KEY, {{ v: 2, m: model().hash, a: enc }}, false);
+  }} catch(e) {{
+    console.error('Journal write failed', e);
+  }}
+}}
+
+function compactJournal(upTo) {{
+  for (const id in journalSeq) {{
+    if (journalSeq[id] <= upTo) {{
+      delete journal[id];
+      delete journalSeq[id];
+    }}
+  }}
+  if (Object.keys(journal).length) {{
+    writeJournal();
+  }} else {{
+    localStorage.removeItem(JOURNAL_KEY);
+    delete payloadHashes[JOURNAL_KEY];
+  }}
+}}
+
+// Applies journalled edits on top of the loaded answers; returns their count.
+function replayJournal() {{
+  let edits = {{}};
+  try {{
+    const stored = readStored(JOURNAL_KEY);
+    const ids = stored && idsForHash(stored.m);
+    if (ids) edits = decodeAnswers(stored.a, ids);
+  }} catch(e) {{
+    console.error('Journal replay failed', e);
+  }}
+  for (const [id, val] of Object.entries(edits)) {{
+    setAnswer(id, val);
+    journal[id] = val;
+    journalSeq[id] = ++editSeq;
+  }}
+  return Object.keys(edits).length;
+}}
+
+// Writes the full answer set to the main store and compacts the journal.
+function persistResponses(data) {{
+  const upTo = editSeq;
+  let written;
+  try {{
+    written = writeResponses(data);
+  }} catch(e) {{
+    written = Promise.reject(e);
+  }}
+  return written.then(() => compactJournal(upTo)).catch(e => {{
+    console.error('Save failed', e);
+    throw e;
+  }});
+}}
+
+// Shows how a persistResponses write ended in the autosave indicator, unless a
+// newer save or edit has taken it over meanwhile. A failed write leaves the
+// edits in the journal only, so it is also reported with a toast.
+let saveResultSeq = 0;
+
+function showSaveResult(saved, toast) {{
+  const indicator = document.getElementById('autosave-indicator');
+  const seq = ++saveResultSeq;
+  const current = () => seq === saveResultSeq && !window._saveTimer;
+  indicator.textContent = 'Saving…';
+  indicator.classList.add('saving');
+  saved.then(() => {{
+    if (toast) showToast();
+    if (!current()) return;
     indicator.textContent = 'Saved';
+    indicator.classList.remove('saving', 'error');
+  }}, () => {{
+    showToast('Could not save responses to browser storage.');
+    if (!current()) return;
+    indicator.textContent = 'Not saved';
     indicator.classList.remove('saving');
+    indicator.classList.add('error');
+  }});
+}}
+
+// Flushes a pending autosave when the page is hidden or unloaded. The journal
+// already holds these edits; this just folds them into the main store early.
+function flushPendingSave() {{
+  if (!window._saveTimer) return;
+  clearTimeout(window._saveTimer);
+  window._saveTimer = null;
+  saveAllResponses();
+}}
+
+document.addEventListener('visibilitychange', function() {{
+  if (document.visibilityState === 'hidden') flushPendingSave();
+}});
+window.addEventListener('pagehide', flushPendingSave);
+
+// ── Save / Load ──
+// History may still be decompressing when the first save arrives; history
+// updates queue behind the load so they never overwrite stored entries.
+let historyLoading = null;
+
+function withHistory(fn) {{
+  if (!historyLoading) return fn();
+  const p = historyLoading = historyLoading.then(fn);
+  p.then(() => {{ if (historyLoading === p) historyLoading = null; }});
+}}
+
+function saveAllResponses() {{
+  const data = collectResponses();
+  try {{
+    // Track version history (diff against last snapshot)
+    withHistory(() => recordHistory(data));
   }} catch(e) {{
-    console.error('Save failed', e);
+    console.error('History update failed', e);
   }}
+  showSaveResult(persistResponses(data));
 }}
 
+// Applies stored answers; returns a Promise when they first need decompressing.
 function loadResponses() {{
-  try {{
-    const raw = localStorage.getItem('greenstar_responses');
-    if (!raw) return;
-    const data = JSON.parse(raw);
-    for (const [id, val] of Object.entries(data)) {{
-      const el = document.getElementById(id);
-      if (el) el.value = val;
-    }}
+  loadHistory();
+  const apply = stored => {{
+    if (!stored) return;
+    const data = decodeResponses(stored);
+    // Inputs start out empty, so only non-empty answers need writing
+    for (const [id, val] of Object.entries(data)) if (val) setAnswer(id, val);
     lastSnapshot = {{ ...data }};
-    applyConditionalRules();
-    updateAllProgress();
-    updateDashboard();
+  }};
+  const fail = e => console.error('Load failed', e);
+  try {{
+    const stored = readStored(STORE_PREFIX + 'responses');
+    if (stored && stored.then) return stored.then(apply).catch(fail);
+    apply(stored);
   }} catch(e) {{
-    console.error('Load failed', e);
+    fail(e);
   }}
-  // Load version history
+}}
+
+// A stored history that fails to decompress or decode is left in place:
+// history writes stop (historyUnreadable) rather than replace it with the
+// versions of this session alone.
+function loadHistory() {{
+  historyBytes = (localStorage.getItem(STORE_PREFIX + 'history') || '').length * 2;
+  historyUnreadable = false;
+  const fail = e => {{
+    console.error('History load failed', e);
+    historyUnreadable = true;
+    historyNotice = 'Stored history could not be read, so new versions are not being saved.';
+  }};
   try {{
-    const h = localStorage.getItem('greenstar_history');
-    if (h) versionHistory = JSON.parse(h);
-  }} catch(e) {{}}
+    const stored = readStored(STORE_PREFIX + 'history');
+    if (stored && stored.then) {{
+      const p = historyLoading = stored.then(h => {{ versionHistory = decodeHistory(h); historyIndex = null; }}).catch(fail);
+      p.then(() => {{ if (historyLoading === p) historyLoading = null; }});
+    }} else if (stored) {{
+      versionHistory = decodeHistory(stored);
+      historyIndex = null;
+    }}
+  }} catch(e) {{
+    fail(e);
+  }}
 }}
 
-function showToast() {{
+function showToast(message) {{
   const t = document.getElementById('save-toast');
+  t.textContent = message || 'Responses saved to browser storage.';
   t.classList.add('show');
   setTimeout(() => t.classList.remove('show'), 2000);
 }}
 
 // ── Version history ──
+// Retention: every version from the last day is kept; older ones are thinned
+// to the last version of each hour, and past 30 days to the last of each day,
+// each kept version absorbing the changes of those it replaces. If the encoded
+// history is still over HISTORY_BUDGET (measured before compression, so the
+// stored size never exceeds it) the oldest versions are dropped.
+const HISTORY_BUDGET = 1024 * 1024;  // bytes of UTF-16
+const HOUR = 3600 * 1000;
+const DAY = 24 * HOUR;
+let historyBytes = 0;  // size of the stored history
+let historyNotice = '';
+let historyUnreadable = false;  // the stored history failed to load; never overwrite it
+let historyIndex = null;  // input id -> [{{ entry, change }}] oldest first; null when stale
+
+// Revisions of one answer, from the per-question index (rebuilt on first use
+// after versions were loaded, thinned or dropped; appended to on record).
+function questionRevisions(id) {{
+  if (!historyIndex) {{
+    historyIndex = new Map();
+    versionHistory.forEach(indexHistoryEntry);
+  }}
+  return historyIndex.get(id) || [];
+}}
+
+function indexHistoryEntry(entry) {{
+  entry.changes.forEach(change => {{
+    let revisions = historyIndex.get(change.id);
+    if (!revisions) historyIndex.set(change.id, revisions = []);
+    revisions.push({{ entry, change }});
+  }});
+}}
+
+function historyBucket(time, now) {{
+  const age = now - time;
+  if (age < DAY) return null;
+  return age < 30 * DAY ? 'h' + Math.floor(time / HOUR) : 'd' + new Date(time).toDateString();
+}}
+
+function mergeChanges(older, newer) {{
+  const byId = new Map();
+  older.concat(newer).forEach(ch => {{
+    const prev = byId.get(ch.id);
+    byId.set(ch.id, prev ? {{ ...ch, from: prev.from }} : ch);
+  }});
+  return [...byId.values()].filter(ch => ch.from !== ch.to);
+}}
+
+function thinHistory(entries, now) {{
+  const out = [], buckets = [];
+  for (const entry of entries) {{
+    const bucket = historyBucket(Date.parse(entry.time), now);
+    if (bucket && buckets[buckets.length - 1] === bucket) {{
+      const last = out[out.length - 1];
+      out[out.length - 1] = {{ time: entry.time, changes: mergeChanges(last.changes, entry.changes), snapshot: entry.snapshot }};
+    }} else {{
+      out.push(entry);
+      buckets.push(bucket);
+    }}
+  }}
+  return out;
+}}
+
+// Thins and trims versionHistory to `budget`; returns the encoded payload.
+function fitHistory(budget) {{
+  const count = versionHistory.length;
+  versionHistory = thinHistory(versionHistory, Date.now());
+  let payload = encodeHistory(versionHistory);
+  let bytes = JSON.stringify(payload).length * 2;
+  while (bytes > budget && versionHistory.length > 1) {{
+    const drop = Math.max(1, Math.ceil(versionHistory.length * (1 - budget / bytes)));
+    versionHistory = versionHistory.slice(Math.min(drop, versionHistory.length - 1));
+    payload = encodeHistory(versionHistory);
+    bytes = JSON.stringify(payload).length * 2;
+  }}
+  // Merged or dropped versions leave stale references in the index
+  if (versionHistory.length !== count) historyIndex = null;
+  return payload;
+}}
+
+function writeHistory(budget = HISTORY_BUDGET) {{
+  if (historyUnreadable) return Promise.resolve();
+  const payload = fitHistory(budget);
+  let write;
+  try {{
+    write = writeStored(STORE_PREFIX + 'history', payload);
+  }} catch(e) {{
+    write = Promise.reject(e);
+  }}
+  return write.then(() => {{
+    historyBytes = (localStorage.getItem(STORE_PREFIX + 'history') || '').length * 2;
+    if (budget === HISTORY_BUDGET) historyNotice = '';
+  }}, e => {{
+    // Out of storage quota: retry with a smaller budget before giving up
+    if (versionHistory.length > 1 && budget > 16 * 1024) {{
+      historyNotice = 'Browser storage is nearly full, so older versions were removed.';
+      return writeHistory(budget / 2);
+    }}
+    historyNotice = 'History could not be saved: browser storage is full.';
+    console.error('History save failed', e);
+  }}).then(() => {{
+    if (document.getElementById('history-overlay').classList.contains('active')) renderHistory();
+  }});
+}}
+
 function recordHistory(newData) {{
   const changes = [];
   const allKeys = new Set([...Object.keys(lastSnapshot), ...Object.keys(newData)]);
   allKeys.forEach(key => {{
     const oldVal = lastSnapshot[key] || '';
     const newVal = newData[key] || '';
-    if (oldVal !== newVal) {{
-      // Extract ref from id like "credit-0-ID-1"
-      const parts = key.split('-');
-      const ref = parts.length >= 3 ? parts.slice(2).join('.') : key;
-      changes.push({{ id: key, ref: ref, from: oldVal, to: newVal }});
-    }}
+    if (oldVal !== newVal) changes.push({{ id: key, ref: changeRef(key), from: oldVal, to: newVal }});
   }});
   if (changes.length > 0) {{
-    versionHistory.push({{
+    const entry = {{
       time: new Date().toISOString(),
       changes: changes,
       snapshot: {{ ...newData }}
-    }});
-    // Keep last 50 entries
-    if (versionHistory.length > 50) versionHistory = versionHistory.slice(-50);
-    try {{
-      localStorage.setItem('greenstar_history', JSON.stringify(versionHistory));
-    }} catch(e) {{}}
+    }};
+    versionHistory.push(entry);
+    if (historyIndex) indexHistoryEntry(entry);
+    writeHistory();
   }}
   lastSnapshot = {{ ...newData }};
 }}
 
-function showHistory() {{
+// The panel lists either every version or one answer's revisions (historyField),
+// newest first. Rows are rendered HISTORY_CHUNK at a time as the sentinel at
+// the bottom of the list scrolls into view.
+const HISTORY_CHUNK = 30;
+let historyField = null;
+let historyRows = [];
+let historyShown = 0;
+let historyObserver = null;
+
+function showHistory(fieldId) {{
+  historyField = fieldId || null;
   document.getElementById('history-overlay').classList.add('active');
   renderHistory();
 }}
@@ -2265,56 +3200,136 @@ function closeHistory() {{
   document.getElementById('history-overlay').classList.remove('active');
 }}
 
+function renderHistoryUsage() {{
+  const el = document.getElementById('history-usage');
+  const kb = b => (b / 1024).toFixed(b < 10240 ? 1 : 0) + ' KB';
+  let text = '';
+  if (versionHistory.length) {{
+    const oldest = new Date(versionHistory[0].time).toLocaleDateString();
+    text = `${{versionHistory.length}} version${{versionHistory.length > 1 ? 's' : ''}} since ${{oldest}} · ` +
+      `${{kb(historyBytes)}} stored (budget ${{kb(HISTORY_BUDGET)}}) · older versions are kept hourly, then daily`;
+  }}
+  el.innerHTML = escapeHtml(text) + (historyNotice ? ` <span class="history-notice">${{escapeHtml(historyNotice)}}</span>` : '');
+}}
+
 function renderHistory() {{
   const body = document.getElementById('history-body');
-  if (versionHistory.length === 0) {{
-    body.innerHTML = '<div class="history-empty">No history yet. Changes are tracked as you work.</div>';
+  document.getElementById('history-title').innerHTML = historyField
+    ? `History of ${{escapeHtml(changeRef(historyField))}} <button class="history-all" onclick="showHistory()">All versions</button>`
+    : 'Version History';
+  renderHistoryUsage();
+  historyRows = [];
+  historyShown = 0;
+  if (historyLoading) {{
+    body.innerHTML = '<div class="history-empty">Loading history...</div>';
+    historyLoading.then(renderHistory);
     return;
   }}
+  historyRows = (historyField ? questionRevisions(historyField) : versionHistory).slice().reverse();
+  if (historyRows.length === 0) {{
+    body.innerHTML = historyField
+      ? '<div class="history-empty">No saved revisions of this answer yet.</div>'
+      : '<div class="history-empty">No history yet. Changes are tracked as you work.</div>';
+    return;
+  }}
+  body.innerHTML = '';
+  body.scrollTop = 0;
+  appendHistoryRows();
+}}
+
+function appendHistoryRows() {{
+  const body = document.getElementById('history-body');
+  const more = body.querySelector('.history-more');
+  if (more) more.remove();
+  const end = window.IntersectionObserver ? Math.min(historyRows.length, historyShown + HISTORY_CHUNK) : historyRows.length;
   let html = '';
-  // Show newest first
-  for (let i = versionHistory.length - 1; i >= 0; i--) {{
-    const entry = versionHistory[i];
-    const d = new Date(entry.time);
-    const timeStr = d.toLocaleDateString() + ' ' + d.toLocaleTimeString();
-    html += `<div class="history-entry">`;
-    html += `<div class="history-time">${{timeStr}} — ${{entry.changes.length}} change${{entry.changes.length > 1 ? 's' : ''}}</div>`;
-    html += `<div class="history-changes">`;
-    entry.changes.slice(0, 5).forEach(ch => {{
-      const display = ch.to ? `"${{ch.to.substring(0, 60)}}${{ch.to.length > 60 ? '...' : ''}}"` : '<em>cleared</em>';
-      html += `<div class="history-change"><span class="history-change-ref">${{ch.ref}}</span><span class="history-change-val">${{display}}</span></div>`;
-    }});
-    if (entry.changes.length > 5) html += `<div style="font-size:11px;color:#999">+ ${{entry.changes.length - 5}} more</div>`;
-    html += `</div>`;
-    html += `<button class="history-restore" onclick="restoreVersion(${{i}})">Restore this version</button>`;
-    html += `</div>`;
+  for (let i = historyShown; i < end; i++) html += historyField ? revisionHtml(i) : versionHtml(i);
+  historyShown = end;
+  if (historyShown < historyRows.length) html += '<div class="history-more"></div>';
+  body.insertAdjacentHTML('beforeend', html);
+  if (historyShown < historyRows.length) {{
+    if (!historyObserver) {{
+      historyObserver = new IntersectionObserver(entries => {{
+        entries.forEach(e => {{
+          if (!e.isIntersecting) return;
+          historyObserver.unobserve(e.target);
+          if (e.target.isConnected) appendHistoryRows();
+        }});
+      }}, {{ root: body, rootMargin: '400px' }});
+    }}
+    historyObserver.observe(body.querySelector('.history-more'));
   }}
-  body.innerHTML = html;
+}}
+
+function historyTime(entry) {{
+  const d = new Date(entry.time);
+  return d.toLocaleDateString() + ' ' + d.toLocaleTimeString();
+}}
+
+function historyValue(value) {{
+  return value ? `"${{escapeHtml(value.substring(0, 60))}}${{value.length > 60 ? '...' : ''}}"` : '<em>cleared</em>';
+}}
+
+function versionHtml(row) {{
+  const entry = historyRows[row];
+  const index = versionHistory.length - 1 - row;
+  let html = `<div class="history-entry">`;
+  html += `<div class="history-time">${{historyTime(entry)}} — ${{entry.changes.length}} change${{entry.changes.length > 1 ? 's' : ''}}</div>`;
+  html += `<div class="history-changes">`;
+  entry.changes.slice(0, 5).forEach(ch => {{
+    html += `<div class="history-change"><span class="history-change-ref">${{ch.ref}}</span><span class="history-change-val">${{historyValue(ch.to)}}</span></div>`;
+  }});
+  if (entry.changes.length > 5) html += `<div style="font-size:11px;color:#999">+ ${{entry.changes.length - 5}} more</div>`;
+  html += `</div>`;
+  html += `<button class="history-restore" data-action="restore-version" data-index="${{index}}">Restore this version</button>`;
+  html += `</div>`;
+  return html;
+}}
+
+function revisionHtml(row) {{
+  const {{ entry, change }} = historyRows[row];
+  let html = `<div class="history-entry">`;
+  html += `<div class="history-time">${{historyTime(entry)}}</div>`;
+  html += `<div class="history-changes">`;
+  html += `<div class="history-change"><span class="history-change-ref">from</span><span class="history-change-val">${{historyValue(change.from)}}</span></div>`;
+  html += `<div class="history-change"><span class="history-change-ref">to</span><span class="history-change-val">${{historyValue(change.to)}}</span></div>`;
+  html += `</div>`;
+  html += `<button class="history-restore" data-action="use-revision" data-row="${{row}}">Use this answer</button>`;
+  html += `</div>`;
+  return html;
+}}
+
+// Puts one revision's value back into its answer, like typing it in
+function useRevision(row) {{
+  const revision = historyRows[row];
+  if (!revision) return;
+  const id = revision.change.id;
+  setAnswer(id, revision.change.to);
+  onAnswer(id.split('-').slice(0, 2).join('-'), id);
+  closeHistory();
 }}
 
 function restoreVersion(idx) {{
   if (idx < 0 || idx >= versionHistory.length) return;
   if (!confirm('Restore all responses to this point? Current answers will be saved in history first.')) return;
+  // Taken first: saving the current state records a version, which can thin
+  // or drop older ones and shift idx
+  const snapshot = versionHistory[idx].snapshot;
   // Save current state before restoring
   saveAllResponses();
-  const snapshot = versionHistory[idx].snapshot;
-  // Clear all inputs first
-  document.querySelectorAll('[data-credit]').forEach(el => {{
-    if (el.tagName === 'SELECT') el.value = '';
-    else el.value = '';
-  }});
+  // Only fields the restore changes are sync edits; restamping the rest
+  // would override other editors' later changes to them
+  const edited = [...new Set([...Object.keys(answers), ...Object.keys(snapshot)])]
+    .filter(id => (answers[id] || '') !== (snapshot[id] || ''));
+  // Clear all answers first
+  for (const id in answers) setAnswer(id, '');
   // Apply snapshot
-  for (const [id, val] of Object.entries(snapshot)) {{
-    const el = document.getElementById(id);
-    if (el) el.value = val;
-  }}
-  localStorage.setItem('greenstar_responses', JSON.stringify(snapshot));
+  for (const [id, val] of Object.entries(snapshot)) setAnswer(id, val);
+  syncEdit(...edited);
+  showSaveResult(persistResponses(snapshot), true);
   lastSnapshot = {{ ...snapshot }};
-  applyConditionalRules();
-  updateAllProgress();
-  updateDashboard();
+  scheduleUpdate(null, true);
   closeHistory();
-  showToast();
 }}
 
 // ── Export / Import ──
@@ -2328,14 +3343,11 @@ function closeExportModal() {{
 }}
 
 function exportResponses() {{
-  const data = {{}};
-  document.querySelectorAll('[data-credit]').forEach(el => {{
-    if (el.id) data[el.id] = el.tagName === 'SELECT' ? el.value : el.value;
-  }});
+  const data = collectResponses();
   const blob = new Blob([JSON.stringify(data, null, 2)], {{type: 'application/json'}});
   const a = document.createElement('a');
   a.href = URL.createObjectURL(blob);
-  a.download = 'greenstar_v1.1_responses.json';
+  a.download = `${{SEED.project || 'greenstar_v1.1_responses'}}.json`;
   a.click();
   closeExportModal();
 }}
@@ -2408,9 +3420,7 @@ function exportExcel() {{
         merges.push({{ s: {{ r: rows.length - 1, c: 0 }}, e: {{ r: rows.length - 1, c: 7 }} }});
 
         crit.questions.forEach(q => {{
-          // Get response value from the form
-          const el = document.getElementById(q.input_id);
-          const response = el ? (el.tagName === 'SELECT' ? el.value : el.value) : '';
+          const response = answers[q.input_id] || '';
 
           const isYN = q.type === 'Condition (Y/N)';
           const isData = q.type === 'Data';
@@ -2467,27 +3477,473 @@ function importResponses() {{
   document.getElementById('import-file').click();
 }}
 
+// Import parses and validates the file in a worker (built from the source of
+// the IMPORT_WORKER functions, so the page stays a single file), then applies
+// only the answers that differ in one pass. Files may be plain or
+// gzip-compressed JSON exports, or response workbooks from exportExcel.
+let importWorker = null;
+
+// Keeps the answers for known ids with valid values. Runs inside the worker,
+// so it and its helpers may only use their arguments and worker globals.
+// `sheets` maps exported sheet names to {{ref: input id}}.
+async function parseImport(buffer, ids, selects, sheets) {{
+  let bytes = new Uint8Array(buffer);
+  const values = {{}}, skipped = [];
+  let data;
+  if (bytes[0] === 0x50 && bytes[1] === 0x4b) {{
+    data = await readResponseWorkbook(bytes, sheets, skipped);
+  }} else {{
+    if (bytes[0] === 0x1f && bytes[1] === 0x8b) {{
+      const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+      bytes = new Uint8Array(await new Response(stream).arrayBuffer());
+    }}
+    data = JSON.parse(new TextDecoder().decode(bytes));
+    if (!data || typeof data !== 'object' || Array.isArray(data)) throw new Error('Not a responses object');
+  }}
+  const known = new Set(ids), yn = new Set(selects);
+  for (const [id, val] of Object.entries(data)) {{
+    const text = typeof val === 'number' ? String(val) : val;
+    if (!known.has(id) || typeof text !== 'string' || (yn.has(id) && !['', 'Yes', 'No'].includes(text))) skipped.push(id);
+    else values[id] = text;
+  }}
+  return {{ values, skipped }};
+}}
+
+// Zip entries by name, from the archive's central directory
+function zipEntries(bytes) {{
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  let end = bytes.length - 22;
+  while (end >= 0 && view.getUint32(end, true) !== 0x06054b50) end--;
+  if (end < 0) throw new Error('Not a zip archive');
+  const names = new TextDecoder();
+  const entries = {{}};
+  let p = view.getUint32(end + 16, true);
+  for (let i = view.getUint16(end + 10, true); i > 0; i--) {{
+    const nameLength = view.getUint16(p + 28, true);
+    entries[names.decode(bytes.subarray(p + 46, p + 46 + nameLength))] = {{
+      method: view.getUint16(p + 10, true),
+      size: view.getUint32(p + 20, true),
+      offset: view.getUint32(p + 42, true),
+    }};
+    p += 46 + nameLength + view.getUint16(p + 30, true) + view.getUint16(p + 32, true);
+  }}
+  return entries;
+}}
+
+async function zipText(bytes, entries, name) {{
+  const entry = entries[name];
+  if (!entry) return '';
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const start = entry.offset + 30 + view.getUint16(entry.offset + 26, true) + view.getUint16(entry.offset + 28, true);
+  const data = bytes.subarray(start, start + entry.size);
+  if (entry.method === 0) return new TextDecoder().decode(data);
+  return new Response(new Blob([data]).stream().pipeThrough(new DecompressionStream('deflate-raw'))).text();
+}}
+
+function xmlText(xml) {{
+  let text = '';
+  for (const m of xml.matchAll(/<t(?:\\s[^>]*)?>([^<]*)<\\/t>/g)) text += m[1];
+  return text.replace(/&(#x[0-9a-f]+|#\\d+|amp|lt|gt|quot|apos);/gi, (_, e) =>
+    e[0] === '#' ? String.fromCodePoint(e[1] === 'x' || e[1] === 'X' ? parseInt(e.slice(2), 16) : +e.slice(1))
+      : {{ amp: '&', lt: '<', gt: '>', quot: '"', apos: "'" }}[e.toLowerCase()]);
+}}
+
+// Answers by input id from a response workbook. Only the workbook index,
+// shared strings and sheet cells are read; styles are never loaded. Each
+// sheet's header row locates the Ref, Question Type and Response columns, and
+// rows with a question type are matched to `sheets` by ref.
+async function readResponseWorkbook(bytes, sheets, skipped) {{
+  const entries = zipEntries(bytes);
+  const attr = (tag, name) => (tag.match(new RegExp(` ${{name}}="([^"]*)"`)) || [])[1];
+  const targets = {{}};
+  let sharedStrings = 'xl/sharedStrings.xml';
+  for (const m of (await zipText(bytes, entries, 'xl/_rels/workbook.xml.rels')).matchAll(/<Relationship\\b[^>]*>/g)) {{
+    let target = attr(m[0], 'Target');
+    target = target[0] === '/' ? target.slice(1) : 'xl/' + target;
+    targets[attr(m[0], 'Id')] = target;
+    if (/\\/sharedStrings$/.test(attr(m[0], 'Type'))) sharedStrings = target;
+  }}
+  const strings = [];
+  for (const m of (await zipText(bytes, entries, sharedStrings)).matchAll(/<si>([\\s\\S]*?)<\\/si>/g)) strings.push(xmlText(m[1]));
+  const data = {{}};
+  for (const m of (await zipText(bytes, entries, 'xl/workbook.xml')).matchAll(/<sheet\\b[^>]*>/g)) {{
+    const name = xmlText(`<t>${{attr(m[0], 'name')}}</t>`);
+    const refs = sheets[name];
+    if (!refs) {{
+      skipped.push(name);
+      continue;
+    }}
+    const xml = await zipText(bytes, entries, targets[attr(m[0], 'r:id')]);
+    let cols = null;
+    for (const row of xml.matchAll(/<row\\b[^>]*>([\\s\\S]*?)<\\/row>/g)) {{
+      const cells = {{}};
+      for (const c of row[1].matchAll(/<c\\b([^>]*?)(?:\\/>|>([\\s\\S]*?)<\\/c>)/g)) {{
+        const col = attr(c[1], 'r').replace(/\\d+$/, ''), type = attr(c[1], 't'), body = c[2] || '';
+        const v = (body.match(/<v>([^<]*)<\\/v>/) || [])[1];
+        cells[col] = type === 's' ? strings[+v] : type === 'inlineStr' ? xmlText(body) : v === undefined ? '' : xmlText(`<t>${{v}}</t>`);
+      }}
+      if (!cols) {{
+        const find = label => Object.keys(cells).find(k => cells[k] === label);
+        if (find('Ref') && find('Response')) cols = {{ ref: find('Ref'), type: find('Question Type'), response: find('Response') }};
+        continue;
+      }}
+      const ref = cells[cols.ref];
+      if (!ref || (cols.type && !cells[cols.type])) continue;
+      if (refs[ref]) data[refs[ref]] = cells[cols.response] || '';
+      else skipped.push(`${{name}}!${{ref}}`);
+    }}
+  }}
+  return data;
+}}
+
+const IMPORT_WORKER = [parseImport, zipEntries, zipText, xmlText, readResponseWorkbook];
+
+function importWorkerSource() {{
+  return IMPORT_WORKER.map(fn => fn.toString()).join('\\n') + `
+onmessage = e => parseImport(e.data.buffer, e.data.ids, e.data.selects, e.data.sheets).then(
+  result => postMessage(result), err => postMessage({{ error: String((err && err.message) || err) }}));`;
+}}
+
+// Exported sheet name -> {{ref: input id}}, as exportExcel names the sheets
+function importSheets() {{
+  const sheets = {{}};
+  CREDITS_DATA.forEach(credit => {{
+    const refs = sheets[credit.sheet_name.substring(0, 31)] = {{}};
+    credit.sections.forEach(s => s.criteria.forEach(cr => cr.questions.forEach(q => {{ refs[q.ref] = q.input_id; }})));
+  }});
+  return sheets;
+}}
+
+function parseImportFile(buffer) {{
+  const ids = model().ids;
+  const selects = ids.filter(id => questionMap()[id].type === 'Condition (Y/N)');
+  const sheets = importSheets();
+  try {{
+    if (!importWorker) {{
+      const url = URL.createObjectURL(new Blob([importWorkerSource()], {{ type: 'text/javascript' }}));
+      importWorker = new Worker(url);
+    }}
+  }} catch(e) {{
+    // Workers can be blocked for pages opened from disk; parse here instead
+    return parseImport(buffer, ids, selects, sheets);
+  }}
+  return new Promise((resolve, reject) => {{
+    importWorker.onmessage = e => e.data.error ? reject(new Error(e.data.error)) : resolve(e.data);
+    importWorker.onerror = e => {{
+      e.preventDefault();
+      importWorker = null;
+      parseImport(buffer, ids, selects, sheets).then(resolve, reject);
+    }};
+    importWorker.postMessage({{ buffer, ids, selects, sheets }});
+  }});
+}}
+
+// Returns the number of answers that changed
+function applyImport(values) {{
+  const changed = [];
+  for (const id in values) {{
+    if ((answers[id] || '') === values[id]) continue;
+    setAnswer(id, values[id]);
+    changed.push(id);
+  }}
+  syncEdit(...changed);
+  return changed.length;
+}}
+
 function handleImport(event) {{
   const file = event.target.files[0];
+  event.target.value = '';
   if (!file) return;
-  const reader = new FileReader();
-  reader.onload = function(e) {{
+  file.arrayBuffer().then(parseImportFile).then(({{ values, skipped }}) => {{
+    const changed = applyImport(values);
+    if (changed) {{
+      lastSnapshot = collectResponses();
+      showSaveResult(persistResponses(lastSnapshot));
+      scheduleUpdate(null, true);
+    }}
+    closeExportModal();
+    if (skipped.length) console.warn('Import skipped unknown or invalid answers:', skipped);
+    showToast(`Imported ${{changed}} changed answer${{changed === 1 ? '' : 's'}}` +
+      (skipped.length ? `, skipped ${{skipped.length}} unknown or invalid.` : '.'));
+  }}).catch(err => {{
+    console.error('Import failed', err);
+    alert('Invalid file format.');
+  }});
+}}
+
+// ── Sync ──
+// Optional sync with sync_server.py, across devices and between editors of
+// one project. It is on when the page is served by the sync server, or after
+// opening it once with ?sync=http://host:port (and ?project=name; ?sync=off
+// turns it off). Every field is a last-writer-wins register: an edit stamps it
+// [Lamport clock, device] and the higher stamp wins everywhere, so edits merge
+// to the same answers whatever order they arrive in. Edits travel as small
+// operations: over the server's live channel (a WebSocket) while it is open,
+// batched per LIVE_DELAY, with other editors' operations arriving as they are
+// made; otherwise pushed over HTTP together with a pull of what changed since
+// our cursor. The state lives in greenstar_sync, so edits made offline are
+// sent on the next successful sync. Every path that changes answers locally
+// (typing, imports, restoring a history version) records them with syncEdit,
+// or the device would drift from the server.
+const SYNC_KEY = STORE_PREFIX + 'sync';
+const SYNC_DELAY = 1500;  // ms of quiet before an HTTP batch is pushed
+const SYNC_POLL = 30000;  // ms between HTTP pulls while the live channel is down
+const LIVE_DELAY = 50;  // ms of edits batched into one live message
+let sync = null;  // {{url, project, device, clock, cursor, joined, stamps: {{id: [clock, device]}}, pending: [ids]}}
+let syncPending = new Set();
+let syncTimer = null;
+let syncInFlight = null;
+let syncLive = null;  // open WebSocket
+let liveBatches = [];  // [[id, stamp]] per live message awaiting its ack
+let liveSent = {{}};  // id -> stamp in flight on the live channel
+let liveRetry = 1000;
+let syncSaveTimer = null;
+let syncStateDirty = false;
+let syncStateQueued = false;
+
+function stampWins(a, b) {{
+  return !b || a[0] > b[0] || (a[0] === b[0] && a[1] > b[1]);
+}}
+
+// Sync state changes on every keystroke but is written on the idle lane, one
+// write for a burst of edits; hiding or leaving the page writes it at once.
+function saveSyncState() {{
+  syncStateDirty = true;
+  if (syncStateQueued) return;
+  syncStateQueued = true;
+  const idle = window.requestIdleCallback || (fn => setTimeout(fn, 50));
+  idle(() => {{ syncStateQueued = false; writeSyncState(); }}, {{ timeout: 1000 }});
+}}
+
+function writeSyncState() {{
+  if (!syncStateDirty) return;
+  syncStateDirty = false;
+  sync.pending = [...syncPending];
+  try {{
+    localStorage.setItem(SYNC_KEY, JSON.stringify(sync));
+  }} catch(e) {{
+    console.error('Sync state write failed', e);
+  }}
+}}
+
+function setSyncStatus(text, error) {{
+  const el = document.getElementById('sync-indicator');
+  el.hidden = false;
+  el.textContent = text;
+  el.classList.toggle('error', !!error);
+}}
+
+// Sync state from before per-field stamps kept version vectors; their sum
+// orders every pair of edits the vectors ordered, as on the server.
+function migrateSyncState(state) {{
+  const stamps = {{}};
+  let clock = 0;
+  for (const [id, vv] of Object.entries(state.vv)) {{
+    const n = Object.values(vv).reduce((a, b) => a + b, 0);
+    stamps[id] = [n, state.pending.includes(id) ? state.device : ''];
+    clock = Math.max(clock, n);
+  }}
+  const {{ vv, ...rest }} = state;
+  return {{ ...rest, clock, stamps }};
+}}
+
+async function initSync() {{
+  const params = new URLSearchParams(location.search);
+  let state = null;
+  try {{
+    state = JSON.parse(localStorage.getItem(SYNC_KEY));
+    if (state && state.vv) state = migrateSyncState(state);
+  }} catch(e) {{}}
+  let url = params.get('sync') || (state && state.url);
+  if (url === 'off') {{
+    localStorage.removeItem(SYNC_KEY);
+    return;
+  }}
+  if (!url && location.protocol.startsWith('http')) {{
+    // Served by the sync server itself?
     try {{
-      const data = JSON.parse(e.target.result);
-      for (const [id, val] of Object.entries(data)) {{
-        const el = document.getElementById(id);
-        if (el) el.value = val;
-      }}
-      localStorage.setItem('greenstar_responses', JSON.stringify(data));
-      loadResponses();
-      closeExportModal();
-      showToast();
-    }} catch(err) {{
-      alert('Invalid file format.');
+      const res = await fetch('/sync/ping', {{ cache: 'no-store' }});
+      if (res.ok && (await res.json()).sync) url = location.origin;
+    }} catch(e) {{}}
+  }}
+  if (!url) return;
+  url = url.replace(/\\/+$/, '');
+  const project = params.get('project') || (state && state.project) || SEED.project || 'default';
+  if (!state || state.url !== url || state.project !== project) {{
+    state = {{ url, project, device: (state && state.device) || Math.random().toString(36).slice(2, 10),
+              clock: 0, cursor: 0, joined: false, stamps: {{}}, pending: [] }};
+  }}
+  sync = state;
+  syncPending = new Set(sync.pending);
+  saveSyncState();
+  const joining = !sync.joined;
+  await syncNow();
+  if (joining && sync.joined) {{
+    // First join of this device: the server's answers won the pull above;
+    // answers only this device has are sent as its own edits.
+    syncEdit(...Object.keys(answers).filter(id => answers[id] && !sync.stamps[id]));
+  }}
+  connectLive();
+  setInterval(() => {{ if (!syncLive && !syncTimer) syncNow(); }}, SYNC_POLL);
+  document.addEventListener('visibilitychange', () => {{
+    if (document.visibilityState === 'visible' && !syncLive) syncNow();
+    else if (document.visibilityState === 'hidden') writeSyncState();
+  }});
+  window.addEventListener('pagehide', flushSync);
+}}
+
+function syncPath() {{
+  return `${{sync.url}}/sync/${{encodeURIComponent(sync.project)}}`;
+}}
+
+// Records local edits of fields and schedules the next batch.
+function syncEdit(...ids) {{
+  if (!sync || !ids.length) return;
+  for (const id of ids) {{
+    sync.stamps[id] = [++sync.clock, sync.device];
+    syncPending.add(id);
+  }}
+  saveSyncState();
+  if (syncLive) {{
+    if (!syncTimer) syncTimer = setTimeout(() => {{ syncTimer = null; flushLive(); }}, LIVE_DELAY);
+    return;
+  }}
+  clearTimeout(syncTimer);
+  syncTimer = setTimeout(() => {{ syncTimer = null; syncNow(); }}, SYNC_DELAY);
+}}
+
+function syncOps(ids) {{
+  return ids.map(id => ({{ id, value: answers[id] || '', t: sync.stamps[id] }}));
+}}
+
+function syncBody(ids) {{
+  return JSON.stringify({{ device: sync.device, since: sync.cursor, changes: syncOps(ids) }});
+}}
+
+// Pushes the pending fields over HTTP and applies what the server sends back.
+// One request at a time; edits made meanwhile go out in the next one.
+function syncNow() {{
+  if (!sync) return Promise.resolve();
+  if (syncLive) return Promise.resolve(flushLive());
+  if (syncInFlight) return syncInFlight.then(() => syncPending.size && syncNow());
+  return pushSync([...syncPending]);
+}}
+
+function pushSync(ids) {{
+  const sent = ids.map(id => sync.stamps[id]);
+  const p = syncInFlight = fetch(syncPath(), {{ method: 'POST', headers: {{ 'Content-Type': 'application/json' }}, body: syncBody(ids) }})
+    .then(res => {{
+      if (!res.ok) throw new Error(`Sync server answered ${{res.status}}`);
+      return res.json();
+    }})
+    .then(result => {{
+      ids.forEach((id, i) => {{ if (sync.stamps[id] === sent[i]) syncPending.delete(id); }});
+      applySync(result);
+    }})
+    .catch(e => {{
+      console.warn('Sync failed', e);
+      setSyncStatus('Sync offline', true);
+    }})
+    .finally(() => {{ syncInFlight = null; }});
+  return p;
+}}
+
+// ── Live channel ──
+function connectLive() {{
+  if (!sync || syncLive || typeof WebSocket === 'undefined') return;
+  const ws = new WebSocket(`${{syncPath().replace(/^http/, 'ws')}}/live?since=${{sync.cursor}}`);
+  ws.onopen = () => {{
+    syncLive = ws;
+    liveRetry = 1000;
+    flushLive();
+  }};
+  ws.onmessage = event => {{
+    const message = JSON.parse(event.data);
+    if (message.error) {{
+      // Answers the oldest batch in place of its ack. Its fields stay pending
+      // and, no longer in flight, are retried once over HTTP: resending them
+      // here would only draw the same error on every flush.
+      const batch = liveBatches.shift() || [];
+      for (const [id, stamp] of batch) if (liveSent[id] === stamp) delete liveSent[id];
+      console.warn('Sync relay:', message.error);
+      const ids = batch.map(([id]) => id).filter(id => syncPending.has(id));
+      if (ids.length && !syncInFlight) pushSync(ids);
+      return;
     }}
+    if (message.ack) ackLive(liveBatches.shift() || []);
+    applySync(message);
+  }};
+  ws.onclose = () => {{
+    if (syncLive === ws) {{
+      // Unacknowledged edits are still pending and go out again
+      syncLive = null;
+      liveBatches = [];
+      liveSent = {{}};
+      setSyncStatus('Sync offline', true);
+      syncNow();
+    }}
+    setTimeout(connectLive, liveRetry);
+    liveRetry = Math.min(liveRetry * 2, 60000);
   }};
-  reader.readAsText(file);
-  event.target.value = '';
+}}
+
+// Sends the pending fields not already in flight as one message.
+function flushLive() {{
+  if (!syncLive) return syncNow();
+  const ids = [...syncPending].filter(id => liveSent[id] !== sync.stamps[id]);
+  if (!ids.length) return;
+  const batch = ids.map(id => [id, liveSent[id] = sync.stamps[id]]);
+  liveBatches.push(batch);
+  syncLive.send(JSON.stringify({{ changes: syncOps(ids) }}));
+}}
+
+function ackLive(batch) {{
+  for (const [id, stamp] of batch) {{
+    if (sync.stamps[id] === stamp) syncPending.delete(id);
+    if (liveSent[id] === stamp) delete liveSent[id];
+  }}
+}}
+
+// Merges operations from the server: each one replaces the field when its
+// stamp is higher than ours, a pending local edit included (it lost).
+function applySync(result) {{
+  const changed = [];
+  for (const {{ id, value, t }} of result.changes) {{
+    if (!(id in questionMap())) continue;
+    sync.clock = Math.max(sync.clock, t[0]);
+    if (!stampWins(t, sync.stamps[id])) continue;
+    sync.stamps[id] = t;
+    syncPending.delete(id);
+    if ((answers[id] || '') === value) continue;
+    setAnswer(id, value);
+    // Journalled like local edits, so they survive until the next full save
+    journal[id] = value;
+    journalSeq[id] = ++editSeq;
+    changed.push(id);
+  }}
+  sync.cursor = result.cursor;
+  sync.joined = true;
+  saveSyncState();
+  if (changed.length) {{
+    writeJournal();
+    scheduleUpdate(null, true);
+    if (!syncSaveTimer) syncSaveTimer = setTimeout(() => {{
+      syncSaveTimer = null;
+      lastSnapshot = collectResponses();
+      showSaveResult(persistResponses(lastSnapshot));
+    }}, 1000);
+    if (!syncLive) showToast(`Synced ${{changed.length}} answer${{changed.length === 1 ? '' : 's'}} from other devices.`);
+  }}
+  setSyncStatus(syncLive ? 'Live' : 'Synced');
+}}
+
+// On unload the sync state is written and the pending batch goes out as a
+// beacon. The fields stay pending: resending an applied operation next time is
+// a no-op on the server.
+function flushSync() {{
+  if (!sync) return;
+  writeSyncState();
+  if (syncPending.size) navigator.sendBeacon(syncPath(), syncBody([...syncPending]));
 }}
 
 // ── Dark mode ──
@@ -2566,7 +4022,7 @@ function renderSearchResults(results, terms, query) {{
       text = text.replace(re, '<mark>$1</mark>');
     }});
 
-    html += `<div class="search-result-item" onclick="goToQuestion('${{item.creditId}}', '${{item.cardId}}')">
+    html += `<div class="search-result-item" data-action="go-to-question" data-credit-id="${{item.creditId}}" data-card-id="${{item.cardId}}">
       <div><span class="search-result-ref">${{escapeHtml(item.ref)}}</span><span class="search-result-credit">${{escapeHtml(item.credit)}}</span></div>
       <div class="search-result-text">${{text}}</div>
     </div>`;
@@ -2588,7 +4044,7 @@ function goToQuestion(creditId, cardId) {{
   showCredit(creditId);
   // Small delay to let the page render
   setTimeout(() => {{
-    const card = document.getElementById(cardId);
+    const card = attachCard(document.getElementById(cardId));
     if (card) {{
       card.scrollIntoView({{ behavior: 'smooth', block: 'center' }});
       card.style.outline = '2px solid var(--green-mid)';
@@ -2610,6 +4066,45 @@ function hideSearchResults() {{
   document.getElementById('sidebar-nav').style.display = '';
 }}
 
+// ── Guidance panels ──
+// Cards carry only a collapsed wrapper with data-guidance="body:example" (or "-"
+// for a data-note-only panel); the tabbed content is built on first open from
+// the deduplicated GUIDANCE bodies plus the question's own data note.
+const GUIDANCE = {guidance_json};
+
+function questionById(inputId) {{
+  return questionMap()[inputId];
+}}
+
+function renderGuidance(wrapper) {{
+  const card = wrapper.closest('.question-card');
+  const q = (card && questionById(card.id.slice('card-'.length))) || {{}};
+  const note = q.data_note || '';
+  const ref = wrapper.dataset.guidance;
+  let html;
+  if (ref === '-') {{
+    html = `<div class="guidance-content"><div class="guidance-tab-pane active">${{escapeHtml(note)}}</div></div>`;
+  }} else {{
+    const [b, e] = ref.split(':').map(Number);
+    const [guidelines, tips] = GUIDANCE.bodies[b];
+    const allTips = tips + (note ? `<p class="g-note">${{escapeHtml(note)}}</p>` : '');
+    html = '<div class="guidance-content"><div class="guidance-tabs">' +
+      '<button class="g-tab active" data-action="switch-tab" data-tab="0">Guidelines</button>' +
+      '<button class="g-tab" data-action="switch-tab" data-tab="1">Example</button>' +
+      '<button class="g-tab" data-action="switch-tab" data-tab="2">Tips</button></div>' +
+      `<div class="guidance-tab-pane active">${{guidelines}}</div>` +
+      `<div class="guidance-tab-pane">${{GUIDANCE.examples[e]}}</div>` +
+      `<div class="guidance-tab-pane">${{allTips || '<p>No specific watch-outs for this question.</p>'}}</div></div>`;
+  }}
+  wrapper.insertAdjacentHTML('beforeend', html);
+  wrapper.offsetHeight;  // flush styles so the first open still animates
+}}
+
+function toggleGuidance(wrapper) {{
+  if (!wrapper.querySelector('.guidance-content')) renderGuidance(wrapper);
+  wrapper.classList.toggle('open');
+}}
+
 // ── Guidance tab switching ──
 function switchTab(btn, idx) {{
   const wrapper = btn.closest('.guidance-content');
@@ -2620,6 +4115,113 @@ function switchTab(btn, idx) {{
   if (panes[idx]) panes[idx].classList.add('active');
 }}
 
+// ── Windowed question lists ──
+// Cards of long credits start as fixed-height shells holding their content in a
+// <template>. An observer on the scrolling pane attaches cards as they come
+// within a screenful or so of the viewport and detaches them again (keeping
+// their measured height) once they scroll away, so a long credit keeps only a
+// few dozen live cards regardless of its length.
+const detachedContent = new Map();  // card -> DocumentFragment with its content
+let cardObserver = null;
+
+function attachCard(card) {{
+  if (!card || !card.classList.contains('q-shell')) return card;
+  let content = detachedContent.get(card);
+  if (content) {{
+    detachedContent.delete(card);
+  }} else {{
+    const tpl = card.querySelector('template');
+    content = tpl.content;
+    tpl.remove();
+  }}
+  card.appendChild(content);
+  card.classList.remove('q-shell');
+  card.style.height = '';
+  const id = card.id.slice(5);
+  const input = card.querySelector('select, textarea');
+  if (input) {{
+    inputEls[id] = input;
+    input.value = answers[id] || '';
+    if (UNIT_EXPECT[id]) checkUnits(id);
+  }}
+  return card;
+}}
+
+function detachCard(card, height) {{
+  // Cards on hidden pages measure 0 and stay as they are; never pull the
+  // focused input out from under the user.
+  if (!height || card.classList.contains('q-shell') || card.contains(document.activeElement)) return;
+  const content = document.createDocumentFragment();
+  while (card.firstChild) content.appendChild(card.firstChild);
+  detachedContent.set(card, content);
+  card.style.height = height + 'px';
+  card.classList.add('q-shell');
+}}
+
+function initWindowing() {{
+  const shells = document.querySelectorAll('.question-card.q-shell');
+  if (!shells.length) return;
+  if (!('IntersectionObserver' in window)) {{
+    shells.forEach(attachCard);
+    return;
+  }}
+  cardObserver = new IntersectionObserver(entries => {{
+    entries.forEach(entry => {{
+      if (entry.isIntersecting) attachCard(entry.target);
+      else detachCard(entry.target, entry.boundingClientRect.height);
+    }});
+  }}, {{ root: document.getElementById('main-content'), rootMargin: '1200px 0px' }});
+  shells.forEach(card => cardObserver.observe(card));
+}}
+
+// ── Event delegation ──
+// Repeated controls (question inputs, guidance panels, sidebar items, credit
+// headers, history and search entries) carry data attributes only; these few
+// document-level listeners route their events.
+function actionCredit(el) {{
+  const item = el.closest('.sidebar-item');
+  if (item) return item.dataset.credit;
+  const page = el.closest('.credit-page');
+  return page ? page.id : null;
+}}
+
+const ACTIONS = {{
+  'toggle-guidance': el => toggleGuidance(el.parentElement),
+  'switch-tab': el => switchTab(el, +el.dataset.tab),
+  'toggle-category': el => toggleCategory(el),
+  'show-credit': el => showCredit(actionCredit(el)),
+  'toggle-na': (el, e) => toggleNA(actionCredit(el), e),
+  'toggle-wizard': el => toggleWizard(actionCredit(el)),
+  'wizard-prev': el => wizardPrev(actionCredit(el)),
+  'wizard-next': el => wizardNext(actionCredit(el)),
+  'restore-version': el => restoreVersion(+el.dataset.index),
+  'use-revision': el => useRevision(+el.dataset.row),
+  'question-history': el => showHistory(el.closest('.question-card').id.slice(5)),
+  'go-to-question': el => goToQuestion(el.dataset.creditId, el.dataset.cardId),
+  'review-gap': el => goToGap(el.dataset.creditId, el.dataset.cardId),
+}};
+
+document.addEventListener('click', function(e) {{
+  const el = e.target.closest('[data-action]');
+  if (el && ACTIONS[el.dataset.action]) ACTIONS[el.dataset.action](el, e);
+}});
+
+document.addEventListener('input', function(e) {{
+  const el = e.target;
+  if (el.tagName === 'TEXTAREA' && el.dataset.credit) {{
+    answers[el.id] = el.value;
+    onAnswer(el.dataset.credit, el.id);
+  }}
+}});
+
+document.addEventListener('change', function(e) {{
+  const el = e.target;
+  if (el.tagName === 'SELECT' && el.dataset.credit) {{
+    answers[el.id] = el.value;
+    onAnswer(el.dataset.credit, el.id);
+  }}
+}});
+
 // ── Keyboard shortcut ──
 document.addEventListener('keydown', function(e) {{
   if ((e.ctrlKey || e.metaKey) && e.key === 's') {{
@@ -2633,24 +4235,475 @@ document.addEventListener('keydown', function(e) {{
   }}
 }});
 
+// ── Performance instrumentation ──
+// Hot paths are wrapped with performance.mark/measure (visible in the browser's
+// performance timeline) and their durations kept in a fixed-size ring per
+// operation so percentiles stay cheap no matter how long the session runs.
+const PERF_WINDOW = 200;
+let perfSamples = {{}};  // name -> {{ buf: Float64Array, n: int, total: int }}
+
+function perfRecord(name, ms) {{
+  let s = perfSamples[name];
+  if (!s) s = perfSamples[name] = {{ buf: new Float64Array(PERF_WINDOW), n: 0, total: 0 }};
+  s.buf[s.total % PERF_WINDOW] = ms;
+  s.total++;
+  s.n = Math.min(s.total, PERF_WINDOW);
+}}
+
+function perfTimed(name, fn) {{
+  return function() {{
+    const mark = name + ':start';
+    const t0 = performance.now();
+    performance.mark(mark);
+    const done = () => {{
+      perfRecord(name, performance.now() - t0);
+      try {{ performance.measure(name, mark); }} catch(e) {{}}
+      performance.clearMarks(mark);
+      performance.clearMeasures(name);
+    }};
+    let result;
+    try {{
+      result = fn.apply(this, arguments);
+    }} catch(e) {{
+      done();
+      throw e;
+    }}
+    if (result && typeof result.then === 'function') return result.finally(done);
+    done();
+    return result;
+  }};
+}}
+
+function perfStats() {{
+  const out = {{}};
+  for (const [name, s] of Object.entries(perfSamples)) {{
+    const xs = Array.from(s.buf.subarray(0, s.n)).sort((a, b) => a - b);
+    const q = p => xs[Math.min(xs.length - 1, Math.floor(p * xs.length))];
+    const round = v => Math.round(v * 1000) / 1000;
+    out[name] = {{
+      count: s.total, window: s.n,
+      p50: round(q(0.5)), p90: round(q(0.9)), p99: round(q(0.99)),
+      max: round(xs[xs.length - 1]),
+      last: round(s.buf[(s.total - 1) % PERF_WINDOW]),
+    }};
+  }}
+  return out;
+}}
+
+function perfReset() {{ perfSamples = {{}}; }}
+
+function storageUsage() {{
+  // localStorage holds UTF-16 strings: 2 bytes per code unit for key + value
+  const keys = {{}};
+  let total = 0;
+  for (let i = 0; i < localStorage.length; i++) {{
+    const k = localStorage.key(i);
+    const bytes = (k.length + (localStorage.getItem(k) || '').length) * 2;
+    keys[k] = bytes;
+    total += bytes;
+  }}
+  return {{ total: total, keys: keys }};
+}}
+
+function perfDump() {{
+  return {{
+    time: new Date().toISOString(),
+    userAgent: navigator.userAgent,
+    domNodes: document.getElementsByTagName('*').length,
+    memory: performance.memory ? {{
+      usedJSHeapSize: performance.memory.usedJSHeapSize,
+      totalJSHeapSize: performance.memory.totalJSHeapSize,
+    }} : null,
+    timings: perfStats(),
+    storage: storageUsage(),
+  }};
+}}
+
+function showDiagnostics() {{
+  document.getElementById('diag-overlay').classList.add('active');
+  renderDiagnostics();
+}}
+
+function closeDiagnostics() {{
+  document.getElementById('diag-overlay').classList.remove('active');
+}}
+
+function renderDiagnostics() {{
+  const d = perfDump();
+  const kb = b => (b / 1024).toFixed(1) + ' KB';
+  let html = `<div class="diag-meta">${{escapeHtml(d.userAgent)}}<br>${{d.domNodes.toLocaleString()}} DOM nodes`;
+  if (d.memory) html += ` &middot; JS heap ${{kb(d.memory.usedJSHeapSize)}}`;
+  html += `</div><div class="diag-section">Timings (ms, last ${{PERF_WINDOW}} calls)</div>`;
+  html += '<table class="diag-table"><tr><th>Operation</th><th>Calls</th><th>p50</th><th>p90</th><th>p99</th><th>Max</th><th>Last</th></tr>';
+  const names = Object.keys(d.timings).sort();
+  if (names.length === 0) html += '<tr><td colspan="7">No calls recorded yet.</td></tr>';
+  names.forEach(n => {{
+    const t = d.timings[n];
+    html += `<tr><td>${{n}}</td><td>${{t.count}}</td><td>${{t.p50.toFixed(2)}}</td><td>${{t.p90.toFixed(2)}}</td><td>${{t.p99.toFixed(2)}}</td><td>${{t.max.toFixed(2)}}</td><td>${{t.last.toFixed(2)}}</td></tr>`;
+  }});
+  html += `</table><div class="diag-section">localStorage (${{kb(d.storage.total)}})</div>`;
+  html += '<table class="diag-table"><tr><th>Key</th><th>Size</th></tr>';
+  Object.entries(d.storage.keys).sort((a, b) => b[1] - a[1]).forEach(([k, b]) => {{
+    html += `<tr><td>${{escapeHtml(k)}}</td><td>${{kb(b)}}</td></tr>`;
+  }});
+  html += '</table>';
+  document.getElementById('diag-body').innerHTML = html;
+}}
+
+function downloadDiagnostics() {{
+  const blob = new Blob([JSON.stringify(perfDump(), null, 2)], {{type: 'application/json'}});
+  const a = document.createElement('a');
+  a.href = URL.createObjectURL(blob);
+  a.download = 'greenstar_diagnostics.json';
+  a.click();
+}}
+
+document.addEventListener('keydown', function(e) {{
+  if ((e.ctrlKey || e.metaKey) && e.shiftKey && (e.key === 'D' || e.key === 'd')) {{
+    e.preventDefault();
+    const overlay = document.getElementById('diag-overlay');
+    if (overlay.classList.contains('active')) closeDiagnostics(); else showDiagnostics();
+  }}
+}});
+
+onAnswer = perfTimed('onAnswer', onAnswer);
+flushUpdates = perfTimed('flushUpdates', flushUpdates);
+saveAllResponses = perfTimed('saveAllResponses', saveAllResponses);
+loadResponses = perfTimed('loadResponses', loadResponses);
+performSearch = perfTimed('performSearch', performSearch);
+exportExcel = perfTimed('exportExcel', exportExcel);
+applyImport = perfTimed('applyImport', applyImport);
+toggleReview = perfTimed('toggleReview', toggleReview);
+
 // ── Init ──
-window.addEventListener('DOMContentLoaded', function() {{
+// Startup hydration: apply stored answers and N/A state once, build the
+// progress rollups from the model, then paint only what is on screen at load
+// (the sidebar rings and the dashboard). Progress bars and header counts of
+// the credit pages are left to the scheduler's idle lane.
+function hydrate() {{
   loadDarkMode();
+  if (SEED.project) {{
+    document.querySelector('.app-header .subtitle').textContent = SEED.project;
+    document.title = `${{SEED.project}} · ${{document.title}}`;
+  }}
+  seedFresh = !!SEED.answers && localStorage.getItem(STORE_PREFIX + 'responses') === null;
   loadNAState();
-  loadResponses();
+  const pending = loadResponses();
+  if (pending) return pending.then(finishHydration);
+  finishHydration();
+}}
+
+// Fills the seeded answers into fields still empty after the stored answers
+// and the journal; returns their count.
+let seedFresh = false;
+function applySeed() {{
+  let seeded = 0;
+  for (const [id, val] of Object.entries(SEED.answers)) {{
+    if (!val || answers[id] || !(id in questionMap())) continue;
+    setAnswer(id, val);
+    seeded++;
+  }}
+  return seeded;
+}}
+
+function finishHydration() {{
+  const recovered = replayJournal();
+  const seeded = seedFresh ? applySeed() : 0;
+  buildRollups();
   applyConditionalRules();
-  updateAllProgress();
+  for (const id in UNIT_EXPECT) if (answers[id]) checkUnits(id);
+  CREDITS_DATA.forEach(c => updateSidebarRing(c.id));
   updateDashboard();
+  document.querySelectorAll('.credit-page').forEach(p => idleCredits.add(p.id));
+  queueIdleUpdates();
+  initWindowing();
+  // Fold edits recovered from the journal, and seeded answers, into the main
+  // store and history
+  if (recovered || seeded) saveAllResponses();
+  initSync();
+}}
+
+window.addEventListener('DOMContentLoaded', function() {{
+  perfTimed('startup', hydrate)();
+  if (location.hash === '#diagnostics') showDiagnostics();
 }});
 </script>
 </body>
 </html>'''
+    return html
+
+
+# ── Project seeds ────────────────────────────────────────────────────────────
+# Placeholder render_html is given for SEED in bulk builds: the page is rendered
+# once and split around it, and each project's site is the two halves with its
+# seed in between.
+SEED_SLOT = "__GREENSTAR_SEED__"
+
+
+def project_seed(project, answers):
+    """The page's SEED for one project, safe to embed in a <script>."""
+    return json.dumps({"project": project, "answers": answers}, separators=(",", ":")).replace("</", "<\\/")
+
+
+def seed_files(seeds_dir):
+    """Seed response files under ``seeds_dir``, checked with check_seed_names."""
+    import response_workbooks as rw
+
+    paths = rw.expand_paths([seeds_dir], (".json", ".json.gz", ".xlsx"))
+    check_seed_names(paths)
+    return paths
+
+
+def check_seed_names(paths):
+    """Raises ValueError when two seed files map to the same project."""
+    import response_workbooks as rw
+
+    names = {}
+    for path in paths:
+        names.setdefault(rw.project_name(path), []).append(path)
+    duplicates = [f"{name}: {', '.join(found)}" for name, found in sorted(names.items()) if len(found) > 1]
+    if duplicates:
+        raise ValueError("seed files with the same project name: " + "; ".join(duplicates))
+
+
+def read_seeds(paths, credits_json_data, defaults=None):
+    """[(project, answers, skipped)] from seed response files (JSON exports,
+    .json.gz or response workbooks). Answers of ``defaults`` apply to every
+    project unless its own file answers the question; only known input ids
+    with valid values are kept. Raises ValueError when two files map to the
+    same project (e.g. p.json and p.xlsx), as both would write one site."""
+    import response_workbooks as rw
+
+    questions = [q for c in credits_json_data for sec in c["sections"] for cr in sec["criteria"]
+                 for q in cr["questions"]]
+    selects = {q["input_id"] for q in questions if q["type"] == "Condition (Y/N)"}
+    known = {q["input_id"] for q in questions}
+    fields = rw.sheet_fields(credits_json_data)
+
+    def read(path):
+        if path.lower().endswith(".xlsx"):
+            return rw.read_response_workbook(path, fields)[0]
+        return rw.read_responses(path)
+
+    def clean(data, skipped):
+        answers = {}
+        for input_id, value in data.items():
+            text = str(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+            if input_id not in known or not isinstance(text, str) or (input_id in selects and text not in ("", "Yes", "No")):
+                skipped.append(input_id)
+            elif text:
+                answers[input_id] = text
+        return answers
+
+    check_seed_names(paths)
+    base = clean(read(defaults), []) if defaults else {}
+    seeds = []
+    for path in paths:
+        skipped = []
+        seeds.append((rw.project_name(path), {**base, **clean(read(path), skipped)}, skipped))
+    return seeds
+
+
+def write_sites(html, seeds, output_dir):
+    """One site per project: ``output_dir/<project>/index.html``. Returns the bytes written."""
+    if html.count(SEED_SLOT) != 1:
+        raise ValueError(f"rendered page has {html.count(SEED_SLOT)} seed slots ({SEED_SLOT}), expected exactly 1")
+    head, tail = (part.encode() for part in html.split(SEED_SLOT))
+    total = 0
+    for project, answers, _ in seeds:
+        site_dir = os.path.join(output_dir, project)
+        os.makedirs(site_dir, exist_ok=True)
+        seed = project_seed(project, answers).encode()
+        with open(os.path.join(site_dir, "index.html"), "wb") as f:
+            f.write(head)
+            f.write(seed)
+            f.write(tail)
+        total += len(head) + len(seed) + len(tail)
+    return total
+
+
+# ── Build profiling ──────────────────────────────────────────────────────────
+class BuildProfiler:
+    """Per-stage wall time, CPU time and peak traced memory for one build.
+
+    Disabled profilers still run every stage, they just skip the bookkeeping,
+    so the pipeline in ``main`` is the same code path with or without --profile.
+    """
+
+    def __init__(self, enabled=False, trace_memory=True):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.stages.append({
+                "stage": name,
+                "wall_s": round(time.perf_counter() - wall0, 6),
+                "cpu_s": round(time.process_time() - cpu0, 6),
+                "peak_mem_bytes": tracemalloc.get_traced_memory()[1] if self.trace_memory else None,
+            })
+
+    def start(self):
+        if self.trace_memory:
+            tracemalloc.start()
+
+    def stop(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self, **extra):
+        """Machine-readable report: stages in run order plus totals and ``extra`` counts."""
+        return {
+            "stages": self.stages,
+            "total": {
+                "wall_s": round(sum(s["wall_s"] for s in self.stages), 6),
+                "cpu_s": round(sum(s["cpu_s"] for s in self.stages), 6),
+                "peak_mem_bytes": max((s["peak_mem_bytes"] or 0 for s in self.stages), default=0),
+            },
+            **extra,
+        }
 
-with open("index.html", "w") as f:
-    f.write(html)
+    def print_table(self):
+        print(f"  {'Stage':<20}{'Wall (s)':>10}{'CPU (s)':>10}{'Peak mem (KiB)':>16}")
+        for s in self.stages:
+            mem = f"{s['peak_mem_bytes'] / 1024:,.0f}" if s["peak_mem_bytes"] is not None else "-"
+            print(f"  {s['stage']:<20}{s['wall_s']:>10.3f}{s['cpu_s']:>10.3f}{mem:>16}")
+
+
+def build_site(xlsx_path=XLSX_PATH, docx_path=DOCX_PATH, output="index.html", profiler=None,
+               window_threshold=WINDOW_MIN_QUESTIONS, benchmarks_path=None, seeds_dir=None, seed_defaults=None):
+    """Run the whole pipeline, one profiler stage per step. Returns the build summary.
+
+    With ``seeds_dir`` the page is rendered once and written pre-filled for
+    every seed response file in it, one site per project under ``output``."""
+    profiler = profiler or BuildProfiler()
+
+    with profiler.stage("xlsx_parse"):
+        all_credits = parse_workbook(xlsx_path)
+        credits_json_data = build_credits_json(all_credits)
+    with profiler.stage("conditional_rules"):
+        conditional_rules = build_conditional_rules(all_credits)
+    with profiler.stage("search_index"):
+        search_index = build_search_index(all_credits)
+    with profiler.stage("docx_parse"):
+        docx_guidance = parse_guidelines(docx_path)
+    print(f"  DOCX credits parsed: {len(docx_guidance)}")
+    with profiler.stage("guidance_matching"):
+        guidance, guidance_data = build_guidance(all_credits, docx_guidance)
+    benchmarks = None
+    if benchmarks_path:
+        with profiler.stage("benchmarks"):
+            with open(benchmarks_path) as f:
+                benchmarks = json.load(f)
+        print(f"  Benchmarked questions: {len(benchmarks)}")
+    seeds = None
+    if seeds_dir:
+        with profiler.stage("seeds"):
+            seeds = read_seeds(seed_files(seeds_dir), credits_json_data, seed_defaults)
+        print(f"  Seeded projects: {len(seeds)}")
+        for project, _, skipped in seeds:
+            if skipped:
+                print(f"  {project}: skipped {len(skipped)} unknown or invalid answers")
+    with profiler.stage("html_assembly"):
+        html = render_html(all_credits, credits_json_data, conditional_rules, search_index,
+                           guidance, guidance_data, window_threshold, benchmarks,
+                           SEED_SLOT if seeds is not None else "{}")
+    with profiler.stage("write"):
+        if seeds is None:
+            with open(output, "w") as f:
+                f.write(html)
+            size = len(html)
+        else:
+            size = write_sites(html, seeds, output)
 
-print(f"Generated index.html")
-print(f"  Credits: {total_credits}")
-print(f"  Questions: {total_questions}")
-print(f"  Categories: {len(CATEGORIES)}")
-print(f"  File size: {len(html):,} bytes")
+    summary = {
+        "credits": len(all_credits),
+        "questions": sum(len(c["questions"]) for c in all_credits),
+        "categories": len(CATEGORIES),
+        "bytes": size,
+    }
+    if seeds is not None:
+        summary["sites"] = len(seeds)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--xlsx", default=XLSX_PATH, help="submission questions workbook")
+    parser.add_argument("--docx", default=DOCX_PATH, help="submission guidelines document")
+    parser.add_argument("-o", "--output",
+                        help="generated site (default: index.html), or with --seeds the directory of "
+                             "per-project sites (default: sites)")
+    parser.add_argument("--window-threshold", type=int, default=WINDOW_MIN_QUESTIONS, metavar="N",
+                        help="render credits with at least N questions windowed; 0 disables "
+                             f"(default: {WINDOW_MIN_QUESTIONS})")
+    parser.add_argument("--benchmarks", metavar="PATH",
+                        help="portfolio quantiles to show percentiles against (portfolio_store.py benchmarks)")
+    parser.add_argument("--seeds", metavar="DIR",
+                        help="directory of seed response files (.json, .json.gz, .xlsx); writes one "
+                             "pre-filled site per project, DIR/<project>.json -> OUTPUT/<project>/index.html")
+    parser.add_argument("--seed-defaults", metavar="PATH",
+                        help="response file with answers every seeded project starts with "
+                             "(e.g. organisational policies), under each project's own answers")
+    parser.add_argument("--profile", action="store_true",
+                        help="report wall time, CPU time and peak memory for each build stage")
+    parser.add_argument("--profile-json", metavar="PATH",
+                        help="write the stage report as JSON (implies --profile)")
+    parser.add_argument("--pstats", metavar="PATH",
+                        help="dump cProfile statistics for the whole build to PATH")
+    args = parser.parse_args(argv)
+    if args.seed_defaults and not args.seeds:
+        parser.error("--seed-defaults requires --seeds")
+    output = args.output or ("sites" if args.seeds else "index.html")
+    if args.seeds:
+        # Fail before the build, not after it
+        try:
+            seed_files(args.seeds)
+        except ValueError as e:
+            parser.error(str(e))
+
+    profiler = BuildProfiler(enabled=args.profile or bool(args.profile_json))
+    cprof = cProfile.Profile() if args.pstats else None
+    profiler.start()
+    if cprof:
+        cprof.enable()
+    try:
+        summary = build_site(args.xlsx, args.docx, output, profiler, args.window_threshold, args.benchmarks,
+                             args.seeds, args.seed_defaults)
+    finally:
+        if cprof:
+            cprof.disable()
+        profiler.stop()
+
+    if "sites" in summary:
+        print(f"Generated {summary['sites']} sites in {output}/")
+    else:
+        print(f"Generated {output}")
+    print(f"  Credits: {summary['credits']}")
+    print(f"  Questions: {summary['questions']}")
+    print(f"  Categories: {summary['categories']}")
+    print(f"  {'Total size' if 'sites' in summary else 'File size'}: {summary['bytes']:,} bytes")
+
+    if profiler.enabled:
+        profiler.print_table()
+    if args.profile_json:
+        with open(args.profile_json, "w") as f:
+            json.dump(profiler.report(**summary), f, indent=2)
+        print(f"  Profile report: {args.profile_json}")
+    if cprof:
+        cprof.dump_stats(args.pstats)
+        print(f"  cProfile stats: {args.pstats} (python -m pstats {args.pstats})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""Portfolio store: responses from many projects in one SQLite database.
+
+Ingests JSON exports of the page (.json, .json.gz) and response workbooks
+(.xlsx) into a table keyed by question x project, so one question can be read
+across every project with a single index range scan. Re-ingesting skips files
+whose content hash has not changed.
+
+Answers to Data questions that ask for a measurable value are also read with
+units.py into canonical SI values, and values far from the rest of their
+question's column are flagged as outliers. Their distributions are exported as
+benchmarks for the generated page (generate_website.py --benchmarks).
+
+Answers to the Condition (Y/N) gateways are counted into a cube: answer counts
+per category, credit, level, criteria and question, kept up to date
+incrementally as projects are ingested.
+
+    python portfolio_store.py ingest exports/ --db portfolio.sqlite
+    python portfolio_store.py query RRM.13 --db portfolio.sqlite
+    python portfolio_store.py outliers --db portfolio.sqlite
+    python portfolio_store.py benchmarks -o benchmarks.json --db portfolio.sqlite
+    python portfolio_store.py gateways --by criteria --credit "Responsible Construction"
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+
+import response_workbooks as rw
+import units
+
+DB_PATH = "portfolio.sqlite"
+BENCHMARKS_JSON = "benchmarks.json"
+SKETCH_POINTS = 65  # quantiles kept per question and dimension (every 1/64th)
+GATEWAY_TYPE = "Condition (Y/N)"
+# Hierarchy of the gateway cube, outermost first; a node at depth d is the
+# first d + 1 of (category, credit, level, criteria, ref), the rest ''
+CUBE_LEVELS = ("category", "credit", "level", "criteria", "question")
+
+# answers is clustered on (question_id, project_id): all answers to one
+# question are adjacent on disk. Empty answers are not stored.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    input_id TEXT NOT NULL UNIQUE,
+    credit TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_ref ON questions (ref);
+CREATE TABLE IF NOT EXISTS answers (
+    question_id INTEGER NOT NULL REFERENCES questions (id),
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    value TEXT NOT NULL,
+    PRIMARY KEY (question_id, project_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS answers_project ON answers (project_id);
+CREATE TABLE IF NOT EXISTS measures (
+    question_id INTEGER NOT NULL REFERENCES questions (id),
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    value REAL,
+    dimension TEXT,
+    status TEXT NOT NULL,
+    outlier INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (question_id, project_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS measures_project ON measures (project_id);
+CREATE TABLE IF NOT EXISTS gateway_nodes (
+    question_id INTEGER NOT NULL REFERENCES questions (id),
+    depth INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    credit TEXT NOT NULL,
+    level TEXT NOT NULL,
+    criteria TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    PRIMARY KEY (question_id, depth)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS gateway_cube (
+    depth INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    credit TEXT NOT NULL,
+    level TEXT NOT NULL,
+    criteria TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (depth, category, credit, level, criteria, ref, answer)
+) WITHOUT ROWID;
+"""
+
+
+def connect(path=DB_PATH):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ── Ingestion ────────────────────────────────────────────────────────────────
+def sync_questions(conn, credits_json_data):
+    """Make sure every question of the model has a row; returns input id -> row id."""
+    with conn:
+        conn.executemany(
+            "INSERT INTO questions (input_id, credit, ref, type) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (input_id) DO UPDATE SET credit = excluded.credit, ref = excluded.ref, type = excluded.type",
+            [(q["input_id"], credit["sheet_name"], q["ref"], q["type"])
+             for credit in credits_json_data
+             for sec in credit["sections"] for cr in sec["criteria"] for q in cr["questions"]])
+    return dict(conn.execute("SELECT input_id, id FROM questions"))
+
+
+def sync_gateways(conn, credits_json_data, question_ids):
+    """Place every gateway question in the cube hierarchy. Rebuilds the cube
+    when the hierarchy changed, when it was never built for stored answers, or
+    when it still holds raw answers from before they were normalised."""
+    nodes = set()
+    for credit in credits_json_data:
+        for sec in credit["sections"]:
+            for cr in sec["criteria"]:
+                for q in cr["questions"]:
+                    if q["type"] != GATEWAY_TYPE or q["input_id"] not in question_ids:
+                        continue
+                    path = (credit["category"], credit["sheet_name"], sec["title"], cr["name"], q["ref"])
+                    for depth in range(len(CUBE_LEVELS)):
+                        nodes.add((question_ids[q["input_id"]], depth) + path[:depth + 1] + ("",) * (4 - depth))
+    current = set(conn.execute("SELECT question_id, depth, category, credit, level, criteria, ref FROM gateway_nodes"))
+    if current != nodes:
+        with conn:
+            conn.execute("DELETE FROM gateway_nodes")
+            conn.executemany("INSERT INTO gateway_nodes VALUES (?, ?, ?, ?, ?, ?, ?)", sorted(nodes))
+        rebuild_gateway_cube(conn)
+    elif (not conn.execute("SELECT 1 FROM gateway_cube LIMIT 1").fetchone()
+          or conn.execute("SELECT 1 FROM gateway_cube WHERE answer NOT IN ('Yes', 'No', 'Invalid') LIMIT 1").fetchone()):
+        rebuild_gateway_cube(conn)
+
+
+# Gateway answers enter the cube as Yes, No or Invalid: workbooks carry
+# variants like "yes", "Y" or "N/A" that the page's select never produces.
+_CUBE_ANSWER = ("CASE WHEN lower(trim(a.value)) IN ('yes', 'y') THEN 'Yes' "
+                "WHEN lower(trim(a.value)) IN ('no', 'n') THEN 'No' ELSE 'Invalid' END")
+_CUBE_SELECT = (
+    f"SELECT n.depth, n.category, n.credit, n.level, n.criteria, n.ref, {_CUBE_ANSWER}, {{count}} "
+    "FROM answers a JOIN gateway_nodes n ON n.question_id = a.question_id {where} "
+    f"GROUP BY n.depth, n.category, n.credit, n.level, n.criteria, n.ref, {_CUBE_ANSWER}")
+
+
+def rebuild_gateway_cube(conn):
+    """Recount the whole gateway cube from the stored answers."""
+    with conn:
+        conn.execute("DELETE FROM gateway_cube")
+        conn.execute("INSERT INTO gateway_cube " + _CUBE_SELECT.format(count="COUNT(*)", where=""))
+
+
+def _cube_delta(conn, project_id, sign):
+    """Add (sign=1) or remove (sign=-1) one project's gateway answers in the cube."""
+    conn.execute(
+        "INSERT INTO gateway_cube " + _CUBE_SELECT.format(count="? * COUNT(*)", where="WHERE a.project_id = ?") +
+        " ON CONFLICT DO UPDATE SET count = count + excluded.count", (sign, project_id))
+
+
+def measured_questions(credits_json_data):
+    """Input id -> expected dimensions for every Data question asking for a quantity."""
+    expected = {}
+    for credit in credits_json_data:
+        for sec in credit["sections"]:
+            for cr in sec["criteria"]:
+                for q in cr["questions"]:
+                    dims = units.expected_dimensions(q["question"]) if q["type"] == "Data" else []
+                    if dims:
+                        expected[q["input_id"]] = dims
+    return expected
+
+
+def refresh_outliers(conn, question_ids):
+    """Recompute the outlier flags of the given questions' measures, one column
+    per question and dimension."""
+    with conn:
+        for question_id in question_ids:
+            columns = {}
+            for project_id, dimension, value in conn.execute(
+                    "SELECT project_id, dimension, value FROM measures WHERE question_id = ? AND status = 'ok'",
+                    (question_id,)):
+                columns.setdefault(dimension, []).append((project_id, value))
+            updates = []
+            for column in columns.values():
+                flags = units.flag_outliers([value for _, value in column])
+                updates.extend((int(flag), question_id, project_id) for (project_id, _), flag in zip(column, flags))
+            conn.executemany("UPDATE measures SET outlier = ? WHERE question_id = ? AND project_id = ?", updates)
+
+
+def _read(path, credits_json_data):
+    if path.lower().endswith(".xlsx"):
+        responses, _ = rw.read_response_workbook(path, rw.sheet_fields(credits_json_data))
+        return responses
+    return rw.read_responses(path)
+
+
+def ingest(conn, paths, credits_json_data):
+    """Load response files into the store, one transaction per project.
+
+    Yields (path, project, status, error) with status "unchanged", "added",
+    "updated" or "error"; error is the message of a file that could not be
+    read, which leaves its project as it was. A file whose SHA-256 matches the
+    one last ingested for its project is not parsed again. Outlier flags of
+    the measured questions are refreshed after the last file, or when the run
+    stops early, if any project changed; gateway cube counts move with each
+    project's transaction.
+
+    Raises ValueError before ingesting anything when two files map to the
+    same project name (e.g. p.json and p.xlsx), since each would keep
+    replacing the other."""
+    paths = list(paths)
+    names = {}
+    for path in paths:
+        names.setdefault(rw.project_name(path), []).append(path)
+    duplicates = {name: found for name, found in names.items() if len(found) > 1}
+    if duplicates:
+        raise ValueError("files with the same project name: " +
+                         "; ".join(f"{name}: {', '.join(found)}" for name, found in sorted(duplicates.items())))
+
+    question_ids = sync_questions(conn, credits_json_data)
+    sync_gateways(conn, credits_json_data, question_ids)
+    expected = {input_id: dims for input_id, dims in measured_questions(credits_json_data).items()
+                if input_id in question_ids}
+    changed = False
+    try:
+        for path in paths:
+            name = rw.project_name(path)
+            try:
+                with open(path, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                row = conn.execute("SELECT id, sha256 FROM projects WHERE name = ?", (name,)).fetchone()
+                if row and row[1] == digest:
+                    yield path, name, "unchanged", None
+                    continue
+                responses = _read(path, credits_json_data)
+                measures = [(question_ids[input_id], *units.normalize(str(responses[input_id]), dims))
+                            for input_id, dims in expected.items() if responses.get(input_id) not in (None, "")]
+            except Exception as e:  # unreadable file: report it, keep going
+                yield path, name, "error", f"{type(e).__name__}: {e}"
+                continue
+            with conn:
+                stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+                if row:
+                    project_id = row[0]
+                    conn.execute("UPDATE projects SET path = ?, sha256 = ?, ingested_at = ? WHERE id = ?",
+                                 (path, digest, stamp, project_id))
+                    _cube_delta(conn, project_id, -1)
+                    conn.execute("DELETE FROM answers WHERE project_id = ?", (project_id,))
+                    conn.execute("DELETE FROM measures WHERE project_id = ?", (project_id,))
+                else:
+                    project_id = conn.execute("INSERT INTO projects (name, path, sha256, ingested_at) VALUES (?, ?, ?, ?)",
+                                              (name, path, digest, stamp)).lastrowid
+                conn.executemany(
+                    "INSERT INTO answers (question_id, project_id, value) VALUES (?, ?, ?)",
+                    [(question_ids[input_id], project_id, str(value))
+                     for input_id, value in responses.items()
+                     if value not in (None, "") and input_id in question_ids])
+                conn.executemany(
+                    "INSERT INTO measures (question_id, project_id, value, dimension, status) VALUES (?, ?, ?, ?, ?)",
+                    [(question_id, project_id, *measure) for question_id, *measure in measures])
+                _cube_delta(conn, project_id, 1)
+            changed = True
+            yield path, name, "updated" if row else "added", None
+    finally:
+        if changed:
+            refresh_outliers(conn, [question_ids[input_id] for input_id in expected])
+            with conn:
+                conn.execute("DELETE FROM gateway_cube WHERE count = 0")
+
+
+# ── Queries ──────────────────────────────────────────────────────────────────
+def answers_for(conn, ref, credit=None):
+    """[(project, credit, value, si_value, dimension, outlier)] for every stored
+    answer to question ``ref``, optionally restricted to one credit's sheet
+    name. The last three are None for answers that are not measured."""
+    sql = ("SELECT p.name, q.credit, a.value, m.value, m.dimension, m.outlier FROM questions q "
+           "JOIN answers a ON a.question_id = q.id JOIN projects p ON p.id = a.project_id "
+           "LEFT JOIN measures m ON m.question_id = a.question_id AND m.project_id = a.project_id "
+           "WHERE q.ref = ?")
+    params = [ref]
+    if credit:
+        sql += " AND q.credit = ?"
+        params.append(credit)
+    return conn.execute(sql + " ORDER BY p.name", params).fetchall()
+
+
+def outliers(conn):
+    """[(credit, ref, project, value, si_value, dimension)] of every flagged measure."""
+    return conn.execute(
+        "SELECT q.credit, q.ref, p.name, a.value, m.value, m.dimension FROM measures m "
+        "JOIN questions q ON q.id = m.question_id JOIN projects p ON p.id = m.project_id "
+        "JOIN answers a ON a.question_id = m.question_id AND a.project_id = m.project_id "
+        "WHERE m.outlier ORDER BY q.credit, q.ref, p.name").fetchall()
+
+
+def _sketch(values, points):
+    """Sorted ``values`` as they are, or ``points`` evenly spaced quantiles of
+    them (first and last are the minimum and maximum)."""
+    if len(values) <= points:
+        return values
+    last = len(values) - 1
+    out = []
+    for i in range(points):
+        pos = i * last / (points - 1)
+        lo = int(pos)
+        hi = min(lo + 1, last)
+        out.append(values[lo] + (values[hi] - values[lo]) * (pos - lo))
+    return out
+
+
+def benchmarks(conn, points=SKETCH_POINTS, min_count=5):
+    """Portfolio distribution of every measured question, for percentile lookups.
+
+    Returns {input id: {dimension: [count, quantiles]}} over the measures that
+    parsed and are not outliers. Columns of up to ``points`` values keep every
+    value (sorted); larger ones keep ``points`` quantiles, so the size does not
+    grow with the number of projects. Values are rounded to 4 significant
+    digits; columns with fewer than ``min_count`` projects are left out."""
+    out = {}
+    rows = conn.execute(
+        "SELECT q.input_id, m.dimension, m.value FROM measures m JOIN questions q ON q.id = m.question_id "
+        "WHERE m.status = 'ok' AND NOT m.outlier ORDER BY q.input_id, m.dimension, m.value")
+    column, values = None, []
+
+    def flush():
+        if column and len(values) >= min_count:
+            sketch = [float(f"{v:.4g}") for v in _sketch(values, points)]
+            out.setdefault(column[0], {})[column[1]] = [len(values), sketch]
+
+    for input_id, dimension, value in rows:
+        if (input_id, dimension) != column:
+            flush()
+            column, values = (input_id, dimension), []
+        values.append(value)
+    flush()
+    return out
+
+
+def gateway_rates(conn, by="credit", **within):
+    """[(node, gateways, yes, no, invalid)] from the gateway cube, one row per
+    node at level ``by`` (a CUBE_LEVELS name).
+
+    ``node`` is the path of names down to that level, ``gateways`` the number
+    of gateway questions under it, and ``yes``/``no``/``invalid`` count
+    answers across all projects (invalid: stored answers that are neither). Keyword arguments (category, credit, level, criteria) keep only
+    the nodes under those names."""
+    depth = CUBE_LEVELS.index(by)
+    where, params = "depth = ?", [depth]
+    for column, value in within.items():
+        if column not in CUBE_LEVELS[:4]:
+            raise ValueError(f"unknown cube level {column!r}")
+        if value is not None:
+            where += f" AND {column} = ?"
+            params.append(value)
+    columns = "category, credit, level, criteria, ref"
+    counts = {row[:5]: row[5:] for row in conn.execute(
+        f"SELECT {columns}, SUM(CASE WHEN answer = 'Yes' THEN count ELSE 0 END), "
+        f"SUM(CASE WHEN answer = 'No' THEN count ELSE 0 END), "
+        f"SUM(CASE WHEN answer = 'Invalid' THEN count ELSE 0 END) FROM gateway_cube WHERE {where} "
+        f"GROUP BY {columns}", params)}
+    rows = []
+    for row in conn.execute(f"SELECT {columns}, COUNT(*) FROM gateway_nodes WHERE {where} "
+                            f"GROUP BY {columns} ORDER BY {columns}", params):
+        key, gateways = row[:5], row[5]
+        rows.append((key[:depth + 1], gateways, *counts.get(key, (0, 0, 0))))
+    return rows
+
+
+def project_answers(conn, name):
+    """{input id: value} of one project's stored answers."""
+    return dict(conn.execute(
+        "SELECT q.input_id, a.value FROM projects p JOIN answers a ON a.project_id = p.id "
+        "JOIN questions q ON q.id = a.question_id WHERE p.name = ?", (name,)))
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=DB_PATH, help=f"SQLite database (default: {DB_PATH})")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ing = commands.add_parser("ingest", parents=[common], help="load response files into the store")
+    ing.add_argument("paths", nargs="+", help="JSON exports or response workbooks, or directories of them")
+    ing.add_argument("--questions", default=rw.gw.XLSX_PATH, help="submission questions workbook the site is built from")
+
+    q = commands.add_parser("query", parents=[common], help="every project's answer to one question")
+    q.add_argument("ref", help="question ref, e.g. RRM.13")
+    q.add_argument("--credit", help="only this credit (sheet name), for refs shared between credits")
+    q.add_argument("--json", action="store_true", help="print JSON instead of tab-separated rows")
+
+    commands.add_parser("outliers", parents=[common], help="measured answers far from other projects' answers")
+
+    b = commands.add_parser("benchmarks", parents=[common], help="portfolio quantiles of measured answers, for the page")
+    b.add_argument("-o", "--output", default=BENCHMARKS_JSON, help=f"JSON file to write (default: {BENCHMARKS_JSON})")
+    b.add_argument("--points", type=int, default=SKETCH_POINTS,
+                   help=f"quantiles kept per question (default: {SKETCH_POINTS})")
+
+    g = commands.add_parser("gateways", parents=[common], help="Yes/No rates of the Condition (Y/N) gateways")
+    g.add_argument("--by", choices=CUBE_LEVELS, default="credit", help="level to break the rates down by (default: credit)")
+    for level in CUBE_LEVELS[:4]:
+        g.add_argument(f"--{level}", help=f"only nodes under this {level}")
+    g.add_argument("--json", action="store_true", help="print JSON instead of tab-separated rows")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    if args.command == "ingest":
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "error": 0}
+        paths = rw.expand_paths(args.paths, (".json", ".json.gz", ".xlsx"))
+        t0 = time.perf_counter()
+        try:
+            for path, name, status, error in ingest(conn, paths, rw.load_credits(args.questions)):
+                counts[status] += 1
+                if status == "error":
+                    print(f"{status:<8} {name} ({path}): {error}", file=sys.stderr)
+                elif status != "unchanged":
+                    print(f"{status:<8} {name} ({path})")
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"{len(paths)} files in {time.perf_counter() - t0:.2f}s: "
+              f"{counts['added']} added, {counts['updated']} updated, {counts['unchanged']} unchanged"
+              + (f", {counts['error']} failed" if counts["error"] else ""))
+    elif args.command == "query":
+        t0 = time.perf_counter()
+        rows = answers_for(conn, args.ref, args.credit)
+        elapsed = (time.perf_counter() - t0) * 1000
+        if args.json:
+            json.dump([{"project": p, "credit": c, "value": v, "si_value": si, "dimension": d,
+                        "outlier": bool(o)} for p, c, v, si, d, o in rows], sys.stdout, indent=2)
+            print()
+        else:
+            for project, credit, value, si_value, dimension, outlier in rows:
+                measure = f"\t{si_value:g} {dimension}{' OUTLIER' if outlier else ''}" if si_value is not None else ""
+                print(f"{project}\t{credit}\t{value}{measure}")
+        print(f"{len(rows)} answers in {elapsed:.1f} ms", file=sys.stderr)
+    elif args.command == "benchmarks":
+        data = benchmarks(conn, args.points)
+        with open(args.output, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        projects = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        print(f"{args.output}: {len(data)} questions from {projects} projects")
+    elif args.command == "gateways":
+        t0 = time.perf_counter()
+        rows = gateway_rates(conn, args.by, **{level: getattr(args, level) for level in CUBE_LEVELS[:4]})
+        elapsed = (time.perf_counter() - t0) * 1000
+        projects = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        report = [{"node": list(node), "gateways": gateways, "yes": yes, "no": no, "invalid": invalid,
+                   "unanswered": gateways * projects - yes - no - invalid,
+                   "yes_rate": round(yes / (yes + no), 4) if yes + no else None}
+                  for node, gateways, yes, no, invalid in rows]
+        if args.json:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            for r in report:
+                rate = f"{r['yes_rate']:.1%}" if r["yes_rate"] is not None else "-"
+                print(f"{' / '.join(r['node'])}\t{r['gateways']}\t{r['yes']}\t{r['no']}\t{r['invalid']}\t"
+                      f"{r['unanswered']}\t{rate}")
+        print(f"{len(rows)} nodes over {projects} projects in {elapsed:.1f} ms", file=sys.stderr)
+    else:
+        rows = outliers(conn)
+        for credit, ref, project, value, si_value, dimension in rows:
+            print(f"{credit}\t{ref}\t{project}\t{value}\t{si_value:g} {dimension}")
+        print(f"{len(rows)} outliers", file=sys.stderr)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
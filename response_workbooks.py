@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Bulk conversion between response workbooks and the site's JSON response files.
+
+Both directions use the credits model generate_website.py builds the site from,
+so sheet names, refs and input ids match what the page exports and imports.
+
+    python response_workbooks.py import responses/*.xlsx -o json/
+    python response_workbooks.py export projects/ -o workbooks/ -j 8
+
+Each file is converted in its own worker process and written as it is read
+(workbooks in openpyxl's streaming modes), so memory stays bounded by the
+number of jobs, not the size of the batch.
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
+import generate_website as gw
+
+RESPONSES_JSON = "greenstar_v1.1_responses.json"
+
+HEADERS = [
+    "Ref", "Credit", "Performance Level", "Criteria",
+    "Question Type", "Question", "Response",
+    "Data Collection / Research Notes",
+]
+COL_WIDTHS = [8, 20, 22, 28, 16, 55, 50, 40]
+
+# Cell styles of the page's exportExcel: name -> (fill, font options, alignment options)
+STYLES = {
+    "header": ("0D3318", {"bold": True, "size": 14, "color": "FFFFFF"}, {"vertical": "center", "horizontal": "center"}),
+    "credit": ("1F4E28", {"bold": True, "size": 12, "color": "FFFFFF"}, {}),
+    "level": ("2E7D32", {"bold": True, "size": 11, "color": "FFFFFF"}, {}),
+    "criteria": ("C8E6C9", {"bold": True, "size": 11, "color": "1F4E28"}, {}),
+    "question": ("F1F8E9", {"size": 10}, {"vertical": "top"}),
+    "condition": ("EDE7F6", {"bold": True, "size": 10, "color": "7030A0"}, {"vertical": "top"}),
+    "data": ("E3F2FD", {"size": 10, "italic": True, "color": "2E75B6"}, {"vertical": "top"}),
+    "response": ("FFFFFF", {"size": 10}, {"vertical": "top"}),
+}
+
+
+# ── Model ────────────────────────────────────────────────────────────────────
+def load_credits(questions_path=gw.XLSX_PATH):
+    """The page's CREDITS_DATA, built from the questions workbook."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return gw.build_credits_json(gw.parse_workbook(questions_path))
+
+
+def sheet_fields(credits_json_data):
+    """Exported sheet name -> {ref: input id}, in page order.
+
+    Sheet names are truncated to Excel's 31 characters, as exportExcel does."""
+    fields = {}
+    for credit in credits_json_data:
+        refs = fields.setdefault(credit["sheet_name"][:31], {})
+        for sec in credit["sections"]:
+            for cr in sec["criteria"]:
+                for q in cr["questions"]:
+                    refs[q["ref"]] = q["input_id"]
+    return fields
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# ── Import ───────────────────────────────────────────────────────────────────
+def read_response_workbook(path, fields):
+    """Responses by input id from a response workbook, and what could not be placed.
+
+    Streams each sheet in read-only mode, so cell styles are never loaded. The
+    header row locates the Ref, Question Type and Response columns; rows with a
+    question type are matched to ``fields`` by ref. Unanswered questions map to
+    "" like the page's JSON export."""
+    responses = {input_id: "" for refs in fields.values() for input_id in refs.values()}
+    skipped = []
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            refs = fields.get(ws.title)
+            if refs is None:
+                skipped.append(ws.title)
+                continue
+            cols = None
+            for row in ws.iter_rows(values_only=True):
+                if cols is None:
+                    if "Ref" in row and "Response" in row:
+                        type_col = row.index("Question Type") if "Question Type" in row else None
+                        cols = (row.index("Ref"), type_col, row.index("Response"))
+                    continue
+                ref_col, type_col, response_col = cols
+                ref = _cell_text(row[ref_col]) if ref_col < len(row) else ""
+                if not ref or (type_col is not None and (type_col >= len(row) or row[type_col] is None)):
+                    continue
+                if ref in refs:
+                    responses[refs[ref]] = _cell_text(row[response_col]) if response_col < len(row) else ""
+                else:
+                    skipped.append(f"{ws.title}!{ref}")
+    finally:
+        wb.close()
+    return responses, skipped
+
+
+def _import_one(path, out_path):
+    responses, skipped = read_response_workbook(path, sheet_fields(_credits))
+    with open(out_path, "w") as f:
+        json.dump(responses, f, indent=2)
+    return path, out_path, sum(1 for v in responses.values() if v), skipped
+
+
+# ── Export ───────────────────────────────────────────────────────────────────
+def read_responses(path):
+    """Answers from a JSON export of the page (optionally gzip-compressed)."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: not a responses object")
+    return data
+
+
+def _named_styles():
+    border = Border(**{side: Side(style="thin", color="CCCCCC") for side in ("left", "right", "top", "bottom")})
+    return [
+        NamedStyle(name=name, font=Font(name="Calibri", **font), border=border,
+                   fill=PatternFill(fill_type="solid", start_color=fill, end_color=fill),
+                   alignment=Alignment(wrap_text=True, **align))
+        for name, (fill, font, align) in STYLES.items()
+    ]
+
+
+def write_response_workbook(credits_json_data, responses, path):
+    """Write one formatted response workbook in write-only mode, laid out like
+    the page's exportExcel, with a Yes/No list on every condition response."""
+    wb = Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+
+    for credit in credits_json_data:
+        ws = wb.create_sheet(credit["sheet_name"][:31])
+        for col, width in enumerate(COL_WIDTHS, 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        ws.freeze_panes = "A2"
+        yn = DataValidation(type="list", formula1='"Yes,No"', allow_blank=True,
+                            error="Please select Yes or No", errorTitle="Invalid entry",
+                            prompt="Select Yes or No", promptTitle="Yes / No")
+        row = 0
+
+        def append(values, styles, height, merge=False):
+            nonlocal row
+            row += 1
+            ws.row_dimensions[row].height = height
+            cells = []
+            for value, style in zip(values, styles):
+                cell = WriteOnlyCell(ws, value=value)
+                cell.style = style
+                cells.append(cell)
+            ws.append(cells)
+            if merge:
+                ws.merged_cells.add(f"A{row}:H{row}")
+
+        def banner(text, style, height):
+            append([text] + [None] * 7, [style] * 8, height, merge=True)
+
+        append(HEADERS, ["header"] * 8, 35)
+        banner(credit["title"], "credit", 30)
+        for sec in credit["sections"]:
+            banner(sec["title"], "level", 45)
+            for cr in sec["criteria"]:
+                banner(cr["name"], "criteria", 45)
+                for q in cr["questions"]:
+                    is_yn = q["type"] == "Condition (Y/N)"
+                    base = "condition" if is_yn else "question"
+                    styles = [base] * 6 + ["response", "data" if q["data_note"] else base]
+                    append([q["ref"], q["credit"], q["level"], q["criteria"], q["type"], q["question"],
+                            responses.get(q["input_id"]) or "", q["data_note"]], styles, 45)
+                    if is_yn:
+                        yn.add(f"G{row}")
+        if yn.sqref:
+            ws.data_validations.append(yn)
+    wb.save(path)
+
+
+def _export_one(path, out_path):
+    responses = read_responses(path)
+    write_response_workbook(_credits, responses, out_path)
+    return path, out_path, sum(1 for v in responses.values() if v), []
+
+
+# ── Batch ────────────────────────────────────────────────────────────────────
+_credits = None  # set in each worker process
+
+
+def _init_worker(credits_json_data):
+    global _credits
+    _credits = credits_json_data
+
+
+def _run_job(job):
+    convert, path, out_path = job
+    try:
+        return (*convert(path, out_path), None)
+    except Exception as e:  # one bad file must not stop the batch
+        return path, out_path, 0, [], f"{type(e).__name__}: {e}"
+
+
+def convert_all(convert, jobs_list, credits_json_data, jobs=None):
+    """Run ``convert(path, out_path)`` for each pair in worker processes; yields
+    (path, out_path, answered, skipped, error) in input order, where error is
+    the message of a file that failed to convert, else None."""
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(credits_json_data,)) as pool:
+        yield from pool.map(_run_job, [(convert, p, o) for p, o in jobs_list], chunksize=4)
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+def expand_paths(paths, exts):
+    """Files ending in one of ``exts`` from file and directory arguments;
+    directories are searched recursively, in sorted order."""
+    out = []
+    for p in paths:
+        if not os.path.isdir(p):
+            out.append(p)
+            continue
+        for root, dirs, files in os.walk(p):
+            dirs.sort()
+            out.extend(os.path.join(root, n) for n in sorted(files) if n.lower().endswith(exts))
+    return out
+
+
+def project_name(path):
+    """Project a response file belongs to: its file name without extensions, or
+    its directory's name while it still carries the page's default export name."""
+    name = os.path.basename(path)
+    for suffix in (".gz", ".json", ".xlsx"):
+        name = name.removesuffix(suffix)
+    if name == RESPONSES_JSON.removesuffix(".json"):
+        name = os.path.basename(os.path.dirname(os.path.abspath(path))) or name
+    return name
+
+
+def output_paths(paths, output_dir, ext):
+    """[(path, out_path)] named by project. Raises ValueError when two inputs
+    (e.g. a/x.xlsx and b/x.xlsx) would be written to the same file."""
+    pairs = [(p, os.path.join(output_dir, project_name(p) + ext)) for p in paths]
+    sources = {}
+    for p, out_path in pairs:
+        sources.setdefault(out_path, []).append(p)
+    clashes = [f"{out_path} <- {', '.join(found)}" for out_path, found in sources.items() if len(found) > 1]
+    if clashes:
+        raise ValueError("several inputs map to one output file: " + "; ".join(clashes))
+    return pairs
+
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--questions", default=gw.XLSX_PATH, help="submission questions workbook the site is built from")
+    common.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imp = commands.add_parser("import", parents=[common], help="response workbooks -> JSON response files")
+    imp.add_argument("paths", nargs="+", help="response workbooks, or directories of them")
+    imp.add_argument("-o", "--output-dir", default=".", help="where to write the JSON files (default: .)")
+
+    exp = commands.add_parser("export", parents=[common], help="JSON response files -> formatted response workbooks")
+    exp.add_argument("paths", nargs="+", help=f"JSON exports ({RESPONSES_JSON}, .json or .json.gz), "
+                                              "or directories of them")
+    exp.add_argument("-o", "--output-dir", default=".", help="where to write the workbooks (default: .)")
+    args = parser.parse_args(argv)
+
+    credits_json_data = load_credits(args.questions)
+    if args.command == "import":
+        convert, exts, out_ext = _import_one, (".xlsx",), ".json"
+    else:
+        convert, exts, out_ext = _export_one, (".json", ".json.gz"), ".xlsx"
+    try:
+        jobs_list = output_paths(expand_paths(args.paths, exts), args.output_dir, out_ext)
+    except ValueError as e:
+        parser.error(str(e))
+    os.makedirs(args.output_dir, exist_ok=True)
+    failed = 0
+    for path, out_path, answered, skipped, error in convert_all(convert, jobs_list, credits_json_data, args.jobs):
+        if error:
+            failed += 1
+            print(f"{path}: failed: {error}", file=sys.stderr)
+            continue
+        print(f"{path} -> {out_path}: {answered} answers")
+        if skipped:
+            print(f"  skipped {len(skipped)} unknown sheets or refs: {', '.join(skipped[:5])}"
+                  f"{' ...' if len(skipped) > 5 else ''}", file=sys.stderr)
+    if failed:
+        sys.exit(f"{failed} of {len(jobs_list)} files failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""Local sync server: keeps one project's answers in step across devices and
+editors.
+
+A small HTTP service (standard library only) the page talks to when it is
+opened from the server, or with ``?sync=http://host:port`` once. Every field
+is a last-writer-wins register: an edit is stamped ``[lamport, device]`` and
+the higher stamp wins, so edits from any number of clients merge to the same
+answers whatever order they arrive in. Clients send only the fields they
+changed, as small operations, and receive what others changed since their
+cursor.
+
+    python sync_server.py --db sync.sqlite --page index.html
+    # then open http://localhost:8765/?project=my-project on every device
+
+API (JSON bodies; an operation is {"id", "value", "t": [lamport, device]}):
+
+    POST /sync/<project>  {"device": d, "since": cursor, "changes": [ops]}
+                          -> {"cursor": n, "changes": [ops], "accepted": n, "stale": [ids]}
+    GET  /sync/<project>?since=<cursor>   the pull half only
+    GET  /sync/<project>/live?since=<cursor>
+                          WebSocket relay. The server first sends the
+                          operations since the cursor, then every operation
+                          other editors make as it is applied. Clients send
+                          {"changes": [ops]} batches; each is answered, in
+                          order, with {"ack": 1, "cursor": n, "changes": [the
+                          winning op of every field where the batch lost]}.
+    GET  /sync/ping                       {"sync": 1}
+
+Accepted operations are appended to the ops table (the operation log); ones
+that lose to a higher stamp are kept in the conflicts table.
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DB_PATH = "sync.sqlite"
+PORT = 8765
+MAX_BODY = 16 * 1024 * 1024
+PROJECT_RE = re.compile(r"^/sync/([^/]+)(/live)?$")
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_LAMPORT = 2 ** 53 - 1  # stored as SQLite INTEGER, compared as a JS number in the page
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fields (
+    project TEXT NOT NULL,
+    input_id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    lamport INTEGER NOT NULL,
+    device TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (project, input_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fields_seq ON fields (project, seq);
+CREATE TABLE IF NOT EXISTS ops (
+    project TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    input_id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    lamport INTEGER NOT NULL,
+    device TEXT NOT NULL,
+    at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS conflicts (
+    project TEXT NOT NULL,
+    input_id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    lamport INTEGER NOT NULL,
+    device TEXT NOT NULL,
+    at TEXT NOT NULL
+);
+"""
+
+
+def migrate(conn):
+    """Stores written with per-field version vectors get a Lamport stamp per
+    field: the sum of the vector, which orders every pair the vectors ordered."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(fields)")]
+    if "vv" not in columns:
+        return
+    rows = conn.execute("SELECT project, input_id, value, vv, device, seq FROM fields").fetchall()
+    with conn:
+        conn.execute("DROP TABLE fields")
+        conn.execute("DROP TABLE IF EXISTS conflicts")
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO fields VALUES (?, ?, ?, ?, ?, ?)",
+                         [(p, i, v, sum(json.loads(vv).values()), d, s) for p, i, v, vv, d, s in rows])
+
+
+def op(row):
+    """Operation message of a (input_id, value, lamport, device, seq) row."""
+    return {"id": row[0], "value": row[1], "t": [row[2], row[3]]}
+
+
+# ── Store ────────────────────────────────────────────────────────────────────
+class SyncStore:
+    """Fields of every project in one SQLite database, with one sequence
+    number (the cursor) across all writes. Writes are serialized, and live
+    subscribers are notified under the same lock, so each sees operations in
+    cursor order."""
+
+    def __init__(self, path=DB_PATH):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        migrate(self.conn)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM fields").fetchone()[0]
+        self.subscribers = {}  # project -> set of queues
+
+    def _select(self, project, ids):
+        """[(input_id, value, lamport, device, seq)] of the given fields that exist."""
+        rows = []
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows += self.conn.execute(
+                f"SELECT input_id, value, lamport, device, seq FROM fields WHERE project = ? "
+                f"AND input_id IN ({','.join('?' * len(chunk))})", [project, *chunk]).fetchall()
+        return rows
+
+    def _since(self, project, since):
+        return self.conn.execute(
+            "SELECT input_id, value, lamport, device, seq FROM fields WHERE project = ? AND seq > ? ORDER BY seq",
+            (project, since)).fetchall()
+
+    def _apply(self, project, changes, source=None):
+        """Apply operations; returns (accepted rows, stored rows of the fields
+        where an operation lost). Call with the lock held, inside a transaction."""
+        stored = {row[0]: row for row in self._select(project, list({c["id"] for c in changes}))}
+        accepted, lost = {}, {}
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+        for change in changes:
+            input_id, value, (lamport, device) = change["id"], change["value"], change["t"]
+            old = stored.get(input_id)
+            if old and (old[2], old[3]) >= (lamport, device):
+                if (old[2], old[3]) != (lamport, device):
+                    self.conn.execute("INSERT INTO conflicts VALUES (?, ?, ?, ?, ?, ?)",
+                                      (project, input_id, value, lamport, device, stamp))
+                    lost[input_id] = old
+                continue
+            self.seq += 1
+            row = stored[input_id] = (input_id, value, lamport, device, self.seq)
+            accepted[input_id] = row
+            lost.pop(input_id, None)
+            self.conn.execute("INSERT OR REPLACE INTO fields VALUES (?, ?, ?, ?, ?, ?)", (project, *row))
+            self.conn.execute("INSERT INTO ops VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (project, self.seq, input_id, value, lamport, device, stamp))
+        if accepted:
+            message = {"cursor": self.seq, "changes": [op(row) for row in accepted.values()]}
+            for q in self.subscribers.get(project, ()):
+                if q is not source:
+                    q.put(message)
+        return list(accepted.values()), list(lost.values())
+
+    def sync(self, project, since, changes):
+        """Apply one client's operations, then return every field newer than
+        ``since`` it does not already have, including the winning value of
+        any field where its operation lost."""
+        with self.lock, self.conn:
+            accepted, lost = self._apply(project, changes)
+            rows = self._since(project, since)
+            mine = {row[0]: row for row in accepted}
+            newer = {row[0] for row in rows}
+            cursor = self.seq
+        return {
+            "cursor": cursor,
+            "changes": [op(row) for row in rows if mine.get(row[0]) != row]
+                       + [op(row) for row in lost if row[0] not in newer],
+            "accepted": len(accepted),
+            "stale": [row[0] for row in lost],
+        }
+
+    def subscribe(self, project, since):
+        """Queue receiving the project's operations after ``since``, starting
+        with the fields changed since then."""
+        q = queue.SimpleQueue()
+        with self.lock:
+            q.put({"cursor": self.seq, "changes": [op(row) for row in self._since(project, since)]})
+            self.subscribers.setdefault(project, set()).add(q)
+        return q
+
+    def unsubscribe(self, project, q):
+        with self.lock:
+            self.subscribers[project].discard(q)
+
+    def relay(self, project, changes, source):
+        """Apply one live batch; its sender gets the ack through ``source`` in
+        order with the operations of other editors."""
+        with self.lock, self.conn:
+            _, lost = self._apply(project, changes, source)
+            source.put({"ack": 1, "cursor": self.seq, "changes": [op(row) for row in lost]})
+
+
+def valid_changes(changes):
+    """Raises ValueError unless ``changes`` is a list of operations with
+    Lamport values in 0..MAX_LAMPORT."""
+    if not isinstance(changes, list):
+        raise ValueError(changes)
+    for c in changes:
+        t = c["t"]
+        if not (isinstance(c["id"], str) and isinstance(c["value"], str) and isinstance(t, list) and len(t) == 2
+                and type(t[0]) is int and 0 <= t[0] <= MAX_LAMPORT and isinstance(t[1], str)):
+            raise ValueError(c)
+    return changes
+
+
+# ── WebSocket ────────────────────────────────────────────────────────────────
+def read_frame(rfile):
+    """(opcode, fin, payload) of the next frame from a client, or None at EOF."""
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", rfile.read(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", rfile.read(8))[0]
+    if length > MAX_BODY:
+        return None
+    mask = rfile.read(4) if head[1] & 0x80 else b""
+    data = rfile.read(length)
+    if mask and data:
+        key = (mask * (len(data) // 4 + 1))[:len(data)]
+        data = (int.from_bytes(data, "big") ^ int.from_bytes(key, "big")).to_bytes(len(data), "big")
+    return head[0] & 0x0F, head[0] & 0x80, data
+
+
+def frame(opcode, payload):
+    length = len(payload)
+    if length < 126:
+        head = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return head + payload
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+class SyncHandler(BaseHTTPRequestHandler):
+    """JSON API under /sync/, the page at / when the server was given one.
+
+    Browsers may call the API only from the server's own origin, from a page
+    opened from a file:// URL (Origin "null") or from origins given with
+    --allow-origin; any other Origin is refused on every /sync/ route, the
+    WebSocket upgrade included, so other web pages cannot read or overwrite
+    answers. Requests without an Origin (non-browser clients) are served."""
+
+    server_version = "GreenStarSync/1"
+    store = None  # SyncStore, set by serve()
+    page = None  # path of the generated page, or None
+    allowed_origins = frozenset()  # extra origins, set by serve()
+
+    def _origin_allowed(self):
+        origin = self.headers.get("Origin")
+        return (origin is None or origin == "null" or origin == f"http://{self.headers.get('Host', '')}"
+                or origin in self.allowed_origins)
+
+    def _cors_headers(self):
+        origin = self.headers.get("Origin")
+        if origin is not None and self._origin_allowed():
+            self.send_header("Access-Control-Allow-Origin", origin)
+        self.send_header("Vary", "Origin")
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body=b"", content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self._cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, data, status=HTTPStatus.OK):
+        self._send(status, json.dumps(data, separators=(",", ":")).encode())
+
+    def _error(self, status, message):
+        self._json({"error": message}, status)
+
+    def do_OPTIONS(self):
+        if not self._origin_allowed():
+            return self._error(HTTPStatus.FORBIDDEN, "origin not allowed")
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self._cors_headers()
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Access-Control-Max-Age", "86400")
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.startswith("/sync/") and not self._origin_allowed():
+            return self._error(HTTPStatus.FORBIDDEN, "origin not allowed")
+        if url.path == "/sync/ping":
+            return self._json({"sync": 1})
+        match = PROJECT_RE.match(url.path)
+        if match:
+            try:
+                since = int(parse_qs(url.query).get("since", ["0"])[0])
+            except ValueError:
+                return self._error(HTTPStatus.BAD_REQUEST, "since must be an integer")
+            if match[2]:
+                return self._live(unquote(match[1]), since)
+            return self._json(self.store.sync(unquote(match[1]), since, []))
+        if url.path in ("/", "/index.html") and self.page:
+            with open(self.page, "rb") as f:
+                return self._send(HTTPStatus.OK, f.read(), "text/html; charset=utf-8")
+        self._error(HTTPStatus.NOT_FOUND, "not found")
+
+    def do_POST(self):
+        match = PROJECT_RE.match(urlsplit(self.path).path)
+        if not match or match[2]:
+            return self._error(HTTPStatus.NOT_FOUND, "not found")
+        if not self._origin_allowed():
+            return self._error(HTTPStatus.FORBIDDEN, "origin not allowed")
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            return self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request too large")
+        try:
+            body = json.loads(self.rfile.read(length))
+            since, changes = int(body.get("since", 0)), valid_changes(body.get("changes", []))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return self._error(HTTPStatus.BAD_REQUEST, "expected {device, since, changes: [{id, value, t}]}")
+        self._json(self.store.sync(unquote(match[1]), since, changes))
+
+    def _live(self, project, since):
+        """Upgrade to a WebSocket and relay operations until either side closes.
+        A writer thread drains the connection's queue, so a slow client never
+        holds up the store."""
+        key = self.headers.get("Sec-WebSocket-Key")
+        if not key or self.headers.get("Upgrade", "").lower() != "websocket":
+            return self._error(HTTPStatus.BAD_REQUEST, "expected a WebSocket upgrade")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.send_response(HTTPStatus.SWITCHING_PROTOCOLS)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+
+        q = self.store.subscribe(project, since)
+        lock = threading.Lock()
+
+        def send(opcode, payload):
+            with lock:
+                self.wfile.write(frame(opcode, payload))
+                self.wfile.flush()
+
+        def writer():
+            try:
+                while (message := q.get()) is not None:
+                    send(0x1, json.dumps(message, separators=(",", ":")).encode())
+            except OSError:
+                pass
+
+        thread = threading.Thread(target=writer, daemon=True)
+        thread.start()
+        parts = []
+        try:
+            while (got := read_frame(self.rfile)) is not None:
+                opcode, fin, data = got
+                if opcode == 0x8:
+                    send(0x8, data[:2])
+                    break
+                if opcode == 0x9:
+                    send(0xA, data)
+                    continue
+                if opcode not in (0x0, 0x1):
+                    continue
+                parts.append(data)
+                if not fin:
+                    continue
+                text, parts = b"".join(parts), []
+                try:
+                    changes = valid_changes(json.loads(text)["changes"])
+                except (ValueError, KeyError, TypeError):
+                    q.put({"error": "expected {changes: [{id, value, t}]}"})
+                    continue
+                self.store.relay(project, changes, q)
+        except OSError:
+            pass
+        finally:
+            self.store.unsubscribe(project, q)
+            q.put(None)
+            thread.join(5)
+
+
+def serve(db=DB_PATH, host="127.0.0.1", port=PORT, page=None, verbose=False, allowed_origins=()):
+    handler = type("Handler", (SyncHandler,), {"store": SyncStore(db), "page": page,
+                                               "allowed_origins": frozenset(allowed_origins)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.verbose = verbose
+    return server
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=DB_PATH, help=f"SQLite database (default: {DB_PATH})")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on; 0.0.0.0 for other machines on the network (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=PORT, help=f"(default: {PORT})")
+    parser.add_argument("--page", help="generated site to serve at / (e.g. index.html)")
+    parser.add_argument("--allow-origin", action="append", default=[], metavar="ORIGIN",
+                        help="also accept pages from ORIGIN (e.g. https://intranet.example); repeatable. "
+                             "The server's own origin and file:// pages are always accepted")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+    if args.page and not os.path.isfile(args.page):
+        parser.error(f"{args.page}: no such file")
+
+    server = serve(args.db, args.host, args.port, args.page, args.verbose, args.allow_origin)
+    print(f"Sync server on http://{args.host}:{args.port}/ (database {args.db})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Numbers and units in Data answers, normalised to canonical SI values.
+
+Data questions collect free text such as "2,500 m²", "450 tonnes" or
+"850 MJ/m²/year". ``quantities`` pulls every number-and-unit pair out of an
+answer, ``normalize`` picks the one a question expects, ``normalize_column``
+does that for one question's answers across many projects and
+``flag_outliers`` marks implausible values within such a column.
+
+The unit table is also embedded in the generated page (``client_units``) so
+answers are checked with the same rules as they are typed.
+"""
+
+import math
+import re
+import statistics
+
+# Canonical unit, noun phrase and example per dimension. Quantities are stored
+# in the canonical unit: SI base units except "year" as the time denominator
+# of rates and the percent/ratio and currency conventions noted.
+DIMENSIONS = {
+    "ratio": ("", "a percentage", "85%"),          # 85% -> 0.85
+    "area": ("m²", "an area", "2,500 m²"),
+    "length": ("m", "a length", "12 m"),
+    "mass": ("kg", "a mass", "450 tonnes"),
+    "volume": ("m³", "a volume", "1,200 kL"),
+    "energy": ("J", "an energy", "850 MJ"),
+    "power": ("W", "a power", "50 kW"),
+    "co2e": ("kgCO₂-e", "emissions", "125 tCO₂-e"),
+    "currency": ("AUD", "a cost", "$125,000"),
+    "time": ("s", "a duration", "6 months"),
+    "illuminance": ("lx", "an illuminance", "320 lux"),
+    "sound": ("dB", "a sound level", "40 dB"),
+    "count": ("", "a number", "12"),
+}
+
+# alias -> (dimension, factor to the canonical unit). Keys are matched after
+# _unit_key folds case, superscripts and separators; CASED keys first.
+# Litres with the mega/milli prefix are only read when written "ML" or "mL":
+# any other casing ("ml", "Ml") is ambiguous by a factor of 10^9, so it has no
+# folded key and such answers come out unparsed ("mismatch") rather than wrong.
+CASED_UNITS = {
+    "ML": ("volume", 1e3),   # megalitres, common in water reporting
+    "mL": ("volume", 1e-6),
+}
+UNITS = {
+    "%": ("ratio", 0.01), "percent": ("ratio", 0.01), "pct": ("ratio", 0.01),
+    "m2": ("area", 1.0), "sqm": ("area", 1.0), "sqmetres": ("area", 1.0), "ha": ("area", 1e4),
+    "km2": ("area", 1e6), "ft2": ("area", 0.09290304), "sqft": ("area", 0.09290304),
+    "mm": ("length", 1e-3), "cm": ("length", 1e-2), "m": ("length", 1.0), "metres": ("length", 1.0),
+    "meters": ("length", 1.0), "km": ("length", 1e3),
+    "g": ("mass", 1e-3), "kg": ("mass", 1.0), "t": ("mass", 1e3), "tonne": ("mass", 1e3),
+    "tonnes": ("mass", 1e3), "ton": ("mass", 1e3), "tons": ("mass", 1e3), "kt": ("mass", 1e6),
+    "l": ("volume", 1e-3), "litre": ("volume", 1e-3), "litres": ("volume", 1e-3), "liters": ("volume", 1e-3),
+    "kl": ("volume", 1.0), "gl": ("volume", 1e6), "m3": ("volume", 1.0),
+    "j": ("energy", 1.0), "kj": ("energy", 1e3), "mj": ("energy", 1e6), "gj": ("energy", 1e9),
+    "tj": ("energy", 1e12), "wh": ("energy", 3.6e3), "kwh": ("energy", 3.6e6), "mwh": ("energy", 3.6e9),
+    "gwh": ("energy", 3.6e12),
+    "w": ("power", 1.0), "kw": ("power", 1e3), "mw": ("power", 1e6), "kwp": ("power", 1e3),
+    "kgco2e": ("co2e", 1.0), "kgco2": ("co2e", 1.0), "tco2e": ("co2e", 1e3), "tco2": ("co2e", 1e3),
+    "ktco2e": ("co2e", 1e6),
+    "$": ("currency", 1.0), "aud": ("currency", 1.0), "a$": ("currency", 1.0), "dollars": ("currency", 1.0),
+    "s": ("time", 1.0), "sec": ("time", 1.0), "seconds": ("time", 1.0), "min": ("time", 60.0),
+    "minutes": ("time", 60.0), "h": ("time", 3600.0), "hr": ("time", 3600.0), "hrs": ("time", 3600.0),
+    "hours": ("time", 3600.0), "hour": ("time", 3600.0), "day": ("time", 86400.0), "days": ("time", 86400.0),
+    "week": ("time", 604800.0), "weeks": ("time", 604800.0), "month": ("time", 2629800.0),
+    "months": ("time", 2629800.0), "year": ("time", 31557600.0), "years": ("time", 31557600.0),
+    "yr": ("time", 31557600.0), "yrs": ("time", 31557600.0),
+    "lux": ("illuminance", 1.0), "lx": ("illuminance", 1.0),
+    "db": ("sound", 1.0), "dba": ("sound", 1.0),
+}
+# Denominators of rates ("/year", "per m²"); time is counted in years here
+PER_UNITS = {
+    "year": ("year", 1.0), "years": ("year", 1.0), "yr": ("year", 1.0), "annum": ("year", 1.0),
+    "a": ("year", 1.0), "pa": ("year", 1.0), "month": ("year", 12.0), "day": ("year", 365.25),
+    "week": ("year", 52.18), "h": ("s", 1 / 3600), "hr": ("s", 1 / 3600), "hour": ("s", 1 / 3600),
+    "s": ("s", 1.0), "sec": ("s", 1.0),
+    "m2": ("area", 1.0), "sqm": ("area", 1.0), "ha": ("area", 1e-4),
+    "person": ("person", 1.0), "occupant": ("person", 1.0), "p": ("person", 1.0), "fte": ("person", 1.0),
+}
+MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6, "mil": 1e6, "b": 1e9, "billion": 1e9}
+
+# A number, an optional multiplier word and an optional unit with any
+# "/x" or "per x" denominators. Run on text from _fold.
+QUANTITY = re.compile(
+    r"(?P<cur>\$|a\$)?\s*"
+    r"(?P<num>[-+]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|[-+]?\.\d+)(?![\d,]*\d)"
+    r"(?:\s*(?P<mult>thousand|million|billion|mil\b|[kmb]\b))?"
+    r"(?:\s*(?P<unit>%|[a-z$][a-z0-9$]*(?:-e)?(?:\([a-z]\))?(?:\s*(?:/|\bper\b)\s*[a-z][a-z0-9]*|\s+pa\b)*))?",
+    re.IGNORECASE,
+)
+
+# Unit mentions in question text, e.g. "(tonnes)", "diversion rate (%)", "lux"
+MENTION = re.compile(
+    r"(%|\bpercentage\b|\bper ?cent\b|\bm²|\bm2\b|\bsqm\b|\btonnes?\b|\bkg\b|\bkl\b|\bML\b|\blitres?\b|\bL/s\b"
+    r"|\bkwh\b|\bmwh\b|\bmj\b|\bgj\b|\bkw\b|\bkwp\b|\btco2|\bkgco2|\bco2-?e\b|\blux\b|\bdb\b|\bdb\(a\)"
+    r"|\$|\bcost\b|\bmonths\b|\bnumber of\b|\bhow many\b)",
+    re.IGNORECASE,
+)
+MENTION_DIMENSIONS = {
+    "percentage": "ratio", "percent": "ratio", "per cent": "ratio", "%": "ratio",
+    "cost": "currency", "number of": "count", "how many": "count", "months": "time", "l/s": "volume",
+}
+
+# Data question kinds by keywords in the question text, first match wins
+# (also picks the example answer shown in the guidance panel)
+DATA_KINDS = [
+    ("percentage", ["percentage", "percent", "%", "proportion"]),
+    ("area", ["area", "m²", "sqm", "square met", "floor area", "gfa", "nla"]),
+    ("mass", ["weight", "tonne", "kg", "mass"]),
+    ("date", ["date", "when was", "when did"]),
+    ("cost", ["cost", "$", "value", "budget", "spend"]),
+    ("count", ["number", "how many", "count", "quantity"]),
+    ("volume", ["volume", "litre", "l/", "kl", "water"]),
+    ("energy", ["energy", "kwh", "mj", "gj"]),
+    ("emissions", ["emission", "co2", "carbon", "tco2"]),
+    ("rating", ["rating", "score", "star", "level"]),
+    ("name", ["name", "who", "accreditation"]),
+]
+KIND_DIMENSIONS = {
+    "percentage": "ratio", "area": "area", "mass": "mass", "cost": "currency", "count": "count",
+    "volume": "volume", "energy": "energy", "emissions": "co2e", "rating": "count",
+}
+# Dimensions where a bare number is read in a default unit
+BARE_UNITS = {"ratio": "%", "count": ""}
+
+_FOLD = str.maketrans({"²": "2", "³": "3", "₂": "2", " ": " ", "–": "-", "—": "-", "‑": "-"})
+
+
+def _fold(text):
+    return re.sub(r"\bper\s*cent\b", "%", text.translate(_FOLD), flags=re.IGNORECASE)
+
+
+def _unit_key(unit):
+    unit = unit.strip()
+    if unit in CASED_UNITS:
+        return unit
+    key = unit.lower().replace(" ", "").replace("(", "").replace(")", "")
+    return key[:-2] + "e" if key.endswith("-e") else key
+
+
+def data_kind(question_text):
+    """Kind of value a Data question asks for (a DATA_KINDS name), or None."""
+    qt = question_text.lower()
+    for kind, words in DATA_KINDS:
+        if any(w in qt for w in words):
+            return kind
+    return None
+
+
+def expected_dimensions(question_text):
+    """Dimensions a Data question's answer should contain, most specific first:
+    units named in the question text, else its DATA_KINDS kind. Empty when the
+    question does not ask for a measurable value."""
+    dims = []
+    for m in MENTION.finditer(_fold(question_text)):
+        word = m.group(0).lower()
+        dim = MENTION_DIMENSIONS.get(word) or (UNITS.get(_unit_key(m.group(0))) or CASED_UNITS.get(m.group(0)) or (None,))[0]
+        if dim is None and "co2" in word:
+            dim = "co2e"
+        if dim and dim not in dims:
+            dims.append(dim)
+    if not dims:
+        dim = KIND_DIMENSIONS.get(data_kind(question_text))
+        if dim:
+            dims.append(dim)
+    return dims
+
+
+# ── Parsing ──────────────────────────────────────────────────────────────────
+def _parse_unit(unit):
+    """(dimension, factor, denominators) for a unit string, or None if unknown."""
+    parts = re.split(r"\s*(?:/|\bper\b)\s*|\s+(?=pa\b)", unit, flags=re.IGNORECASE)
+    head = UNITS.get(_unit_key(parts[0])) or CASED_UNITS.get(parts[0].strip())
+    if head is None:
+        return None
+    dim, factor = head
+    per = []
+    for part in parts[1:]:
+        den = PER_UNITS.get(_unit_key(part))
+        if den is None:
+            return None
+        per.append(den[0])
+        factor *= den[1]
+    return dim, factor, per
+
+
+def quantities(text):
+    """Every (value, dimension, unit) in an answer, value in the canonical unit.
+
+    dimension is e.g. "energy/area/year" for rates, "count" for bare numbers
+    and numbers followed by words that are not units ("12 workers")."""
+    out = []
+    for m in QUANTITY.finditer(_fold(text or "")):
+        value = float(m.group("num").replace(",", ""))
+        mult, unit = m.group("mult"), (m.group("unit") or "").strip()
+        if mult and mult.lower() == "m" and not unit and not m.group("cur"):
+            # "5 m" is a length, not five million ("$5m" is)
+            unit, mult = "m", None
+        if mult:
+            value *= MULTIPLIERS[mult.lower()]
+        parsed = _parse_unit(unit) if unit else None
+        if parsed is None and m.group("cur"):
+            parsed = ("currency", 1.0, [])
+        if parsed is None:
+            out.append((value, "count", unit if unit and not unit[0].isdigit() else ""))
+            continue
+        dim, factor, per = parsed
+        out.append((value * factor, "/".join([dim] + per), unit or "$"))
+    return out
+
+
+def normalize(text, expected=()):
+    """(value, dimension, status) for one answer.
+
+    Picks the first quantity whose base dimension is in ``expected`` (a bare
+    number counts as % for ratio and as a count). status is "ok", "empty",
+    "no-number", "no-unit" (only bare numbers where a unit is expected) or
+    "mismatch" (units, none of them expected). Without expectations the first
+    quantity is returned."""
+    if not (text or "").strip():
+        return None, None, "empty"
+    found = quantities(text)
+    if not found:
+        return None, None, "no-number"
+    if not expected:
+        value, dim, _ = found[0]
+        return value, dim, "ok"
+    bare = False
+    for value, dim, unit in found:
+        if dim.split("/")[0] in expected:
+            return value, dim, "ok"
+        if dim == "count" and not unit:
+            bare = True
+    for dim in expected:
+        if bare and dim in BARE_UNITS:
+            value = next(v for v, d, u in found if d == "count" and not u)
+            return (value * 0.01 if dim == "ratio" else value), dim, "ok"
+    return None, None, "no-unit" if bare and all(d == "count" for _, d, _ in found) else "mismatch"
+
+
+def normalize_column(texts, expected=()):
+    """``normalize`` over one question's answers; identical answers are parsed once."""
+    cache = {}
+    out = []
+    for text in texts:
+        reading = cache.get(text)
+        if reading is None:
+            reading = cache[text] = normalize(text, expected)
+        out.append(reading)
+    return out
+
+
+def flag_outliers(values, threshold=3.5, min_count=5):
+    """Outlier flags for one column of values of the same dimension.
+
+    Modified z-score (median / MAD) on log10 of the magnitudes, since quantities
+    across projects spread over orders of magnitude; zero and negative values
+    are never flagged. Columns with fewer than ``min_count`` positive values
+    are not flagged at all."""
+    flags = [False] * len(values)
+    scaled = [math.log10(v) if v > 0 else None for v in values]
+    logs = [s for s in scaled if s is not None]
+    if len(logs) >= min_count:
+        med = statistics.median(logs)
+        mad = statistics.median(abs(s - med) for s in logs)
+        if mad > 0:
+            for i, s in enumerate(scaled):
+                if s is not None and 0.6745 * abs(s - med) / mad > threshold:
+                    flags[i] = True
+    return flags
+
+
+def client_units():
+    """Unit tables for the page's client-side checks."""
+    return {
+        "units": UNITS,
+        "cased": CASED_UNITS,
+        "per": PER_UNITS,
+        "multipliers": MULTIPLIERS,
+        "dimensions": DIMENSIONS,
+        "bare": BARE_UNITS,
+    }